@@ -0,0 +1,67 @@
+"""
+bcdedit enumeration lookup: per-call regex vs. structured parse.
+
+    python benchmarks/bench_bcdedit_parse.py [--lookups N]
+
+Runs over the fixture corpus in tests/fixtures/bcdedit. "legacy" compiles a
+regex and scans the raw `/enum` output for every lookup (what snapshot and
+verify did per action); "parsed" parses each output once with
+`core.bcdedit.parse_enum` and answers every lookup from the entries.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core import bcdedit
+
+CORPUS = ROOT / "tests" / "fixtures" / "bcdedit"
+
+
+def legacy_find(output: str, datatype: str):
+    match = re.compile(rf"^{re.escape(datatype)}\s+(.*)$", re.MULTILINE).search(output)
+    if match:
+        val = match.group(1).strip()
+        return val if val else None
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    for fixture in sorted(CORPUS.glob("*.txt")):
+        output = fixture.read_text()
+        datatypes = sorted({k for e in bcdedit.parse_enum(output) for k in e} | {"missing"})
+        queries = [datatypes[i % len(datatypes)] for i in range(args.lookups)]
+
+        # re's own pattern cache hides the compile cost; purge it per lookup
+        # to model the original per-call re.compile of a fresh pattern.
+        start = time.perf_counter()
+        for q in queries:
+            re.purge()
+            legacy_find(output, q)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        entries = bcdedit.parse_enum(output)
+        for q in queries:
+            bcdedit.find_value(entries, q)
+        parsed = time.perf_counter() - start
+
+        print(
+            f"{fixture.name:<20} {len(output):>6} B  "
+            f"legacy {legacy / args.lookups * 1e6:7.2f} us/lookup  "
+            f"parsed {parsed / args.lookups * 1e6:7.2f} us/lookup  "
+            f"({legacy / parsed:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Load test of the powercfg and bcdedit paths on the replay runner.
+
+    python benchmarks/bench_command_runner.py [--threads N] [--rounds N]
+        [--latency-ms MS] [--max-processes N]
+
+Every command is served from the fixtures in tests/fixtures, with
+`--latency-ms` slept per call to stand in for process start-up. Each thread
+snapshots, applies and verifies one powercfg and one bcdedit action per
+round, so the run shows how the shared process limit shapes wall time and
+what each executable costs.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core import bcdedit, commands, powercfg
+from core.actions.bcdedit_action import BcdEditAction
+from core.actions.powercfg_action import PowerCfgAction
+
+FIXTURES = ROOT / "tests" / "fixtures"
+SCHEME = "381b4222-f694-41f0-9685-ff5bb260df2e"
+
+
+def recordings():
+    return [
+        {"argv": ["powercfg", "/query", SCHEME],
+         "stdout": (FIXTURES / "powercfg" / "query_scheme_balanced.txt").read_text()},
+        {"argv": ["powercfg", "/setacvalueindex", "*"]},
+        {"argv": ["bcdedit", "/enum", "{current}"],
+         "stdout": (FIXTURES / "bcdedit" / "enum_current.txt").read_text()},
+        {"argv": ["bcdedit", "/set", "*"]},
+    ]
+
+
+def worker(rounds):
+    power = PowerCfgAction({"type": "powercfg", "scheme_guid": SCHEME, "subgroup_guid": "SUB_PROCESSOR",
+                            "setting_guid": "PROCTHROTTLEMIN", "value_ac": 5})
+    boot = BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "nx", "value": "OptIn"})
+    for _ in range(rounds):
+        with powercfg.scope(), bcdedit.scope():
+            for action in (power, boot):
+                action.snapshot()
+                action.apply()
+                action.verify()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--max-processes", type=int, default=commands.MAX_PROCESSES)
+    args = parser.parse_args()
+
+    commands.set_max_processes(args.max_processes)
+    commands.set_runner(commands.ReplayRunner(recordings(), latency=args.latency_ms / 1000))
+
+    threads = [threading.Thread(target=worker, args=(args.rounds,)) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"threads={args.threads} rounds={args.rounds} max_processes={args.max_processes} "
+          f"latency={args.latency_ms}ms wall={elapsed:.2f}s")
+    for name, s in sorted(commands.metrics.snapshot().items()):
+        print(f"  {name:<10} calls {s['calls']:>5}  failures {s['failures']:>3}  "
+              f"avg {s['total_s'] / s['calls'] * 1000:6.2f} ms  max {s['max_s'] * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+History persistence benchmark.
+
+Replays the database traffic of `TweakManager.apply` for a three-action
+tweak and reports connections opened and latency per command.
+
+    python benchmarks/bench_history_store.py [--iterations N]
+
+"per-call" reproduces the pre-HistoryStore behaviour (one connection opened
+and closed by every helper); "pooled" is the shared long-lived store.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import rollback
+from core import state_machine
+from core.history_store import close_store
+
+
+class ConnectCounter:
+    def __init__(self):
+        self.count = 0
+        self._original = sqlite3.connect
+
+    def __enter__(self):
+        def counting_connect(*args, **kwargs):
+            self.count += 1
+            return self._original(*args, **kwargs)
+
+        sqlite3.connect = counting_connect
+        return self
+
+    def __exit__(self, *exc):
+        sqlite3.connect = self._original
+
+
+def simulate_apply(n: int, per_call: bool) -> None:
+    db_path = rollback.DB_PATH
+
+    def step(fn, *args):
+        result = fn(*args)
+        if per_call:
+            close_store(db_path)
+        return result
+
+    tweak_id = f"bench.apply_{n}@1.0"
+    step(rollback.get_history_by_tweak_id, tweak_id)
+    history_id = step(rollback.create_history_entry, tweak_id)
+    step(rollback.set_schema_version, history_id, 1)
+
+    sm = state_machine.TweakStateMachine(history_id)
+    step(sm.transition, "validate")
+    step(sm.transition, "apply")
+
+    for i in range(3):
+        snap = SimpleNamespace(
+            action_type="registry",
+            metadata={"path": "HKEY_CURRENT_USER\\Bench", "key": f"V{i}"},
+        )
+        step(rollback.save_snapshot_v2, history_id, snap)
+
+    step(sm.transition, "success")
+    step(sm.transition, "verify")
+    step(rollback.mark_applied, history_id)
+
+
+def run(iterations: int, per_call: bool) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        rollback.DB_PATH = db_path
+        state_machine.DB_PATH = db_path
+        rollback.init_db()
+        close_store(db_path)
+
+        with ConnectCounter() as counter:
+            start = time.perf_counter()
+            for n in range(iterations):
+                simulate_apply(n, per_call)
+                if not per_call:
+                    # A CLI invocation ends with the process; model that.
+                    close_store(db_path)
+            elapsed = time.perf_counter() - start
+
+        close_store(db_path)
+
+    return {
+        "connections_per_command": counter.count / iterations,
+        "ms_per_command": elapsed * 1000 / iterations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    original = (rollback.DB_PATH, state_machine.DB_PATH)
+    try:
+        before = run(args.iterations, per_call=True)
+        after = run(args.iterations, per_call=False)
+    finally:
+        rollback.DB_PATH, state_machine.DB_PATH = original
+
+    print(f"{'mode':<10} {'connections/cmd':>16} {'ms/cmd':>10}")
+    for name, result in (("per-call", before), ("pooled", after)):
+        print(
+            f"{name:<10} {result['connections_per_command']:>16.1f} "
+            f"{result['ms_per_command']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Apply / verify / revert load test against the in-memory registry backend.
+
+    python benchmarks/bench_registry_pipeline.py [--keys N] [--actions M] [--latency-us L]
+
+Pre-populates N registry values, then applies and reverts a generated tweak
+with M registry actions (plus a verify entry per action) through
+`TweakManager`, reporting wall time and backend calls per phase.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import registry, rollback, state_machine
+from core.history_store import close_store
+from core.registry_backends import MemoryRegistryBackend
+from core.tweak_manager import TweakManager
+
+ROOT = "HKEY_CURRENT_USER\\Software\\EnhancerBench"
+KEYS_PER_SUBKEY = 100
+
+
+def populate(backend: MemoryRegistryBackend, keys: int) -> None:
+    hive, subkey = registry.parse_registry_path(ROOT)
+    for i in range(keys):
+        backend.set_value(hive, f"{subkey}\\K{i // KEYS_PER_SUBKEY}", f"V{i}", i, 4, True)
+    backend.stats.clear()
+
+
+def make_tweak(actions: int, verify_semantics: str) -> dict:
+    apply, verify = [], []
+    for i in range(actions):
+        path = f"{ROOT}\\K{i // KEYS_PER_SUBKEY}"
+        apply.append({"type": "registry", "path": path, "key": f"V{i}",
+                      "value": i + 1, "value_type": "DWORD"})
+        verify.append({"type": "registry", "path": path, "key": f"V{i}", "expected": i + 1})
+    return {
+        "id": "bench.registry_pipeline@1.0",
+        "name": "Registry pipeline benchmark",
+        "tier": 0,
+        "risk_level": "low",
+        "requires_reboot": False,
+        "rollback_guaranteed": True,
+        "scope": ["registry"],
+        "verify_semantics": verify_semantics,
+        "actions": {"apply": apply, "verify": verify},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--actions", type=int, default=200)
+    parser.add_argument("--latency-us", type=float, default=0.0)
+    parser.add_argument(
+        "--verify-semantics", choices=["runtime", "persisted"], default="runtime",
+        help="persisted forces verification to re-read every value",
+    )
+    args = parser.parse_args()
+
+    backend = MemoryRegistryBackend(latency=args.latency_us / 1e6)
+    start = time.perf_counter()
+    populate(backend, args.keys)
+    print(f"populated {args.keys} values in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp, registry.use_backend(backend):
+        db_path = Path(tmp) / "bench.db"
+        rollback.DB_PATH = db_path
+        state_machine.DB_PATH = db_path
+
+        tweak_path = Path(tmp) / "tweak.json"
+        tweak_path.write_text(json.dumps(make_tweak(args.actions, args.verify_semantics)))
+
+        manager = TweakManager()
+        for phase, run in (
+            ("apply+verify", lambda: manager.apply(tweak_path)),
+            ("revert", lambda: manager.revert("bench.registry_pipeline@1.0")),
+        ):
+            backend.stats.clear()
+            start = time.perf_counter()
+            ok = run()
+            elapsed = time.perf_counter() - start
+            calls = ", ".join(f"{op}={n}" for op, n in sorted(backend.stats.items()))
+            print(f"{phase:<13} ok={ok} {elapsed * 1000:9.1f} ms  {calls}")
+
+        close_store(db_path)
+
+
+if __name__ == "__main__":
+    main()
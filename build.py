@@ -37,13 +37,12 @@ def build():
     subprocess.run(cmd, check=True)
     dist_path = Path("dist")
     tweaks_src = Path("tweaks")
-    tweaks_dst = dist_path / "tweaks"
 
-    if tweaks_dst.exists():
-        shutil.rmtree(tweaks_dst)
-
-    shutil.copytree(tweaks_src, tweaks_dst)
-    print("[BUILD] tweaks/ folder copied to dist/")
+    # The pack is the shipped tweak source (core.profile.TWEAK_PACK): one
+    # memory-mapped file instead of one open per tweak on cold start.
+    from core.tweak_pack import build_pack
+    count = build_pack(tweaks_src, dist_path / "tweaks.etpk")
+    print(f"[BUILD] {count} tweaks packed into dist/tweaks.etpk")
     print(f"[BUILD] Completed. Check the 'dist' folder.")
 
 if __name__ == "__main__":
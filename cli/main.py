@@ -1,5 +1,7 @@
 import sys
+import json
 import argparse
+from contextlib import ExitStack
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "infra"))
@@ -7,6 +9,11 @@ from infra.telemetry.dispatcher import manager as telemetry_manager
 from infra.telemetry.logger import LoggerSink
 
 import core.tweak_manager as core_manager
+import core.migrations as core_migrations
+from core import rollback as core_rollback
+from core import tweak_pack as core_pack
+from core.history_store import HistoryStore
+from core.validation import TweakValidator
 
 
 def setup_telemetry(log_file=None):
@@ -20,11 +27,142 @@ def setup_telemetry(log_file=None):
 
 
 def cmd_apply(args):
+    manager = core_manager.TweakManager(
+        step_timeout=args.step_timeout,
+        timeout=args.timeout,
+    )
+    with ExitStack() as packs:
+        try:
+            ok = manager.apply(_tweak_source(args.tweak, packs))
+        except KeyboardInterrupt:
+            print("\n[CANCELLED] Apply interrupted; changes were rolled back.")
+            sys.exit(130)
+    sys.exit(0 if ok else 1)
+
+
+def _tweak_source(ref, packs):
+    # "<pack>.etpk#<tweak_id>" selects one tweak from a pack; `packs`
+    # (an ExitStack) closes the pack when the command is done with it.
+    member = core_pack.open_member(ref)
+    if member is None:
+        return Path(ref)
+    packs.callback(member.pack.close)
+    return member
+
+
+def _tweak_files(paths, packs):
+    for ref in paths:
+        p = Path(ref)
+        if p.is_dir():
+            yield from sorted(p.glob("*.json"))
+        elif core_pack.is_pack(p):
+            yield from packs.enter_context(core_pack.TweakPack(p)).members()
+        else:
+            yield _tweak_source(ref, packs)
+
+
+def cmd_plan(args):
+    # Read-only: no database, no backups, no catalog cache, no writes.
+    manager = core_manager.TweakManager()
+    failed = False
+    with ExitStack() as packs:
+        for path in _tweak_files(args.tweaks, packs):
+            try:
+                changes = manager.plan(path)
+            except Exception as e:
+                print(f"[ERROR] {path}: {e}")
+                failed = True
+                continue
+
+            if not changes:
+                print(f"[PLAN] {path}: no changes")
+                continue
+            print(f"[PLAN] {path}: {len(changes)} change(s)")
+            for change in changes:
+                current = ", ".join(f"{k}={v!r}" for k, v in change["current"].items())
+                print(f"  • {change['description']}  (current: {current})")
+    sys.exit(1 if failed else 0)
+
+
+def cmd_validate(args):
+    validator = TweakValidator()
+    with ExitStack() as packs:
+        sources = list(_tweak_files(args.tweaks, packs))
+        errors = validator.validate_many(sources, max_workers=args.workers)
+
+    if args.json:
+        print(json.dumps(errors, indent=2))
+    else:
+        for error in errors:
+            print(f"[ERROR] {error['file']}: {error['code']}: {error['message']}")
+        failed = len({error["file"] for error in errors})
+        print(f"[VALIDATE] {len(sources)} file(s), {failed} with errors, {len(errors)} error(s)")
+    sys.exit(1 if errors else 0)
+
+
+def cmd_search(args):
     manager = core_manager.TweakManager()
-    sys.exit(0 if manager.apply(Path(args.tweak)) else 1)
+    catalog = manager.catalog(Path(args.tweak_dir) if args.tweak_dir else None)
+
+    if args.query and "@" in args.query:
+        # An exact ID names one version, never its whole family.
+        entry = catalog.get(args.query)
+        entries = [entry] if entry else []
+    elif args.query:
+        entries = catalog.versions(args.query)
+        if not entries:
+            entry = catalog.resolve(args.query)
+            entries = [entry] if entry else []
+        elif args.latest:
+            entries = entries[-1:]
+    else:
+        entries = catalog.find(
+            tier=args.tier,
+            scope=args.scope,
+            risk_level=args.risk,
+            category=args.category,
+            latest_only=args.latest,
+        )
+
+    if not entries:
+        print("No matching tweaks.")
+        sys.exit(1)
+    for entry in entries:
+        tier = "-" if entry.tier is None else entry.tier
+        scope = ",".join(entry.scope) or "-"
+        legacy = "  (legacy)" if entry.is_legacy else ""
+        print(f"{entry.id:<40} tier {tier}  {entry.risk_level or '-':<6}  {scope:<20} {entry.path.name}{legacy}")
+    sys.exit(0)
+
+
+def cmd_apply_batch(args):
+    manager = core_manager.TweakManager(
+        step_timeout=args.step_timeout,
+        timeout=args.timeout,
+    )
+    with ExitStack() as packs:
+        try:
+            ok = manager.apply_batch(list(_tweak_files(args.tweaks, packs)))
+        except KeyboardInterrupt:
+            print("\n[CANCELLED] Batch interrupted; changes were rolled back.")
+            sys.exit(130)
+    sys.exit(0 if ok else 1)
+
+
+def cmd_converge(args):
+    manager = core_manager.TweakManager()
+    tweak_dir = Path(args.tweak_dir) if args.tweak_dir else None
+    sys.exit(0 if manager.converge(Path(args.profile), tweak_dir) else 1)
 
 
 def cmd_revert(args):
+    if args.all:
+        manager = core_manager.TweakManager(max_workers=args.workers)
+        tweak_dir = Path(args.tweak_dir) if args.tweak_dir else None
+        sys.exit(0 if manager.revert_all(tweak_dir) else 1)
+    if not args.tweak_id:
+        print("[ERROR] revert needs a tweak ID or --all.")
+        sys.exit(2)
     manager = core_manager.TweakManager()
     sys.exit(0 if manager.revert(args.tweak_id) else 1)
 
@@ -35,6 +173,27 @@ def cmd_list(args):
     sys.exit(0)
 
 
+def cmd_migrate(args):
+    db_path = Path(core_rollback.DB_PATH)
+    if args.dry_run and not db_path.exists():
+        # Opening a store would create the file (and its WAL side files).
+        print(f"[DRY RUN] No database at {db_path}; it is created at v{core_migrations.latest_version()} on first use.")
+        sys.exit(0)
+
+    # A bare store: shared stores would migrate on connect, defeating --dry-run.
+    store = HistoryStore(db_path)
+    steps = core_migrations.migrate(store, dry_run=args.dry_run)
+
+    if not steps:
+        print(f"Database is up to date (v{core_migrations.current_version(store)}).")
+    elif args.dry_run:
+        print(f"[DRY RUN] Pending migrations (v{core_migrations.current_version(store)} -> v{core_migrations.latest_version()}):")
+        for m in steps:
+            print(f"  • v{m.version}: {m.description}")
+    store.close()
+    sys.exit(0)
+
+
 def main():
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument("--log-file", type=str, default=None)
@@ -46,21 +205,80 @@ def main():
     sub = parser2.add_subparsers(dest="command")
 
     p_apply = sub.add_parser("apply")
-    p_apply.add_argument("tweak")
+    p_apply.add_argument("tweak", help="Tweak file, or <pack>.etpk#<tweak_id>")
+    p_apply.add_argument("--timeout", type=float, default=None,
+                         help="Abort and roll back if the apply takes longer (seconds)")
+    p_apply.add_argument("--step-timeout", type=float, default=None,
+                         help="Time budget for each action (seconds)")
+
+    p_batch = sub.add_parser("apply-batch")
+    p_batch.add_argument("tweaks", nargs="+", help="Tweak files, directories of tweak files or tweak packs")
+    p_batch.add_argument("--timeout", type=float, default=None,
+                         help="Abort and roll back the batch if it takes longer (seconds)")
+    p_batch.add_argument("--step-timeout", type=float, default=None,
+                         help="Time budget for each action (seconds)")
+
+    p_converge = sub.add_parser("converge")
+    p_converge.add_argument("profile", help="JSON list of tweak IDs, or {\"tweaks\": [...]}")
+    p_converge.add_argument("--tweak-dir", type=str, default=None,
+                            help="Directory holding the tweak files, or a tweak pack (default: tweaks/)")
+
+    p_plan = sub.add_parser("plan")
+    p_plan.add_argument("tweaks", nargs="+", help="Tweak files, directories of tweak files or tweak packs")
+
+    p_validate = sub.add_parser("validate")
+    p_validate.add_argument("tweaks", nargs="+", help="Tweak files, directories of tweak files or tweak packs")
+    p_validate.add_argument("--workers", type=int, default=None,
+                            help="Validation processes (default: CPU count, up to 8)")
+    p_validate.add_argument("--json", action="store_true",
+                            help="Print the errors as JSON")
+
+    p_search = sub.add_parser("search")
+    p_search.add_argument("query", nargs="?",
+                          help="Tweak ID, legacy ID or category.name (all versions)")
+    p_search.add_argument("--tier", type=int, default=None)
+    p_search.add_argument("--scope", type=str, default=None)
+    p_search.add_argument("--risk", type=str, default=None)
+    p_search.add_argument("--category", type=str, default=None)
+    p_search.add_argument("--latest", action="store_true",
+                          help="Only the highest version of each tweak")
+    p_search.add_argument("--tweak-dir", type=str, default=None,
+                          help="Directory holding the tweak files, or a tweak pack (default: tweaks/)")
 
     p_revert = sub.add_parser("revert")
-    p_revert.add_argument("tweak_id")
+    p_revert.add_argument("tweak_id", nargs="?")
+    p_revert.add_argument("--all", action="store_true",
+                          help="Revert every active tweak, dependents first")
+    p_revert.add_argument("--tweak-dir", type=str, default=None,
+                          help="Tweak files declaring dependencies, or a tweak pack (default: tweaks/)")
+    p_revert.add_argument("--workers", type=int, default=None,
+                          help="Run rollbacks on independent resources concurrently")
 
     sub.add_parser("list")
 
+    p_migrate = sub.add_parser("migrate")
+    p_migrate.add_argument("--dry-run", action="store_true")
+
     args = parser2.parse_args(unknown)
 
     if args.command == "apply":
         cmd_apply(args)
+    elif args.command == "apply-batch":
+        cmd_apply_batch(args)
+    elif args.command == "converge":
+        cmd_converge(args)
+    elif args.command == "plan":
+        cmd_plan(args)
+    elif args.command == "validate":
+        cmd_validate(args)
+    elif args.command == "search":
+        cmd_search(args)
     elif args.command == "revert":
         cmd_revert(args)
     elif args.command == "list":
         cmd_list(args)
+    elif args.command == "migrate":
+        cmd_migrate(args)
     else:
         parser2.print_help()
         sys.exit(1)
@@ -1,3 +1,5 @@
+import importlib
+
 from .base import Action, ActionSnapshot
 from .factory import (
     create_action, 
@@ -5,12 +7,26 @@ from .factory import (
     get_available_action_types,
     ACTION_REGISTRY
 )
-from .registry_action import RegistryAction
 from .verify_action import RegistryVerifyAction, create_verify_action
 
-from .service_action import ServiceAction
-from .powercfg_action import PowerCfgAction
-from .bcdedit_action import BcdEditAction
+# Concrete actions load on first attribute access (PEP 562) so importing the
+# package does not pull in win32service or the subprocess-based actions.
+_LAZY_EXPORTS = {
+    'RegistryAction': '.registry_action',
+    'ServiceAction': '.service_action',
+    'PowerCfgAction': '.powercfg_action',
+    'BcdEditAction': '.bcdedit_action',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'Action',
@@ -25,4 +41,4 @@ __all__ = [
     'ServiceAction',
     'PowerCfgAction',
     'BcdEditAction',
-]
\ No newline at end of file
+]
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 
 class ActionSnapshot:
@@ -46,6 +46,52 @@ class Action(ABC):
     
     def get_description(self) -> str:
         return f"{self.action_type} action"
+
+    def resources(self) -> Optional[FrozenSet[Tuple[str, ...]]]:
+        """
+        System resources apply/rollback write, as name paths (see
+        `core.executor`). None means unknown: the action never runs
+        concurrently with anything else.
+        """
+        return None
+
+    def target(self) -> Optional[Tuple[str, ...]]:
+        """
+        Identity of the single value `apply()` writes; actions with equal
+        targets write the same value. None means unknown.
+        """
+        return None
+
+    def is_noop(self, snapshot: ActionSnapshot) -> bool:
+        """
+        True when the state recorded in `snapshot` already equals what
+        `apply()` would leave, so the write can be skipped. Only consulted
+        when `target()` is known. Default: unknown.
+        """
+        return False
+
+    def rollback_is_noop(self, snapshot: ActionSnapshot) -> bool:
+        """
+        True when the live state already equals the state `rollback(snapshot)`
+        restores. May read the system, never writes. Default: unknown.
+        """
+        return False
+
+    @classmethod
+    def snapshot_batch(cls, actions: List['Action']) -> List[ActionSnapshot]:
+        """
+        Snapshot several actions of this type, in order. Subclasses override
+        it to share system reads; results must equal per-action `snapshot()`.
+        """
+        return [action.snapshot() for action in actions]
+
+    @classmethod
+    def preview_batch(cls, actions: List['Action']) -> List[ActionSnapshot]:
+        """
+        Read-only `snapshot_batch` for planning: same current values, but
+        nothing may be written (no backup files). Defaults to `snapshot_batch`.
+        """
+        return cls.snapshot_batch(actions)
     
     @classmethod
     @abstractmethod
@@ -1,7 +1,6 @@
-import subprocess
-import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, Optional, Tuple
 from .base import Action, ActionSnapshot
+from .. import bcdedit
 
 
 class BcdEditAction(Action):
@@ -20,27 +19,14 @@ class BcdEditAction(Action):
         self.delete_value = definition.get("delete", False)
 
     def _exec_bcdedit(self, args: list) -> str:
-        result = subprocess.run(
-            ["bcdedit.exe"] + args,
-            capture_output=True,
-            text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW
-        )
-        if result.returncode != 0:
-             raise RuntimeError(f"bcdedit failed with code {result.returncode}: {result.stderr}")
-        return result.stdout
+        return bcdedit.run(args)
 
     def _find_value_in_enum(self, output: str, datatype: str) -> Optional[str]:
-        pattern = re.compile(rf"^{re.escape(datatype)}\s+(.*)$", re.MULTILINE)
-        match = pattern.search(output)
-        if match:
-            val = match.group(1).strip()
-            return val if val else None 
-        return None
+        return bcdedit.find_value(bcdedit.parse_enum(output), datatype)
 
     def snapshot(self) -> ActionSnapshot:
-        output = self._exec_bcdedit(["/enum", self.id_type])
-        old_value = self._find_value_in_enum(output, self.datatype)
+        # Served from the command's enumeration cache when one is active.
+        old_value = bcdedit.query_value(self.id_type, self.datatype)
         
         return ActionSnapshot("bcdedit", {
             "id_type": self.id_type,
@@ -56,8 +42,7 @@ class BcdEditAction(Action):
 
     def verify(self) -> bool:
         try:
-            output = self._exec_bcdedit(["/enum", self.id_type])
-            current_stored = self._find_value_in_enum(output, self.datatype)
+            current_stored = bcdedit.query_value(self.id_type, self.datatype)
             
             if self.delete_value:
                 return current_stored is None
@@ -66,6 +51,23 @@ class BcdEditAction(Action):
         except Exception as e:
             raise RuntimeError(f"BCD verification failed: {e}")
 
+    def target(self) -> Tuple[str, ...]:
+        return ("bcdedit", self.id_type.lower(), self.datatype.lower())
+
+    def is_noop(self, snapshot: ActionSnapshot) -> bool:
+        old_value = snapshot.metadata.get("old_value")
+        if self.delete_value:
+            return old_value is None
+        return self.value is None or old_value == self.value
+
+    def rollback_is_noop(self, snapshot: ActionSnapshot) -> bool:
+        meta = snapshot.metadata
+        try:
+            current = bcdedit.query_value(meta["id_type"], meta["datatype"])
+        except Exception:
+            return False
+        return current == meta.get("old_value")
+
     def rollback(self, snapshot: ActionSnapshot) -> None:
         meta = snapshot.metadata
         old_val = meta.get("old_value")
@@ -78,6 +80,9 @@ class BcdEditAction(Action):
         else:
             self._exec_bcdedit(["/set", meta["id_type"], meta["datatype"], old_val])
 
+    def resources(self) -> FrozenSet[Tuple[str, ...]]:
+        return frozenset({("bcdedit", self.id_type.lower(), self.datatype.lower())})
+
     def get_description(self) -> str:
         if self.delete_value:
             return f"BCD Delete {self.datatype}"
@@ -1,19 +1,44 @@
-from typing import Dict, Any, Type
+import importlib
+from typing import Dict, Any, Iterator, Mapping, Tuple, Type
 from .base import Action, ActionSnapshot
-from .registry_action import RegistryAction
-from .service_action import ServiceAction
-from .powercfg_action import PowerCfgAction
-from .bcdedit_action import BcdEditAction
+
+
+class _LazyActionRegistry(Mapping):
+    """
+    action type -> Action class, importing each action module on first lookup.
+
+    Keeps `import core.actions` free of platform bindings (win32service,
+    winreg) and of modules a command never uses.
+    """
+
+    def __init__(self, modules: Dict[str, Tuple[str, str]]) -> None:
+        self._modules = modules
+        self._classes: Dict[str, Type[Action]] = {}
+
+    def __getitem__(self, action_type: str) -> Type[Action]:
+        cls = self._classes.get(action_type)
+        if cls is None:
+            module_name, class_name = self._modules[action_type]
+            module = importlib.import_module(module_name, __package__)
+            cls = getattr(module, class_name)
+            self._classes[action_type] = cls
+        return cls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        return len(self._modules)
 
 
 # Registry of all available action types
-ACTION_REGISTRY: Dict[str, Type[Action]] = {
-    "registry": RegistryAction,
-    "service": ServiceAction,
-    "powercfg": PowerCfgAction,
-    "bcdedit": BcdEditAction,
+ACTION_REGISTRY: Mapping[str, Type[Action]] = _LazyActionRegistry({
+    "registry": (".registry_action", "RegistryAction"),
+    "service": (".service_action", "ServiceAction"),
+    "powercfg": (".powercfg_action", "PowerCfgAction"),
+    "bcdedit": (".bcdedit_action", "BcdEditAction"),
     # Future...
-}
+})
 
 
 def create_action(definition: Dict[str, Any]) -> Action:
@@ -44,4 +69,4 @@ def create_action_from_snapshot(snapshot: ActionSnapshot) -> Action:
 
 
 def get_available_action_types() -> list:
-    return list(ACTION_REGISTRY.keys())
\ No newline at end of file
+    return list(ACTION_REGISTRY.keys())
@@ -1,10 +1,13 @@
-import subprocess
-import re
-from typing import Any, Dict, Tuple
+import uuid
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from .base import Action, ActionSnapshot
+from .. import powercfg
 
 
 class PowerCfgAction(Action):
+
+    SNAPSHOT_MODES = {"setting", "scheme"}
     
     def __init__(self, definition: Dict[str, Any]) -> None:
         super().__init__(definition)
@@ -13,47 +16,84 @@ class PowerCfgAction(Action):
         self.setting_guid = definition["setting_guid"]
         self.value_ac = definition.get("value_ac")
         self.value_dc = definition.get("value_dc")
+        # "scheme": back up the whole scheme with /export and restore it
+        # with a single /import, however many settings the tweak touches.
+        self.snapshot_mode = definition.get("snapshot_mode", "setting")
+        if self.snapshot_mode not in self.SNAPSHOT_MODES:
+            raise ValueError(
+                f"Invalid powercfg snapshot_mode: '{self.snapshot_mode}'. "
+                f"Valid modes: {', '.join(sorted(self.SNAPSHOT_MODES))}"
+            )
 
     def _exec_powercfg(self, args: list) -> str:
-        result = subprocess.run(
-            ["powercfg.exe"] + args,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
+        return powercfg.run(args)
 
-    def _parse_query_values(self, output: str) -> Tuple[int, int]:
-        # Pattern for AC: "AC Setting Index: 0x0000000a"
-        ac_match = re.search(r"AC Setting Index:\s*0x([0-9a-fA-F]+)", output)
-        # Pattern for DC: "DC Setting Index: 0x00000005"
-        dc_match = re.search(r"DC Setting Index:\s*0x([0-9a-fA-F]+)", output)
+    def _query_values(self) -> Tuple[int, int]:
+        # Served from the command's scheme-wide query when one is active.
+        ac, dc = powercfg.query_setting(
+            self.scheme_guid, self.subgroup_guid, self.setting_guid
+        )
         
-        if not ac_match or not dc_match:
+        if ac is None or dc is None:
             raise ValueError(
                 f"Failed to parse powercfg output for {self.setting_guid}. "
                 "Ensure GUIDs are correct and scheme exists."
             )
             
-        return (
-            int(ac_match.group(1), 16),
-            int(dc_match.group(1), 16)
-        )
+        return ac, dc
 
     def snapshot(self) -> ActionSnapshot:
-        output = self._exec_powercfg([
-            "/query", self.scheme_guid, self.subgroup_guid, self.setting_guid
-        ])
-        
-        old_ac, old_dc = self._parse_query_values(output)
-        
-        return ActionSnapshot("powercfg", {
+        backup = self._export_scheme() if self.snapshot_mode == "scheme" else None
+        return self._make_snapshot(backup)
+
+    @classmethod
+    def snapshot_batch(cls, actions: List["PowerCfgAction"]) -> List[ActionSnapshot]:
+        # Scheme-mode actions on the same scheme share one backup file.
+        backups: Dict[str, Tuple[str, str]] = {}
+        snapshots = []
+        try:
+            for action in actions:
+                backup = None
+                if action.snapshot_mode == "scheme":
+                    key = action.scheme_guid.lower()
+                    if key not in backups:
+                        backups[key] = action._export_scheme()
+                    backup = backups[key]
+                snapshots.append(action._make_snapshot(backup))
+        except BaseException:
+            # No snapshot will reference these files.
+            for _, path in backups.values():
+                Path(path).unlink(missing_ok=True)
+            raise
+        return snapshots
+
+    @classmethod
+    def preview_batch(cls, actions: List["PowerCfgAction"]) -> List[ActionSnapshot]:
+        # Current values only; planning must not export scheme backups.
+        return [action._make_snapshot(None) for action in actions]
+
+    def _export_scheme(self) -> Tuple[str, str]:
+        from .. import rollback
+
+        guid = powercfg.resolve_scheme(self.scheme_guid)
+        path = rollback.data_dir() / "backups" / "powercfg" / f"{guid}-{uuid.uuid4().hex}.pow"
+        powercfg.export_scheme(guid, path)
+        return guid, str(path)
+
+    def _make_snapshot(self, backup: Optional[Tuple[str, str]]) -> ActionSnapshot:
+        old_ac, old_dc = self._query_values()
+
+        meta = {
             "scheme_guid": self.scheme_guid,
             "subgroup_guid": self.subgroup_guid,
             "setting_guid": self.setting_guid,
             "old_value_ac": old_ac,
             "old_value_dc": old_dc 
-        })
+        }
+        if backup is not None:
+            # Per-setting values stay as the fallback if the file is gone.
+            meta["backup_scheme_guid"], meta["backup_file"] = backup
+        return ActionSnapshot("powercfg", meta)
 
     def apply(self) -> None:
         if self.value_ac is not None:
@@ -72,10 +112,7 @@ class PowerCfgAction(Action):
 
     def verify(self) -> bool:
         try:
-            output = self._exec_powercfg([
-                "/query", self.scheme_guid, self.subgroup_guid, self.setting_guid
-            ])
-            current_ac, current_dc = self._parse_query_values(output)
+            current_ac, current_dc = self._query_values()
             
             if self.value_ac is not None and current_ac != self.value_ac:
                 return False
@@ -87,8 +124,44 @@ class PowerCfgAction(Action):
         except Exception:
             raise
 
+    def target(self) -> Optional[Tuple[str, ...]]:
+        if self.snapshot_mode == "scheme":
+            # Rollback re-imports the whole scheme, not one setting.
+            return None
+        return (
+            "powercfg",
+            self.scheme_guid.lower(),
+            self.subgroup_guid.lower(),
+            self.setting_guid.lower(),
+        )
+
+    def is_noop(self, snapshot: ActionSnapshot) -> bool:
+        # Scheme mode always writes: its rollback consumes the exported
+        # backup, which a skipped action would leave behind.
+        if self.snapshot_mode == "scheme":
+            return False
+        meta = snapshot.metadata
+        return (
+            (self.value_ac is None or meta["old_value_ac"] == self.value_ac)
+            and (self.value_dc is None or meta["old_value_dc"] == self.value_dc)
+        )
+
+    def rollback_is_noop(self, snapshot: ActionSnapshot) -> bool:
+        meta = snapshot.metadata
+        if meta.get("backup_file"):
+            return False
+        try:
+            current = self._query_values()
+        except Exception:
+            return False
+        return current == (meta["old_value_ac"], meta["old_value_dc"])
+
     def rollback(self, snapshot: ActionSnapshot) -> None:
         meta = snapshot.metadata
+
+        backup = meta.get("backup_file")
+        if backup and powercfg.restore_scheme(meta["backup_scheme_guid"], Path(backup)):
+            return
         
         self._exec_powercfg([
             "/setacvalueindex",
@@ -102,6 +175,17 @@ class PowerCfgAction(Action):
             str(meta["old_value_dc"])
         ])
 
+    def resources(self) -> FrozenSet[Tuple[str, ...]]:
+        if self.snapshot_mode == "scheme":
+            # Rollback re-imports the whole scheme.
+            return frozenset({("powercfg", self.scheme_guid.lower())})
+        return frozenset({(
+            "powercfg",
+            self.scheme_guid.lower(),
+            self.subgroup_guid.lower(),
+            self.setting_guid.lower(),
+        )})
+
     def get_description(self) -> str:
         parts = []
         if self.value_ac is not None: parts.append(f"AC:{self.value_ac}")
@@ -117,6 +201,7 @@ class PowerCfgAction(Action):
             "subgroup_guid": meta["subgroup_guid"],
             "setting_guid": meta["setting_guid"],
             "value_ac": meta["old_value_ac"],
-            "value_dc": meta["old_value_dc"]
+            "value_dc": meta["old_value_dc"],
+            "snapshot_mode": "scheme" if meta.get("backup_file") else "setting"
         }
         return cls(definition)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from .base import Action, ActionSnapshot
 from .. import registry
 
@@ -21,6 +21,32 @@ class RegistryAction(Action):
             subkey_existed = False
             old_value, old_type = None, None
 
+        return self._make_snapshot(old_value, old_type, subkey_existed)
+
+    @classmethod
+    def snapshot_batch(cls, actions: List["RegistryAction"]) -> List[ActionSnapshot]:
+        # One key open per distinct path instead of two per value.
+        groups: Dict[str, List[int]] = {}
+        for i, action in enumerate(actions):
+            groups.setdefault(action.path.lower(), []).append(i)
+
+        snapshots: List[ActionSnapshot] = [None] * len(actions)
+        for indices in groups.values():
+            path = actions[indices[0]].path
+            try:
+                subkey_existed, values = registry.get_values(
+                    path, [actions[i].key for i in indices]
+                )
+            except Exception:
+                subkey_existed, values = False, {}
+
+            for i in indices:
+                old_value, old_type = values.get(actions[i].key, (None, None))
+                snapshots[i] = actions[i]._make_snapshot(old_value, old_type, subkey_existed)
+
+        return snapshots
+
+    def _make_snapshot(self, old_value, old_type, subkey_existed: bool) -> ActionSnapshot:
         return ActionSnapshot("registry", {
             "path": self.path,
             "key": self.key,
@@ -49,6 +75,44 @@ class RegistryAction(Action):
         except Exception:
             return False
 
+    def target(self) -> Optional[Tuple[str, ...]]:
+        try:
+            hive, subkey = registry.parse_registry_path(self.path)
+        except ValueError:
+            return None
+        parts = [p.lower() for p in subkey.split("\\") if p]
+        return ("registry", str(hive), "\\".join(parts), self.key.lower())
+
+    def is_noop(self, snapshot: ActionSnapshot) -> bool:
+        meta = snapshot.metadata
+        expected_type = registry.REG_TYPES.get(self.value_type, self.value_type)
+        return (
+            meta["value_existed"]
+            and meta["old_value"] == self.value
+            and meta["old_type"] == expected_type
+        )
+
+    def rollback_is_noop(self, snapshot: ActionSnapshot) -> bool:
+        meta = snapshot.metadata
+        try:
+            subkey_exists, values = registry.get_values(meta["path"], [meta["key"]])
+        except Exception:
+            return False
+        current = values.get(meta["key"], (None, None))
+        if meta["value_existed"]:
+            return current == (meta["old_value"], meta["old_type"])
+        return current[1] is None and (meta["subkey_existed"] or not subkey_exists)
+
+    def resources(self) -> Optional[FrozenSet[Tuple[str, ...]]]:
+        # Whole key, not the value: rollback may delete the subkey, and a
+        # key conflicts with its parents and children.
+        try:
+            hive, subkey = registry.parse_registry_path(self.path)
+        except ValueError:
+            return None
+        parts = [p.lower() for p in subkey.split("\\") if p]
+        return frozenset({("registry", str(hive), *parts)})
+
     def rollback(self, snapshot: ActionSnapshot) -> None:
         meta = snapshot.metadata
 
@@ -68,6 +132,9 @@ class RegistryAction(Action):
                 except Exception:
                     pass
 
+    def get_description(self) -> str:
+        return f"Registry {self.path}\\{self.key} -> {self.value!r} ({self.value_type})"
+
     @classmethod
     def from_snapshot(cls, snapshot: ActionSnapshot) -> "RegistryAction":
         meta = snapshot.metadata
@@ -1,9 +1,13 @@
-import win32service
-import win32serviceutil
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet, Tuple
 from .base import Action, ActionSnapshot
 
 
+def _win32serviceutil():
+    # pywin32 is Windows-only; load it when a service is actually queried.
+    import win32serviceutil
+    return win32serviceutil
+
+
 class ServiceAction(Action):
 
     def __init__(self, definition: Dict[str, Any]) -> None:
@@ -12,7 +16,7 @@ class ServiceAction(Action):
 
     def snapshot(self) -> ActionSnapshot:
         try:
-            status = win32serviceutil.QueryServiceStatus(self.service_name)[1]
+            status = _win32serviceutil().QueryServiceStatus(self.service_name)[1]
             return ActionSnapshot("service", {
                 "service_name": self.service_name,
                 "old_status": status,
@@ -26,11 +30,14 @@ class ServiceAction(Action):
 
     def verify(self) -> bool:
         try:
-            win32serviceutil.QueryServiceStatus(self.service_name)
+            _win32serviceutil().QueryServiceStatus(self.service_name)
             return True
         except Exception:
             return False
 
+    def resources(self) -> FrozenSet[Tuple[str, ...]]:
+        return frozenset({("service", self.service_name.lower())})
+
     def rollback(self, snapshot: ActionSnapshot) -> None:
         meta = snapshot.metadata
         if meta.get("old_status") is None:
@@ -0,0 +1,146 @@
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from . import commands
+
+_RULE_RE = re.compile(r"^-{3,}\s*$")
+_FIELD_RE = re.compile(r"^(\S+)\s+(.*?)\s*$")
+
+# Verbs that leave the BCD store untouched (do not invalidate the cache).
+READ_ONLY_VERBS = {"/enum", "/v"}
+
+Entry = Dict[str, str]
+
+
+def run(args: List[str]) -> str:
+    """
+    Run bcdedit.exe and return stdout. Anything that may change the store
+    invalidates the active enumeration cache, before and after the
+    command: an enumeration from another thread while it runs may cache
+    the old values.
+    """
+    cache = _cache if args and args[0].lower() not in READ_ONLY_VERBS else None
+    if cache is not None:
+        cache.invalidate()
+    try:
+        return commands.run(["bcdedit.exe"] + args).stdout
+    finally:
+        if cache is not None:
+            cache.invalidate()
+
+
+def parse_enum(output: str) -> List[Entry]:
+    """
+    Parse `bcdedit /enum` output into one {datatype: value} dict per entry,
+    in output order, in a single pass.
+
+    Entries are separated by blank lines; the "Windows Boot Loader" style
+    heading and its dashed rule are skipped. Datatypes are lower-cased. For
+    multi-line values (displayorder, ...) only the first line is kept, as
+    the line-based lookup this replaces did.
+    """
+    entries: List[Entry] = []
+    current: Optional[Entry] = None
+    lines = output.splitlines()
+
+    for i, line in enumerate(lines):
+        if not line.strip():
+            current = None
+            continue
+        if _RULE_RE.match(line):
+            continue
+        if current is None:
+            current = {}
+            entries.append(current)
+            if i + 1 < len(lines) and _RULE_RE.match(lines[i + 1]):
+                continue
+        if line[0].isspace():
+            continue
+        m = _FIELD_RE.match(line)
+        if m:
+            current.setdefault(m.group(1).lower(), m.group(2))
+
+    return entries
+
+
+def find_value(entries: List[Entry], datatype: str) -> Optional[str]:
+    """First value of `datatype` across `entries`; None when absent or empty."""
+    key = datatype.lower()
+    for entry in entries:
+        if key in entry:
+            return entry[key] or None
+    return None
+
+
+class EnumCache:
+    """
+    Per-command BCD reader: `bcdedit /enum <id>` runs once per identifier
+    and is parsed once; every BcdEditAction snapshot and verify on that
+    identifier is served from the result until the next write.
+
+    Identifiers are queried individually rather than through `/enum all`
+    because aliases ({current}, {default}) are resolved by bcdedit itself.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, List[Entry]] = {}
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    def entries(self, id_type: str) -> List[Entry]:
+        key = id_type.lower()
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is None:
+                self.stats["enumerations"] += 1
+                entries = self._entries[key] = parse_enum(run(["/enum", id_type]))
+            else:
+                self.stats["hits"] += 1
+        return entries
+
+    def invalidate(self) -> None:
+        with self._lock:
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+
+
+_cache: Optional[EnumCache] = None
+_depth = 0
+_scope_lock = threading.Lock()
+
+
+def active_cache() -> Optional[EnumCache]:
+    return _cache
+
+
+@contextmanager
+def scope() -> Iterator[Optional[EnumCache]]:
+    """
+    Command-wide enumeration cache; nested scopes join the outermost one.
+    Outside a scope every lookup runs its own `/enum`.
+    """
+    global _cache, _depth
+    with _scope_lock:
+        if _cache is None:
+            _cache = EnumCache()
+        _depth += 1
+        cache = _cache
+    try:
+        yield cache
+    finally:
+        with _scope_lock:
+            _depth -= 1
+            if _depth == 0:
+                _cache = None
+
+
+def query_value(id_type: str, datatype: str) -> Optional[str]:
+    """Current value of `datatype` on entry `id_type` (None when unset)."""
+    cache = _cache
+    if cache is not None:
+        return find_value(cache.entries(id_type), datatype)
+    return find_value(parse_enum(run(["/enum", id_type])), datatype)
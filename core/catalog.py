@@ -0,0 +1,231 @@
+import bisect
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .catalog_cache import CatalogCache
+from .profile import default_tweak_source
+from .tweak_id import TweakID
+from .tweak_pack import PackMember, TweakPack, is_pack
+from .validation import TweakValidator, ValidationError
+
+Definition = Dict[str, Any]
+
+
+def version_key(version: str) -> Tuple[int, ...]:
+    """(1, 10) for "1.10", so versions order numerically."""
+    return tuple(int(part) for part in version.split("."))
+
+
+class CatalogEntry:
+    """One tweak file or pack member. `valid` is False for files the validator rejects (legacy)."""
+
+    __slots__ = ("path", "definition", "tweak_id", "valid", "error")
+
+    def __init__(
+        self,
+        path: Union[Path, PackMember],
+        definition: Definition,
+        valid: bool = True,
+        error: Optional[str] = None,
+    ) -> None:
+        self.path = path
+        self.definition = definition
+        self.tweak_id = TweakID.parse(definition["id"])
+        self.valid = valid
+        self.error = error
+
+    @property
+    def id(self) -> str:
+        return str(self.tweak_id)
+
+    @property
+    def is_legacy(self) -> bool:
+        return self.tweak_id.version is None
+
+    @property
+    def tier(self) -> Optional[int]:
+        return self.definition.get("tier")
+
+    @property
+    def risk_level(self) -> Optional[str]:
+        return self.definition.get("risk_level")
+
+    @property
+    def scope(self) -> List[str]:
+        return list(self.definition.get("scope") or [])
+
+    def __repr__(self) -> str:
+        return f"CatalogEntry('{self.id}', {self.path.name})"
+
+
+class TweakCatalog:
+    """
+    In-memory indexes over a directory of tweak files or a tweak pack.
+
+    `scan()` reads every `*.json` once (through the catalog cache, so
+    unchanged valid files skip parsing and validation) and indexes it by
+    ID, category, `category.name` (versions kept sorted), tier, scope, risk
+    level and legacy ID. Lookups are dict hits; `latest` reads the end of a
+    sorted list; `find` intersects the filter sets, smallest first.
+
+    Legacy files (`"id": "011"`) fail validation but are still indexed,
+    without tier/scope/risk. A modern tweak declaring `"legacy_id": "011"`
+    supersedes the legacy file for `resolve("011")`.
+    """
+
+    def __init__(
+        self,
+        tweak_dir: Optional[Path] = None,
+        cache: Optional[CatalogCache] = None,
+        validator: Optional[TweakValidator] = None,
+    ) -> None:
+        self.tweak_dir = Path(tweak_dir) if tweak_dir is not None else default_tweak_source()
+        self.cache = cache or CatalogCache()
+        self.validator = validator or TweakValidator()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._by_id: Dict[str, CatalogEntry] = {}
+        # "category.name" -> [(version_key, id)], ascending
+        self._versions: Dict[str, List[Tuple[Tuple[int, ...], str]]] = {}
+        self._by_category: Dict[str, Set[str]] = {}
+        self._by_tier: Dict[int, Set[str]] = {}
+        self._by_scope: Dict[str, Set[str]] = {}
+        self._by_risk: Dict[str, Set[str]] = {}
+        self._by_legacy: Dict[str, str] = {}
+
+    def scan(self) -> "TweakCatalog":
+        """
+        (Re)build the indexes. A pack is closed again when the scan ends:
+        entries keep their definitions, and their `path` only names the
+        member.
+        """
+        self._clear()
+        if is_pack(self.tweak_dir):
+            with TweakPack(self.tweak_dir) as pack:
+                self._scan(pack.members())
+        else:
+            self._scan(sorted(self.tweak_dir.glob("*.json")))
+        self.cache.flush()
+        return self
+
+    def _scan(self, sources: Iterable[Union[Path, PackMember]]) -> None:
+        for path in sources:
+            try:
+                entry = self._load(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"[WARN] Skipping unreadable tweak file {path}: {e}")
+                continue
+            if entry.id in self._by_id:
+                print(f"[WARN] Duplicate tweak ID {entry.id} in {path}; keeping {self._by_id[entry.id].path}")
+                continue
+            self._add(entry)
+
+    def _load(self, path: Union[Path, PackMember]) -> CatalogEntry:
+        if isinstance(path, PackMember):
+            definition = path.read()
+            try:
+                self.validator.validate_definition(definition)
+            except ValidationError as e:
+                return CatalogEntry(path, definition, valid=False, error=str(e))
+            return CatalogEntry(path, definition)
+        try:
+            return CatalogEntry(path, self.cache.load(path, self.validator.validate_definition))
+        except ValidationError as e:
+            with open(path, "r", encoding="utf-8") as f:
+                return CatalogEntry(path, json.load(f), valid=False, error=str(e))
+
+    def _add(self, entry: CatalogEntry) -> None:
+        tweak_id = entry.id
+        self._by_id[tweak_id] = entry
+
+        parsed = entry.tweak_id
+        if parsed.version is not None:
+            family = f"{parsed.category}.{parsed.name}"
+            bisect.insort(self._versions.setdefault(family, []), (version_key(parsed.version), tweak_id))
+        else:
+            self._by_legacy.setdefault(tweak_id, tweak_id)
+        category = parsed.category or entry.definition.get("category")
+        if category:
+            self._by_category.setdefault(category, set()).add(tweak_id)
+
+        legacy_id = entry.definition.get("legacy_id")
+        if legacy_id and parsed.version is not None:
+            current = self._by_legacy.get(legacy_id)
+            # A modern successor wins over the legacy file itself.
+            if current is None or self._by_id[current].is_legacy:
+                self._by_legacy[legacy_id] = tweak_id
+
+        if not entry.valid:
+            return
+        self._by_tier.setdefault(entry.tier, set()).add(tweak_id)
+        self._by_risk.setdefault(entry.risk_level, set()).add(tweak_id)
+        for scope in entry.scope:
+            self._by_scope.setdefault(scope, set()).add(tweak_id)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(sorted(self._by_id.values(), key=lambda e: e.id))
+
+    def __contains__(self, tweak_id: str) -> bool:
+        return tweak_id in self._by_id
+
+    def get(self, tweak_id: str) -> Optional[CatalogEntry]:
+        return self._by_id.get(tweak_id)
+
+    def versions(self, family: str) -> List[CatalogEntry]:
+        """Every version of `category.name`, oldest first."""
+        return [self._by_id[t] for _, t in self._versions.get(family, [])]
+
+    def latest(self, family: str) -> Optional[CatalogEntry]:
+        """Highest version of `category.name` (an `@version` suffix is ignored)."""
+        versions = self._versions.get(family.split("@", 1)[0])
+        return self._by_id[versions[-1][1]] if versions else None
+
+    def resolve(self, query: str) -> Optional[CatalogEntry]:
+        """Exact ID, else legacy ID (to its modern successor), else latest of `category.name`."""
+        entry = self._by_id.get(query)
+        if entry is not None and not entry.is_legacy:
+            return entry
+        legacy = self._by_legacy.get(query)
+        if legacy is not None:
+            return self._by_id[legacy]
+        return entry or self.latest(query)
+
+    def find(
+        self,
+        tier: Optional[int] = None,
+        scope: Optional[str] = None,
+        risk_level: Optional[str] = None,
+        category: Optional[str] = None,
+        latest_only: bool = False,
+    ) -> List[CatalogEntry]:
+        """Tweaks matching every given filter, sorted by ID."""
+        filters = [
+            index.get(value, set())
+            for index, value in (
+                (self._by_tier, tier),
+                (self._by_scope, scope),
+                (self._by_risk, risk_level),
+                (self._by_category, category),
+            )
+            if value is not None
+        ]
+        if filters:
+            filters.sort(key=len)
+            ids = set(filters[0]).intersection(*filters[1:])
+        else:
+            ids = set(self._by_id)
+
+        if latest_only:
+            ids = {t for t in ids if self._is_latest(t)}
+        return [self._by_id[t] for t in sorted(ids)]
+
+    def _is_latest(self, tweak_id: str) -> bool:
+        parsed = self._by_id[tweak_id].tweak_id
+        if parsed.version is None:
+            return True
+        return self._versions[f"{parsed.category}.{parsed.name}"][-1][1] == tweak_id
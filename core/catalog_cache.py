@@ -0,0 +1,129 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .constants import SCHEMA_VERSION
+
+Definition = Dict[str, Any]
+
+# Bump when validation or normalisation changes what gets stored.
+CACHE_VERSION = 1
+
+# A file modified this recently may change again within the same mtime tick,
+# so its stat alone is not trusted (the content hash decides).
+RACY_WINDOW = 2.0
+
+
+class CatalogCache:
+    """
+    Validated tweak definitions persisted across runs.
+
+    Entries are keyed by resolved file path and checked against the file's
+    mtime and size; when those differ the content hash decides, so a touched
+    but unchanged file is still a hit. A hit returns the stored definition,
+    already normalised by the validator (injected defaults included), without
+    parsing or validating. Invalid files are never stored.
+
+    `stats` counts hits (stat match), rehashes (hash match after a stat
+    change) and misses. Call `flush()` to persist new entries.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self._path = path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    @property
+    def path(self) -> Path:
+        # ENHANCER_CATALOG_CACHE=<file> moves the cache out of the data directory.
+        if self._path is None:
+            override = os.environ.get("ENHANCER_CATALOG_CACHE")
+            if override:
+                return Path(override)
+            from . import rollback
+            return rollback.data_dir() / "cache" / "tweak_catalog.json"
+        return Path(self._path)
+
+    def _load_entries(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION and data.get("schema_version") == SCHEMA_VERSION:
+                    self._entries = data["entries"]
+            except (OSError, ValueError, KeyError, AttributeError):
+                pass
+        return self._entries
+
+    def load(self, tweak_path: Path, validate: Callable[[Definition], None]) -> Definition:
+        """Validated definition of `tweak_path`; `validate` runs on misses only."""
+        key = str(Path(tweak_path).resolve())
+        st = os.stat(key)
+
+        with self._lock:
+            entries = self._load_entries()
+            entry = entries.get(key)
+            if (
+                entry is not None
+                and entry["mtime_ns"] == st.st_mtime_ns
+                and entry["size"] == st.st_size
+                and time.time() - st.st_mtime > RACY_WINDOW
+            ):
+                self.stats["hits"] += 1
+                return copy.deepcopy(entry["definition"])
+
+        with open(key, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None and entry["sha256"] == digest:
+                self.stats["rehashes"] += 1
+                entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+                self._dirty = True
+                return copy.deepcopy(entry["definition"])
+
+        self.stats["misses"] += 1
+        definition = json.loads(raw.decode("utf-8"))
+        validate(definition)
+
+        with self._lock:
+            entries[key] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "sha256": digest,
+                "definition": copy.deepcopy(definition),
+            }
+            self._dirty = True
+        return definition
+
+    def flush(self) -> None:
+        """Write the cache if anything changed (atomically replaces the file)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": CACHE_VERSION,
+                "schema_version": SCHEMA_VERSION,
+                "entries": self._entries,
+            }
+            path = self.path
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, path)
+                self._dirty = False
+            except OSError as e:
+                print(f"[WARN] Could not write tweak catalog cache: {e}")
@@ -0,0 +1,272 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import deadlines
+from .time import DEFAULT_TIME_PROVIDER as TIME
+
+# Upper bound for one external command; the step/command deadline may cut it shorter.
+TIMEOUT = 30.0
+
+# Processes allowed to run at once across all threads (ENHANCER_MAX_PROCESSES).
+MAX_PROCESSES = 4
+
+# Attempts after the first for failures that look transient.
+RETRIES = 2
+RETRY_BACKOFF = 0.2
+
+# Output fragments of failures worth retrying (store locked by another
+# process, spawn temporarily impossible).
+TRANSIENT_MARKERS = (
+    "being used by another process",
+    "resource temporarily unavailable",
+    "the device is not ready",
+)
+
+
+class CommandError(RuntimeError):
+    """A command exited with a non-zero code."""
+
+    def __init__(self, result: "CommandResult") -> None:
+        super().__init__(
+            f"{result.name} failed with code {result.returncode}: {result.stderr}"
+        )
+        self.result = result
+
+
+class CommandResult:
+
+    def __init__(self, argv: Sequence[str], returncode: int, stdout: str, stderr: str = "") -> None:
+        self.argv = list(argv)
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+    @property
+    def name(self) -> str:
+        return executable_name(self.argv)
+
+
+def executable_name(argv: Sequence[str]) -> str:
+    """"powercfg" for ["C:\\Windows\\System32\\powercfg.exe", ...]."""
+    name = str(argv[0]).replace("\\", "/").rsplit("/", 1)[-1].lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+class CommandRunner(ABC):
+    """Spawns one command. Timeouts raise DeadlineExceeded; exit codes are returned."""
+
+    @abstractmethod
+    def run(self, argv: List[str], timeout: Optional[float]) -> CommandResult:
+        pass
+
+
+class SubprocessRunner(CommandRunner):
+
+    def run(self, argv: List[str], timeout: Optional[float]) -> CommandResult:
+        import subprocess
+
+        try:
+            result = subprocess.run(
+                argv,
+                capture_output=True,
+                text=True,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise deadlines.DeadlineExceeded(
+                f"{executable_name(argv)} {argv[1] if len(argv) > 1 else ''} "
+                f"timed out after {timeout:.1f}s"
+            )
+        return CommandResult(argv, result.returncode, result.stdout or "", result.stderr or "")
+
+
+class ReplayRunner(CommandRunner):
+    """
+    Serves recorded output per argv, for tests and load tests without the
+    real binaries.
+
+    A recording is {"argv": [...], "stdout": str, "returncode": 0,
+    "stderr": ""}. A trailing "*" in argv matches any remaining arguments.
+    Several recordings of the same argv are served in order, the last one
+    repeating. The executable is matched by name, so "powercfg" also
+    serves "C:\\...\\powercfg.exe". `latency` (seconds) is slept per call to
+    model process start-up.
+    """
+
+    def __init__(self, recordings: List[Dict[str, Any]], latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: List[List[str]] = []
+        self._lock = threading.Lock()
+        self._exact: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        self._prefix: List[Tuple[Tuple[str, ...], Dict[str, Any]]] = []
+        for rec in recordings:
+            key = self._key(rec["argv"])
+            if key and key[-1] == "*":
+                self._prefix.append((key[:-1], rec))
+            else:
+                self._exact[key].append(rec)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], latency: float = 0.0) -> "ReplayRunner":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["recordings"], latency=latency)
+
+    @staticmethod
+    def _key(argv: Sequence[str]) -> Tuple[str, ...]:
+        return (executable_name(argv),) + tuple(str(a) for a in argv[1:])
+
+    def run(self, argv: List[str], timeout: Optional[float]) -> CommandResult:
+        key = self._key(argv)
+        with self._lock:
+            self.calls.append(list(argv))
+            queue = self._exact.get(key)
+            if queue:
+                rec = queue.pop(0) if len(queue) > 1 else queue[0]
+            else:
+                rec = next((r for p, r in self._prefix if key[:len(p)] == p), None)
+        if rec is None:
+            raise KeyError(f"No recording for {' '.join(argv)}")
+        if self.latency:
+            TIME.sleep(self.latency)
+        return CommandResult(argv, rec.get("returncode", 0), rec.get("stdout", ""), rec.get("stderr", ""))
+
+
+class CommandMetrics:
+    """Per-executable call counts and wall time."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"calls": 0, "failures": 0, "retries": 0, "total_s": 0.0, "max_s": 0.0}
+        )
+
+    def record(self, name: str, elapsed: float, failed: bool, retried: bool) -> None:
+        with self._lock:
+            s = self._stats[name]
+            s["calls"] += 1
+            s["failures"] += failed
+            s["retries"] += retried
+            s["total_s"] += elapsed
+            s["max_s"] = max(s["max_s"], elapsed)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(s) for name, s in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# ENHANCER_COMMAND_REPLAY=<recordings.json> serves every command from a
+# recording instead of spawning processes.
+_runner: Optional[CommandRunner] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+_slots_lock = threading.Lock()
+metrics = CommandMetrics()
+
+
+def get_runner() -> CommandRunner:
+    global _runner
+    if _runner is None:
+        replay = os.environ.get("ENHANCER_COMMAND_REPLAY")
+        _runner = ReplayRunner.from_file(replay) if replay else SubprocessRunner()
+    return _runner
+
+
+def set_runner(runner: Optional[CommandRunner]) -> None:
+    """Install `runner` for all external commands (None restores the default)."""
+    global _runner
+    _runner = runner
+
+
+@contextmanager
+def use_runner(runner: CommandRunner) -> Iterator[CommandRunner]:
+    global _runner
+    previous = _runner
+    _runner = runner
+    try:
+        yield runner
+    finally:
+        _runner = previous
+
+
+def _process_slots() -> threading.BoundedSemaphore:
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                limit = int(os.environ.get("ENHANCER_MAX_PROCESSES", MAX_PROCESSES))
+                _slots = threading.BoundedSemaphore(max(1, limit))
+    return _slots
+
+
+def set_max_processes(limit: int) -> None:
+    global _slots
+    with _slots_lock:
+        _slots = threading.BoundedSemaphore(max(1, limit))
+
+
+def _is_transient(result: CommandResult) -> bool:
+    text = f"{result.stdout}\n{result.stderr}".lower()
+    return any(marker in text for marker in TRANSIENT_MARKERS)
+
+
+def run(argv: List[str], check: bool = True, retries: Optional[int] = None) -> CommandResult:
+    """
+    Run an external command through the active runner.
+
+    At most `MAX_PROCESSES` run at once; the wait for a slot and the command
+    itself are bounded by `TIMEOUT` and the current deadline. Failures whose
+    output matches `TRANSIENT_MARKERS` (and OSErrors while spawning) are
+    retried with backoff. With `check`, a non-zero exit raises CommandError.
+    """
+    name = executable_name(argv)
+    attempts = 1 + (RETRIES if retries is None else retries)
+    slots = _process_slots()
+
+    for attempt in range(attempts):
+        if attempt:
+            TIME.sleep(min(RETRY_BACKOFF * 2 ** (attempt - 1), deadlines.remaining(TIMEOUT) or 0.0))
+
+        timeout = deadlines.remaining(TIMEOUT)
+        if not slots.acquire(timeout=-1 if timeout is None else timeout):
+            raise deadlines.DeadlineExceeded(f"{name}: no process slot within {timeout:.1f}s")
+
+        start = time.perf_counter()
+        try:
+            result = get_runner().run(argv, deadlines.remaining(TIMEOUT))
+        except deadlines.DeadlineExceeded:
+            # A TimeoutError, hence an OSError, but the budget is spent:
+            # retrying would only overrun the deadline further.
+            metrics.record(name, time.perf_counter() - start, True, attempt > 0)
+            raise
+        except OSError as e:
+            metrics.record(name, time.perf_counter() - start, True, attempt > 0)
+            # A missing binary will not appear on retry; spawn failures might.
+            if attempt + 1 < attempts and not isinstance(e, FileNotFoundError):
+                continue
+            raise
+        except BaseException:
+            metrics.record(name, time.perf_counter() - start, True, attempt > 0)
+            raise
+        finally:
+            slots.release()
+
+        failed = result.returncode != 0
+        metrics.record(name, time.perf_counter() - start, failed, attempt > 0)
+        if failed and attempt + 1 < attempts and _is_transient(result):
+            continue
+        if failed and check:
+            raise CommandError(result)
+        return result
+
+    raise AssertionError("unreachable")
@@ -0,0 +1,103 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """A step or command ran past its time budget."""
+    pass
+
+
+class Cancelled(Exception):
+    """The command was cancelled before the next step could start."""
+    pass
+
+
+class CancelToken:
+    """Thread-safe cancellation flag shared by every step of one command."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+# Monotonic instant the current work must finish by (None: unbounded) and
+# the token of the command it belongs to. Context variables, so the
+# executor hands them to worker threads by copying the context.
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+_TOKEN: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+@contextmanager
+def scope(timeout: Optional[float] = None, token: Optional[CancelToken] = None) -> Iterator[None]:
+    """
+    Bound the enclosed work to `timeout` seconds from now. Nested scopes can
+    only tighten the enclosing deadline. `token` replaces the current
+    cancellation token when given.
+    """
+    deadline = _DEADLINE.get()
+    if timeout is not None:
+        candidate = time.monotonic() + timeout
+        deadline = candidate if deadline is None else min(deadline, candidate)
+
+    d_reset = _DEADLINE.set(deadline)
+    t_reset = _TOKEN.set(token) if token is not None else None
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(d_reset)
+        if t_reset is not None:
+            _TOKEN.reset(t_reset)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    """
+    Drop the enclosing deadline and token. Rollback runs here: it must not be
+    cut short by the budget or cancellation of the command that failed.
+    """
+    d_reset = _DEADLINE.set(None)
+    t_reset = _TOKEN.set(None)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(d_reset)
+        _TOKEN.reset(t_reset)
+
+
+def current_token() -> Optional[CancelToken]:
+    return _TOKEN.get()
+
+
+def check() -> None:
+    """Raise if the current command was cancelled or is past its deadline."""
+    token = _TOKEN.get()
+    if token is not None and token.cancelled:
+        raise Cancelled(token.reason)
+    deadline = _DEADLINE.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded("Deadline exceeded")
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds a blocking call may take: the smaller of `default` and the time
+    left before the current deadline (None when both are unbounded).
+    Raises instead of returning a non-positive budget.
+    """
+    check()
+    deadline = _DEADLINE.get()
+    if deadline is None:
+        return default
+    left = deadline - time.monotonic()
+    return left if default is None else min(default, left)
@@ -1,12 +1,180 @@
-from typing import List, Any
+import contextvars
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from . import deadlines
+
+# A resource is a path of names, e.g. ("registry", hive, "software", "x").
+# Two resources conflict when one is a prefix of the other.
+Resource = Tuple[Any, ...]
+
+# ENHANCER_EXECUTOR_WORKERS > 1 runs independent steps concurrently.
+WORKERS_ENV = "ENHANCER_EXECUTOR_WORKERS"
+
+
+def default_workers() -> int:
+    try:
+        return max(1, int(os.environ.get(WORKERS_ENV, "1")))
+    except ValueError:
+        return 1
+
+
+def step_resources(step: Any) -> Optional[FrozenSet[Resource]]:
+    """
+    Resources a step touches, from its `resources` attribute.
+    None (attribute missing or None) means unknown: the step is a barrier.
+    """
+    resources = getattr(step, "resources", None)
+    if resources is None:
+        return None
+    return frozenset(resources)
+
+
+def build_dependencies(steps: List[Any]) -> List[Set[int]]:
+    """
+    For each step, the indices of earlier steps it must wait for: every
+    earlier step with a conflicting resource, and every step across a
+    barrier. Steps on disjoint resources get no edge between them.
+    """
+    deps: List[Set[int]] = []
+    exact: Dict[Resource, List[int]] = {}
+    under: Dict[Resource, List[int]] = {}
+    since_barrier: List[int] = []
+    barrier: Optional[int] = None
+
+    for i, step in enumerate(steps):
+        resources = step_resources(step)
+
+        if resources is None:
+            step_deps = set(since_barrier)
+            if barrier is not None:
+                step_deps.add(barrier)
+            deps.append(step_deps)
+            barrier = i
+            since_barrier = []
+            exact.clear()
+            under.clear()
+            continue
+
+        step_deps: Set[int] = set()
+        if barrier is not None:
+            step_deps.add(barrier)
+        for res in resources:
+            for k in range(1, len(res) + 1):
+                step_deps.update(exact.get(res[:k], ()))
+            step_deps.update(under.get(res, ()))
+
+        for res in resources:
+            exact.setdefault(res, []).append(i)
+            for k in range(1, len(res)):
+                under.setdefault(res[:k], []).append(i)
+
+        step_deps.discard(i)
+        deps.append(step_deps)
+        since_barrier.append(i)
+
+    return deps
+
+
+def _run(step: Any) -> Any:
+    if hasattr(step, 'execute'):
+        return step.execute()
+    return step()
+
 
 class Executor:
+    """
+    Runs steps and returns their results in step order.
+
+    With one worker (the default) steps run strictly one after another.
+    With more, a conflict graph is built from each step's `resources`:
+    steps touching overlapping resources keep their relative order, the
+    rest run concurrently on a thread pool. The first failing step (in
+    step order) is re-raised once running steps finish; no new step starts
+    after a failure.
+
+    Before each step the current deadline and cancellation token are
+    checked (`core.deadlines`); each step runs inside its own
+    `step_timeout` scope, which blocking calls (subprocesses) honour.
+    Per-step wall times are left in `timings`.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, step_timeout: Optional[float] = None) -> None:
+        self.max_workers = default_workers() if max_workers is None else max(1, max_workers)
+        self.step_timeout = step_timeout
+        self.timings: List[Optional[float]] = []
+
+    def _run_step(self, index: int, step: Any) -> Any:
+        deadlines.check()
+        start = time.perf_counter()
+        try:
+            with deadlines.scope(self.step_timeout):
+                return _run(step)
+        finally:
+            self.timings[index] = time.perf_counter() - start
 
     def run_steps(self, steps: List[Any]) -> List[Any]:
-        results = []
-        for step in steps:
-            if hasattr(step, 'execute'):
-                results.append(step.execute())
-            else:
-                results.append(step())
+        self.timings = [None] * len(steps)
+        if self.max_workers <= 1 or len(steps) <= 1:
+            results = []
+            for i, step in enumerate(steps):
+                results.append(self._run_step(i, step))
+            return results
+        return self._run_parallel(steps)
+
+    def _run_parallel(self, steps: List[Any]) -> List[Any]:
+        deps = build_dependencies(steps)
+        waiting = [len(d) for d in deps]
+        dependents: List[List[int]] = [[] for _ in steps]
+        for i, step_deps in enumerate(deps):
+            for j in step_deps:
+                dependents[j].append(i)
+
+        results: List[Any] = [None] * len(steps)
+        errors: Dict[int, BaseException] = {}
+        ready = [i for i, n in enumerate(waiting) if n == 0]
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="executor"
+        ) as pool:
+            running = {}
+            try:
+                while ready or running:
+                    if not errors:
+                        for i in ready:
+                            # Each worker sees the caller's deadline and token.
+                            ctx = contextvars.copy_context()
+                            running[pool.submit(ctx.run, self._run_step, i, steps[i])] = i
+                    ready = []
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i = running.pop(future)
+                        try:
+                            results[i] = future.result()
+                        except BaseException as e:
+                            errors[i] = e
+                            continue
+                        for d in dependents[i]:
+                            waiting[d] -= 1
+                            if waiting[d] == 0:
+                                ready.append(d)
+                    ready.sort()
+            except KeyboardInterrupt:
+                # Steps already running cannot be interrupted from here: the
+                # token stops their next blocking call, nothing new starts,
+                # and the pool drains on exit.
+                token = deadlines.current_token()
+                if token is not None:
+                    token.cancel("interrupted")
+                for future in running:
+                    future.cancel()
+                raise
+
+        if errors:
+            raise errors[min(errors)]
         return results
@@ -0,0 +1,208 @@
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+sqlite3.register_adapter(datetime, lambda dt: dt.isoformat())
+sqlite3.register_converter(
+    "TIMESTAMP", lambda s: datetime.fromisoformat(s.decode())
+)
+
+
+class HistoryStore:
+    """
+    Long-lived SQLite access point for history and state persistence.
+
+    One connection is opened per thread on first use and reused for every
+    statement afterwards, so a command pays the connect/WAL/schema cost once
+    instead of once per call. Statements are served from sqlite3's
+    per-connection statement cache.
+
+    Nothing touches the database file until the first statement; the
+    optional `initializer` (schema migration for shared stores) runs once,
+    right after that first connection is opened.
+
+    Connections run in autocommit mode: a bare `execute()` is durable on
+    return, exactly like the former connect/commit/close helpers. Multi
+    statement work goes through `transaction()`, which nests via SAVEPOINTs.
+    """
+
+    CONNECT_TIMEOUT = 10.0
+    STATEMENT_CACHE_SIZE = 128
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        initializer: Optional[Callable[["HistoryStore"], None]] = None,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self._initializer = initializer
+        self._initialized = initializer is None
+        self._initializing = False
+        self._init_lock = threading.RLock()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self.stats: Dict[str, int] = {
+            "connections_opened": 0,
+            "statements": 0,
+            "commits": 0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.CONNECT_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock:
+            self._connections.append(conn)
+            self.stats["connections_opened"] += 1
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+            self.ensure_initialized()
+        return conn
+
+    def ensure_initialized(self) -> None:
+        if self._initialized:
+            return
+        with self._init_lock:
+            # Re-entry from the initializer's own statements is a no-op.
+            if self._initialized or self._initializing:
+                return
+            self._initializing = True
+            try:
+                self._initializer(self)
+                self._initialized = True
+            finally:
+                self._initializing = False
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        conn = self.connection()
+        before = conn.total_changes
+        cursor = conn.execute(sql, params)
+        self.stats["statements"] += 1
+        if self._local.depth == 0 and conn.total_changes != before:
+            self.stats["commits"] += 1
+        return cursor
+
+    def executemany(self, sql: str, rows: Sequence[Sequence[Any]]) -> sqlite3.Cursor:
+        conn = self.connection()
+        before = conn.total_changes
+        cursor = conn.executemany(sql, rows)
+        self.stats["statements"] += 1
+        if self._local.depth == 0 and conn.total_changes != before:
+            self.stats["commits"] += 1
+        return cursor
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return self.execute(sql, params).fetchone()
+
+    def query_all(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return self.execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Group statements into one atomic unit.
+
+        The outermost block issues BEGIN (IMMEDIATE when requested) and a
+        single COMMIT. Inner blocks become SAVEPOINTs, so a failing inner
+        block only undoes its own statements.
+        """
+        conn = self.connection()
+        depth = self._local.depth
+        savepoint = f"sp_{depth}"
+
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
+
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                conn.execute("ROLLBACK")
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+
+        self._local.depth = depth
+        if depth == 0:
+            conn.execute("COMMIT")
+            self.stats["commits"] += 1
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+
+    def in_transaction(self) -> bool:
+        return getattr(self._local, "depth", 0) > 0
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+_STORES: Dict[Path, HistoryStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _migrate(store: HistoryStore) -> None:
+    from .migrations import migrate
+    migrate(store)
+
+
+def get_store(db_path: Union[str, Path]) -> HistoryStore:
+    """
+    Return the shared store for `db_path`, creating it on first use.
+
+    Shared stores migrate the schema on their first connection.
+    """
+    key = Path(db_path)
+    store = _STORES.get(key)
+    if store is None:
+        with _STORES_LOCK:
+            store = _STORES.get(key)
+            if store is None:
+                store = HistoryStore(key, initializer=_migrate)
+                _STORES[key] = store
+    return store
+
+
+def close_store(db_path: Union[str, Path]) -> None:
+    with _STORES_LOCK:
+        store = _STORES.pop(Path(db_path), None)
+    if store is not None:
+        store.close()
+
+
+def close_all_stores() -> None:
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+        _STORES.clear()
+    for store in stores:
+        store.close()
+
+
+atexit.register(close_all_stores)
@@ -1,24 +1,151 @@
-import sqlite3
-from pathlib import Path
-
-DB_PATH = Path(__file__).parent.parent / "enhancer.db"
-
-def migrate_to_v2():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("PRAGMA table_info(tweak_history)")
-    columns = [info[1] for info in cursor.fetchall()]
-    
+from typing import Callable, List
+
+from .history_store import HistoryStore
+
+
+class Migration:
+    """One ordered schema step. `version` is the PRAGMA user_version it yields."""
+
+    def __init__(self, version: int, description: str, up: Callable[[HistoryStore], None]):
+        self.version = version
+        self.description = description
+        self.up = up
+
+    def __repr__(self) -> str:
+        return f"Migration(v{self.version}: {self.description})"
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register `fn` as the step producing schema `version`. Versions must be contiguous."""
+    def decorator(fn: Callable[[HistoryStore], None]):
+        expected = len(MIGRATIONS) + 1
+        if version != expected:
+            raise ValueError(
+                f"Migration v{version} registered out of order; expected v{expected}."
+            )
+        MIGRATIONS.append(Migration(version, description, fn))
+        return fn
+    return decorator
+
+
+def _columns(store: HistoryStore, table: str) -> List[str]:
+    return [info[1] for info in store.query_all(f"PRAGMA table_info({table})")]
+
+
+@migration(1, "base schema (tweak_history, snapshots, snapshots_v2)")
+def _v1_base_schema(store: HistoryStore) -> None:
+    store.execute("""
+        CREATE TABLE IF NOT EXISTS tweak_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tweak_id TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL,
+            reverted_at TIMESTAMP,
+            verified_at TIMESTAMP,
+            status TEXT NOT NULL,
+            error_message TEXT,
+            schema_version INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+
+    store.execute("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            history_id INTEGER NOT NULL,
+            registry_path TEXT NOT NULL,
+            key_name TEXT NOT NULL,
+            old_value TEXT,
+            old_type INTEGER,
+            value_existed BOOLEAN NOT NULL,
+            subkey_existed BOOLEAN NOT NULL,
+            FOREIGN KEY (history_id) REFERENCES tweak_history(id)
+        )
+    """)
+
+    store.execute("""
+        CREATE TABLE IF NOT EXISTS snapshots_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            history_id INTEGER NOT NULL,
+            action_type TEXT NOT NULL,
+            metadata_json TEXT NOT NULL,
+            FOREIGN KEY (history_id) REFERENCES tweak_history(id)
+        )
+    """)
+
+
+@migration(2, "tweak_history.schema_version and verified_at on pre-v2 databases")
+def _v2_history_columns(store: HistoryStore) -> None:
+    columns = _columns(store, "tweak_history")
+
     if "schema_version" not in columns:
-        print("[MIGRATION] Adding 'schema_version' column...")
-        cursor.execute("ALTER TABLE tweak_history ADD COLUMN schema_version TEXT")
-        cursor.execute("UPDATE tweak_history SET schema_version = '1' WHERE schema_version IS NULL")
-    
+        store.execute("ALTER TABLE tweak_history ADD COLUMN schema_version TEXT")
+        store.execute("UPDATE tweak_history SET schema_version = '1' WHERE schema_version IS NULL")
+
     if "verified_at" not in columns:
-        print("[MIGRATION] Adding 'verified_at' column...")
-        cursor.execute("ALTER TABLE tweak_history ADD COLUMN verified_at TIMESTAMP")
-    
-    conn.commit()
-    conn.close()
-    print("[MIGRATION] Database upgraded to v2 successfully.")
\ No newline at end of file
+        store.execute("ALTER TABLE tweak_history ADD COLUMN verified_at TIMESTAMP")
+
+
+@migration(3, "indexes for tweak_id / status lookups and snapshots_v2.history_id")
+def _v3_lookup_indexes(store: HistoryStore) -> None:
+    # get_history_by_tweak_id / get_latest_history_by_tweak_id:
+    # equality on tweak_id, ordered by applied_at, covering status.
+    store.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tweak_history_tweak_id
+        ON tweak_history (tweak_id, applied_at, status)
+    """)
+    # get_active_tweaks and the recovery scan: equality / IN on status,
+    # ordered by applied_at, covering tweak_id (id is the rowid).
+    store.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tweak_history_status
+        ON tweak_history (status, applied_at, tweak_id)
+    """)
+    # get_snapshots_v2, clear_snapshots and the REVERTED cleanup; rows come
+    # back in rowid order, which is the ORDER BY id the readers need.
+    store.execute("""
+        CREATE INDEX IF NOT EXISTS idx_snapshots_v2_history_id
+        ON snapshots_v2 (history_id)
+    """)
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(store: HistoryStore) -> int:
+    return store.query_one("PRAGMA user_version")[0]
+
+
+def pending_migrations(store: HistoryStore) -> List[Migration]:
+    version = current_version(store)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def migrate(store: HistoryStore, dry_run: bool = False) -> List[Migration]:
+    """
+    Bring the database up to `latest_version()`.
+
+    Steady state is a single `PRAGMA user_version` read. Pending steps run in
+    one IMMEDIATE transaction (the version is re-read under the write lock, so
+    concurrent processes cannot apply a step twice) and `user_version` is
+    bumped after each one.
+
+    Returns the migrations that were applied, or with `dry_run=True` the ones
+    that would be, without touching the database.
+    """
+    if current_version(store) >= latest_version():
+        return []
+
+    if dry_run:
+        return pending_migrations(store)
+
+    applied: List[Migration] = []
+    with store.transaction(immediate=True):
+        for m in pending_migrations(store):
+            print(f"[MIGRATION] v{m.version}: {m.description}")
+            m.up(store)
+            store.execute(f"PRAGMA user_version = {int(m.version)}")
+            applied.append(m)
+
+    return applied
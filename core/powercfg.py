@@ -0,0 +1,230 @@
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from . import commands
+
+_GUID = r"([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})"
+_SCHEME_RE = re.compile(r"Power Scheme GUID:\s*" + _GUID)
+_SUBGROUP_RE = re.compile(r"Subgroup GUID:\s*" + _GUID)
+_SETTING_RE = re.compile(r"Power Setting GUID:\s*" + _GUID)
+_ALIAS_RE = re.compile(r"GUID Alias:\s*(\S+)")
+_GUID_RE = re.compile(_GUID)
+# "Current AC Power Setting Index: 0x0000000a" (older builds: "AC Setting Index")
+_INDEX_RE = re.compile(r"(AC|DC)(?: Power)? Setting Index:\s*0x([0-9a-fA-F]+)")
+
+SettingValues = Tuple[int, int]
+
+# Verbs that leave power settings untouched (do not invalidate the cache).
+READ_ONLY_VERBS = {"/query", "/export", "/list", "/getactivescheme"}
+
+
+def run(args: List[str]) -> str:
+    """
+    Run powercfg.exe and return stdout. Anything that may change settings
+    invalidates the active scheme cache, before and after the command: a
+    query from another thread while it runs may cache the old values.
+    """
+    cache = _cache if args and args[0].lower() not in READ_ONLY_VERBS else None
+    if cache is not None:
+        cache.invalidate()
+    try:
+        return commands.run(["powercfg.exe"] + args).stdout
+    finally:
+        if cache is not None:
+            cache.invalidate()
+
+
+def parse_index(output: str) -> Tuple[Optional[int], Optional[int]]:
+    """AC/DC index of a single-setting `/query` output (None when absent)."""
+    found: Dict[str, int] = {}
+    for match in _INDEX_RE.finditer(output):
+        found.setdefault(match.group(1), int(match.group(2), 16))
+    return found.get("AC"), found.get("DC")
+
+
+def parse_scheme_guid(output: str) -> Optional[str]:
+    """GUID of the scheme a whole-scheme `/query` describes."""
+    m = _SCHEME_RE.search(output)
+    return m.group(1).lower() if m else None
+
+
+def parse_scheme(output: str) -> Dict[Tuple[str, str], SettingValues]:
+    """
+    Parse a whole-scheme `powercfg /query <scheme>` in one pass.
+
+    Returns {(subgroup, setting): (ac, dc)} keyed by lower-cased GUID and,
+    where powercfg prints one, alias, so definitions may use either.
+    """
+    settings: Dict[Tuple[str, str], SettingValues] = {}
+    subgroup: List[str] = []
+    setting: List[str] = []
+    names = setting
+    ac: Optional[int] = None
+
+    for line in output.splitlines():
+        m = _SETTING_RE.search(line)
+        if m:
+            setting = names = [m.group(1).lower()]
+            ac = None
+            continue
+        m = _SUBGROUP_RE.search(line)
+        if m:
+            subgroup = names = [m.group(1).lower()]
+            setting = []
+            continue
+        if _SCHEME_RE.search(line):
+            subgroup, setting, names = [], [], []
+            continue
+        m = _ALIAS_RE.search(line)
+        if m:
+            names.append(m.group(1).lower())
+            continue
+        m = _INDEX_RE.search(line)
+        if m and setting:
+            value = int(m.group(2), 16)
+            if m.group(1) == "AC":
+                ac = value
+            elif ac is not None:
+                for sub in subgroup:
+                    for name in setting:
+                        settings[(sub, name)] = (ac, value)
+
+    return settings
+
+
+class SchemeQueryCache:
+    """
+    Per-command powercfg reader: one `/query <scheme>` serves every setting
+    of that scheme until the next write.
+
+    Settings missing from the scheme listing (hidden ones) fall back to a
+    single-setting query, which is not cached.
+
+    `restored` remembers scheme backups already imported in this command,
+    so a rollback imports each backup once however many settings share it.
+    """
+
+    def __init__(self) -> None:
+        self._schemes: Dict[str, Tuple[Optional[str], Dict[Tuple[str, str], SettingValues]]] = {}
+        self._lock = threading.Lock()
+        self.restored: Set[str] = set()
+        self.stats: Counter = Counter()
+
+    def _scheme(self, scheme: str) -> Tuple[Optional[str], Dict[Tuple[str, str], SettingValues]]:
+        key = scheme.lower()
+        with self._lock:
+            entry = self._schemes.get(key)
+            if entry is None:
+                self.stats["scheme_queries"] += 1
+                output = run(["/query", scheme])
+                entry = self._schemes[key] = (parse_scheme_guid(output), parse_scheme(output))
+            else:
+                self.stats["hits"] += 1
+        return entry
+
+    def get(self, scheme: str, subgroup: str, setting: str) -> Optional[SettingValues]:
+        return self._scheme(scheme)[1].get((subgroup.lower(), setting.lower()))
+
+    def guid(self, scheme: str) -> Optional[str]:
+        return self._scheme(scheme)[0]
+
+    def invalidate(self) -> None:
+        # Aliases (SCHEME_CURRENT) can name the same scheme as a GUID, so a
+        # write drops everything rather than guessing which entry it hit.
+        with self._lock:
+            if self._schemes:
+                self.stats["invalidations"] += 1
+            self._schemes.clear()
+
+
+_cache: Optional[SchemeQueryCache] = None
+_depth = 0
+_scope_lock = threading.Lock()
+
+
+def active_cache() -> Optional[SchemeQueryCache]:
+    return _cache
+
+
+@contextmanager
+def scope() -> Iterator[Optional[SchemeQueryCache]]:
+    """
+    Command-wide scheme cache; nested scopes join the outermost one.
+    Outside a scope every query spawns its own single-setting `/query`.
+    """
+    global _cache, _depth
+    with _scope_lock:
+        if _cache is None:
+            _cache = SchemeQueryCache()
+        _depth += 1
+        cache = _cache
+    try:
+        yield cache
+    finally:
+        with _scope_lock:
+            _depth -= 1
+            if _depth == 0:
+                _cache = None
+
+
+def query_setting(scheme: str, subgroup: str, setting: str) -> Tuple[Optional[int], Optional[int]]:
+    """Current (AC, DC) index of one setting; (None, None) parts when absent."""
+    cache = _cache
+    if cache is not None:
+        values = cache.get(scheme, subgroup, setting)
+        if values is not None:
+            return values
+    return parse_index(run(["/query", scheme, subgroup, setting]))
+
+
+def resolve_scheme(scheme: str) -> str:
+    """GUID for a scheme given by GUID or alias (e.g. SCHEME_CURRENT)."""
+    if _GUID_RE.fullmatch(scheme):
+        return scheme.lower()
+    cache = _cache
+    guid = cache.guid(scheme) if cache is not None else parse_scheme_guid(run(["/query", scheme]))
+    if guid is None:
+        raise ValueError(f"Failed to resolve power scheme '{scheme}'.")
+    return guid
+
+
+def export_scheme(guid: str, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    run(["/export", str(path), guid])
+
+
+def restore_scheme(guid: str, path: Path) -> bool:
+    """
+    Replace scheme `guid` with a `/export` backup and delete the file.
+
+    True when the scheme is restored, now or earlier in this command; False
+    when the backup is gone (already consumed by a completed rollback), in
+    which case the caller falls back to per-setting values.
+    """
+    cache = _cache
+    key = str(path)
+    if cache is not None and key in cache.restored:
+        return True
+    if not path.exists():
+        return False
+    # powercfg will not import onto an existing GUID, nor delete the active
+    # scheme: step off it, replace it, and make it active again.
+    guid = guid.lower()
+    active = parse_scheme_guid(run(["/getactivescheme"])) == guid
+    if active:
+        others = [g.lower() for g in _SCHEME_RE.findall(run(["/list"])) if g.lower() != guid]
+        if not others:
+            raise ValueError(f"No other power scheme to activate while restoring '{guid}'.")
+        run(["/setactive", others[0]])
+    run(["/delete", guid])
+    run(["/import", key, guid])
+    if active:
+        run(["/setactive", guid])
+    if cache is not None:
+        cache.restored.add(key)
+    path.unlink()
+    return True
@@ -0,0 +1,148 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .tweak_id import TweakID
+from .tweak_pack import TweakPack, is_pack
+from .validation import BATCH_LIMITS, MAX_BATCH_ACTIONS, ValidationError
+
+Definition = Dict[str, Any]
+
+# A frozen build ships its tweaks next to the executable, not the sources.
+_BASE_DIR = Path(sys.executable).parent if getattr(sys, "frozen", False) else Path(__file__).parent.parent
+TWEAK_DIR = _BASE_DIR / "tweaks"
+# Written by build.py; preferred over TWEAK_DIR when present.
+TWEAK_PACK = _BASE_DIR / "tweaks.etpk"
+
+
+def default_tweak_source() -> Path:
+    """TWEAK_PACK if it exists, else the TWEAK_DIR folder."""
+    return TWEAK_PACK if is_pack(TWEAK_PACK) else TWEAK_DIR
+
+
+def load_profile(profile: Union[str, Path, Iterable[str]]) -> List[str]:
+    """
+    Desired tweak IDs, in declaration order. `profile` is a list of IDs or a
+    JSON file holding either such a list or {"tweaks": [...]}.
+    """
+    if isinstance(profile, (str, Path)):
+        with open(profile, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        ids = data["tweaks"] if isinstance(data, dict) else data
+    else:
+        ids = list(profile)
+
+    seen: Set[str] = set()
+    desired = []
+    for tweak_id in ids:
+        tweak_id = str(TweakID.parse(tweak_id))
+        if tweak_id not in seen:
+            seen.add(tweak_id)
+            desired.append(tweak_id)
+    return desired
+
+
+def _read_json(path: Path) -> Definition:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def index_tweak_dir(
+    tweak_dir: Union[Path, TweakPack],
+    load: Optional[Callable[[Any], Definition]] = None,
+) -> Dict[str, Tuple[Any, Definition]]:
+    """
+    {tweak_id: (path, definition)} for every JSON tweak file in `tweak_dir`,
+    or every member of `tweak_dir` if it is a tweak pack (the "path" is then
+    a `PackMember`). `load` (e.g. `TweakManager.load_tweak`) validates; by
+    default files are only parsed.
+
+    A pack given by path is closed before returning, so its members can no
+    longer be read; pass an open `TweakPack` to use them afterwards.
+    """
+    if isinstance(tweak_dir, TweakPack):
+        sources: List[Any] = list(tweak_dir.members())
+        load = load or (lambda member: member.read())
+    elif is_pack(tweak_dir):
+        with TweakPack(tweak_dir) as pack:
+            return index_tweak_dir(pack, load)
+    else:
+        sources = sorted(Path(tweak_dir).glob("*.json"))
+        load = load or _read_json
+    index: Dict[str, Tuple[Any, Definition]] = {}
+    for path in sources:
+        try:
+            definition = load(path)
+            index[str(TweakID.parse(definition["id"]))] = (path, definition)
+        except (OSError, ValueError, KeyError, TypeError, ValidationError) as e:
+            print(f"[WARN] Skipping unreadable tweak file {path}: {e}")
+    return index
+
+
+def dependency_layers(ids: List[str], definitions: Dict[str, Definition]) -> List[List[str]]:
+    """
+    Split `ids` into layers so every tweak comes after the tweaks of `ids`
+    it depends on. Dependencies outside `ids` are ignored here (composition
+    validation checks them against the active set).
+    """
+    members = set(ids)
+    pending = {
+        tweak_id: set(definitions.get(tweak_id, {}).get("dependencies", [])) & members
+        for tweak_id in ids
+    }
+    layers: List[List[str]] = []
+    done: Set[str] = set()
+
+    while pending:
+        layer = [t for t in ids if t in pending and pending[t] <= done]
+        if not layer:
+            raise ValueError(f"Circular dependency among: {', '.join(sorted(pending))}")
+        for tweak_id in layer:
+            del pending[tweak_id]
+        done.update(layer)
+        layers.append(layer)
+    return layers
+
+
+def _batch_class(definition: Definition) -> Tuple[Any, ...]:
+    # Tweaks that `validate_composition` lets share a batch.
+    return (
+        definition["tier"],
+        definition["requires_reboot"],
+        definition["rollback_guaranteed"],
+        definition.get("verify_semantics", "runtime"),
+        "boot" in definition["scope"],
+    )
+
+
+def apply_batches(ids: List[str], definitions: Dict[str, Definition]) -> List[List[str]]:
+    """
+    Group `ids` into batches `validate_composition` accepts: dependency
+    layers first, then homogeneous classes, then the tier's size limits.
+    """
+    batches: List[List[str]] = []
+    for layer in dependency_layers(ids, definitions):
+        classes: Dict[Tuple[Any, ...], List[str]] = {}
+        for tweak_id in layer:
+            classes.setdefault(_batch_class(definitions[tweak_id]), []).append(tweak_id)
+
+        for (tier, _, guaranteed, _, _), members in classes.items():
+            limit = BATCH_LIMITS.get(tier, 1) if guaranteed else 1
+            batch: List[str] = []
+            actions = 0
+            for tweak_id in members:
+                n = len(definitions[tweak_id]["actions"]["apply"])
+                if batch and (len(batch) >= limit or actions + n > MAX_BATCH_ACTIONS):
+                    batches.append(batch)
+                    batch, actions = [], 0
+                batch.append(tweak_id)
+                actions += n
+            if batch:
+                batches.append(batch)
+    return batches
+
+
+def revert_order(ids: List[str], definitions: Dict[str, Definition]) -> List[str]:
+    """`ids` ordered so dependents are reverted before what they depend on."""
+    return [t for layer in reversed(dependency_layers(ids, definitions)) for t in reversed(layer)]
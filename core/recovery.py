@@ -1,9 +1,9 @@
-import sqlite3
 from pathlib import Path
 from typing import Dict, List
 from datetime import timedelta
 
 from .time import DEFAULT_TIME_PROVIDER as TIME
+from .history_store import get_store
 
 DB_PATH = Path(__file__).parent.parent / "enhancer.db"
 
@@ -19,17 +19,16 @@ class RecoveryManager:
     """
 
     def scan_for_issues(self) -> List[Dict]:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        store = get_store(DB_PATH)
 
         issues: List[Dict] = []
 
-        cursor.execute("""
+        rows = store.query_all("""
             SELECT id, tweak_id, applied_at
             FROM tweak_history
             WHERE status IN ('pending', 'defined')
         """)
-        for hid, tid, ts in cursor.fetchall():
+        for hid, tid, ts in rows:
             issues.append({
                 "type": "stuck_pending",
                 "history_id": hid,
@@ -37,12 +36,12 @@ class RecoveryManager:
                 "applied_at": ts,
             })
         cutoff = TIME.now() - timedelta(minutes=5)
-        cursor.execute("""
+        rows = store.query_all("""
             SELECT id, tweak_id, applied_at
             FROM tweak_history
             WHERE status = 'applying'
         """)
-        for hid, tid, ts in cursor.fetchall():
+        for hid, tid, ts in rows:
             issues.append({
                 "type": "stuck_applying",
                 "history_id": hid,
@@ -50,7 +49,6 @@ class RecoveryManager:
                 "applied_at": ts,
             })
 
-        conn.close()
         return issues
 
     def recover_all(self, manager) -> Dict:
@@ -86,15 +84,9 @@ class RecoveryManager:
         return results
 
     def _mark_recovered(self, history_id: int, error_message: str) -> None:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        get_store(DB_PATH).execute("""
             UPDATE tweak_history
             SET status = 'recovered',
                 error_message = ?
             WHERE id = ?
         """, (error_message, history_id))
-
-        conn.commit()
-        conn.close()
\ No newline at end of file
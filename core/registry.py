@@ -1,23 +1,114 @@
-import winreg
-from typing import Dict, Tuple, Optional, Union
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple, Optional, Union
 
+from .registry_backends import (
+    RegistryBackend,
+    WinregBackend,
+    MemoryRegistryBackend,
+    ValueCacheBackend,
+)
+
+# Values of the winreg constants, spelled out so this module imports (and
+# paths parse) without the Windows-only binding.
 REG_TYPES: Dict[str, int] = {
-    "DWORD": winreg.REG_DWORD,
-    "QWORD": winreg.REG_QWORD,
-    "SZ": winreg.REG_SZ,
-    "EXPAND_SZ": winreg.REG_EXPAND_SZ,
-    "BINARY": winreg.REG_BINARY,
+    "DWORD": 4,        # winreg.REG_DWORD
+    "QWORD": 11,       # winreg.REG_QWORD
+    "SZ": 1,           # winreg.REG_SZ
+    "EXPAND_SZ": 2,    # winreg.REG_EXPAND_SZ
+    "BINARY": 3,       # winreg.REG_BINARY
 }
 
 HIVES: Dict[str, int] = {
-    "HKEY_LOCAL_MACHINE": winreg.HKEY_LOCAL_MACHINE,
-    "HKEY_CURRENT_USER": winreg.HKEY_CURRENT_USER,
-    "HKEY_CLASSES_ROOT": winreg.HKEY_CLASSES_ROOT,
-    "HKEY_USERS": winreg.HKEY_USERS,
-    "HKEY_CURRENT_CONFIG": winreg.HKEY_CURRENT_CONFIG,
+    "HKEY_LOCAL_MACHINE": 0x80000002,
+    "HKEY_CURRENT_USER": 0x80000001,
+    "HKEY_CLASSES_ROOT": 0x80000000,
+    "HKEY_USERS": 0x80000003,
+    "HKEY_CURRENT_CONFIG": 0x80000005,
+    # Short forms accepted by reg.exe / regedit
+    "HKLM": 0x80000002,
+    "HKCU": 0x80000001,
+    "HKCR": 0x80000000,
+    "HKU": 0x80000003,
+    "HKCC": 0x80000005,
+}
+
+# ENHANCER_REGISTRY_BACKEND=memory runs the engine against an in-memory tree
+# (CI / load tests on non-Windows hosts).
+BACKENDS = {
+    "winreg": WinregBackend,
+    "memory": MemoryRegistryBackend,
 }
 
+_backend: Optional[RegistryBackend] = None
+
+
+def get_backend() -> RegistryBackend:
+    global _backend
+    if _backend is None:
+        name = os.environ.get("ENHANCER_REGISTRY_BACKEND", "winreg")
+        if name not in BACKENDS:
+            raise ValueError(
+                f"Invalid registry backend: {name}. "
+                f"Valid backends: {', '.join(BACKENDS.keys())}"
+            )
+        _backend = BACKENDS[name]()
+    return _backend
+
+
+def set_backend(backend: Optional[RegistryBackend]) -> None:
+    """Install `backend` for all registry access (None restores the default)."""
+    global _backend
+    _backend = backend
+
+
+def scope():
+    """
+    Command-wide registry scope: the backend may reuse open key handles
+    until the block exits. Nested scopes join the outer one.
+    """
+    return get_backend().scope()
+
+
+@contextmanager
+def use_backend(backend: RegistryBackend) -> Iterator[RegistryBackend]:
+    global _backend
+    previous = _backend
+    _backend = backend
+    try:
+        yield backend
+    finally:
+        _backend = previous
+
+
+@contextmanager
+def value_cache() -> Iterator[ValueCacheBackend]:
+    """
+    Command-wide write-through value cache: reads of values this command
+    already read or wrote are answered from memory until the block exits.
+    Nested blocks join the outer cache.
+    """
+    backend = get_backend()
+    if isinstance(backend, ValueCacheBackend):
+        yield backend
+        return
+    with use_backend(ValueCacheBackend(backend)) as cached:
+        yield cached
 
+
+@contextmanager
+def strict_reads() -> Iterator[None]:
+    """Force real reads through an active `value_cache()` (no-op otherwise)."""
+    backend = get_backend()
+    if isinstance(backend, ValueCacheBackend):
+        with backend.strict():
+            yield
+    else:
+        yield
+
+
+@lru_cache(maxsize=1024)
 def parse_registry_path(full_path: str) -> Tuple[int, str]:
     """
     Parse full registry path into hive and subkey components.
@@ -33,7 +124,7 @@ def parse_registry_path(full_path: str) -> Tuple[int, str]:
     
     Example:
         >>> hive, subkey = parse_registry_path("HKEY_CURRENT_USER\\Software\\Test")
-        >>> # hive = winreg.HKEY_CURRENT_USER, subkey = "Software\\Test"
+        >>> # hive = HKEY_CURRENT_USER handle, subkey = "Software\\Test"
     """
     parts = full_path.split("\\", 1)
     hive_name = parts[0]
@@ -50,13 +141,7 @@ def parse_registry_path(full_path: str) -> Tuple[int, str]:
 
 def subkey_exists(path: str) -> bool:
     hive, subkey = parse_registry_path(path)
-    
-    try:
-        reg_key = winreg.OpenKey(hive, subkey, 0, winreg.KEY_READ)
-        winreg.CloseKey(reg_key)
-        return True
-    except (FileNotFoundError, OSError):
-        return False
+    return get_backend().subkey_exists(hive, subkey)
 
 
 def set_value(
@@ -77,61 +162,43 @@ def set_value(
             )
         reg_type = REG_TYPES[reg_type]
     
-    reg_key: Optional[winreg.HKEYType] = None
+    is_policy = "\\Policies\\" in subkey
+    create = force or is_policy
+    
     try:
-        if force:
-            reg_key = winreg.CreateKeyEx(hive, subkey, 0, winreg.KEY_WRITE)
-        else:
-            is_policy = "\\Policies\\" in subkey
-            
-            if is_policy:
-                reg_key = winreg.CreateKeyEx(hive, subkey, 0, winreg.KEY_WRITE)
-            else:
-                try:
-                    reg_key = winreg.OpenKey(hive, subkey, 0, winreg.KEY_WRITE)
-                except FileNotFoundError:
-                    raise FileNotFoundError(
-                        f"Registry path not found (and not Policy): {path}. "
-                        "The tweak requires this key to exist previously or "
-                        "use force_create=true in definition."
-                    )
-        
-        winreg.SetValueEx(reg_key, key, 0, reg_type, value)
-        
-    finally:
-        if reg_key:
-            winreg.CloseKey(reg_key)
+        get_backend().set_value(hive, subkey, key, value, reg_type, create)
+    except FileNotFoundError:
+        if create:
+            raise
+        raise FileNotFoundError(
+            f"Registry path not found (and not Policy): {path}. "
+            "The tweak requires this key to exist previously or "
+            "use force_create=true in definition."
+        )
 
 
 def get_value(path: str, key: str) -> Tuple[Optional[Union[int, str, bytes]], Optional[int]]:
     hive, subkey = parse_registry_path(path)
-    
-    try:
-        reg_key = winreg.OpenKey(hive, subkey, 0, winreg.KEY_READ)
-        value, reg_type = winreg.QueryValueEx(reg_key, key)
-        winreg.CloseKey(reg_key)
-        return value, reg_type
-    except (FileNotFoundError, OSError):
-        return None, None
+    return get_backend().get_value(hive, subkey, key)
+
+
+def get_values(
+    path: str, keys: List[str]
+) -> Tuple[bool, Dict[str, Tuple[Optional[Union[int, str, bytes]], Optional[int]]]]:
+    """
+    Read several values under one key in a single open.
+
+    Returns (subkey_exists, {key: (value, type)}); missing values are (None, None).
+    """
+    hive, subkey = parse_registry_path(path)
+    return get_backend().get_values(hive, subkey, keys)
 
 
 def delete_value(path: str, key: str) -> bool:
     hive, subkey = parse_registry_path(path)
-    
-    try:
-        reg_key = winreg.OpenKey(hive, subkey, 0, winreg.KEY_WRITE)
-        winreg.DeleteValue(reg_key, key)
-        winreg.CloseKey(reg_key)
-        return True
-    except (FileNotFoundError, OSError):
-        return False
+    return get_backend().delete_value(hive, subkey, key)
 
 
 def delete_subkey(path: str) -> bool:
     hive, subkey = parse_registry_path(path)
-    
-    try:
-        winreg.DeleteKey(hive, subkey)
-        return True
-    except (FileNotFoundError, OSError):
-        return False
\ No newline at end of file
+    return get_backend().delete_subkey(hive, subkey)
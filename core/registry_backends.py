@@ -0,0 +1,462 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .time import DEFAULT_TIME_PROVIDER as TIME
+
+RegValue = Union[int, str, bytes]
+
+
+class RegistryBackend(ABC):
+    """
+    Storage behind `core.registry`.
+
+    Keys are addressed by (hive handle, subkey path) as returned by
+    `registry.parse_registry_path`; `reg_type` is always the numeric REG_* code.
+    Read/delete failures are reported through return values, exactly like the
+    module-level functions; `set_value` raises FileNotFoundError when the key is
+    missing and `create` is False.
+    """
+
+    @abstractmethod
+    def subkey_exists(self, hive: int, subkey: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_value(self, hive: int, subkey: str, key: str) -> Tuple[Optional[RegValue], Optional[int]]:
+        pass
+
+    @abstractmethod
+    def set_value(
+        self, hive: int, subkey: str, key: str, value: RegValue, reg_type: int, create: bool
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def delete_value(self, hive: int, subkey: str, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def delete_subkey(self, hive: int, subkey: str) -> bool:
+        pass
+
+    def get_values(
+        self, hive: int, subkey: str, keys: List[str]
+    ) -> Tuple[bool, Dict[str, Tuple[Optional[RegValue], Optional[int]]]]:
+        """
+        Read several values of one key: (subkey exists, {key: (value, type)}).
+        Missing values map to (None, None). Backends override this to open the
+        key once instead of once per value.
+        """
+        exists = self.subkey_exists(hive, subkey)
+        return exists, {k: self.get_value(hive, subkey, k) for k in keys}
+
+    @contextmanager
+    def scope(self) -> Iterator[None]:
+        """
+        Bracket one command. Backends may keep per-command resources (open
+        handles) alive inside it and must release them on exit. Nested scopes
+        join the outermost one.
+        """
+        yield
+
+
+class KeyHandleCache:
+    """
+    LRU of open registry handles keyed by (hive, subkey, access mask).
+
+    Lives for one `WinregBackend.scope()`; evicted handles are closed
+    immediately and the rest when the scope ends.
+    """
+
+    def __init__(self, winreg: Any, capacity: int = 64) -> None:
+        self._winreg = winreg
+        self.capacity = capacity
+        self._handles: "OrderedDict[Tuple[int, str, int], Any]" = OrderedDict()
+        self.stats: Counter = Counter()
+
+    def get(self, hive: int, subkey: str, access: int, create: bool = False) -> Any:
+        cache_key = (hive, subkey.lower(), access)
+        handle = self._handles.get(cache_key)
+        if handle is not None:
+            self._handles.move_to_end(cache_key)
+            self.stats["hits"] += 1
+            return handle
+
+        self.stats["misses"] += 1
+        if create:
+            handle = self._winreg.CreateKeyEx(hive, subkey, 0, access)
+        else:
+            handle = self._winreg.OpenKey(hive, subkey, 0, access)
+        self._handles[cache_key] = handle
+
+        if len(self._handles) > self.capacity:
+            _, evicted = self._handles.popitem(last=False)
+            self._winreg.CloseKey(evicted)
+            self.stats["evictions"] += 1
+        return handle
+
+    def invalidate(self, hive: int, subkey: str) -> None:
+        """Close every handle on `subkey` or below it."""
+        prefix = subkey.lower()
+        for cache_key in list(self._handles):
+            k_hive, k_subkey, _ = cache_key
+            if k_hive == hive and (k_subkey == prefix or k_subkey.startswith(prefix + "\\")):
+                self._winreg.CloseKey(self._handles.pop(cache_key))
+                self.stats["invalidations"] += 1
+
+    def close(self) -> None:
+        while self._handles:
+            _, handle = self._handles.popitem()
+            self._winreg.CloseKey(handle)
+
+
+class WinregBackend(RegistryBackend):
+    """
+    Native Windows registry via `winreg` (imported on first use).
+
+    Outside a `scope()` every call opens and closes its own key, as before.
+    Inside one, handles are reused through a `KeyHandleCache` so snapshot,
+    apply and verify of the same key share a single OpenKey.
+    """
+
+    HANDLE_CACHE_SIZE = 64
+
+    def __init__(self, winreg_module: Any = None) -> None:
+        self._winreg = winreg_module
+        self._cache: Optional[KeyHandleCache] = None
+        self._lock = threading.RLock()
+
+    @property
+    def winreg(self):
+        if self._winreg is None:
+            import winreg
+            self._winreg = winreg
+        return self._winreg
+
+    @property
+    def handle_cache(self) -> Optional[KeyHandleCache]:
+        return self._cache
+
+    @contextmanager
+    def scope(self) -> Iterator[None]:
+        with self._lock:
+            if self._cache is not None:
+                outermost = False
+            else:
+                self._cache = KeyHandleCache(self.winreg, self.HANDLE_CACHE_SIZE)
+                outermost = True
+        try:
+            yield
+        finally:
+            if outermost:
+                with self._lock:
+                    cache, self._cache = self._cache, None
+                    cache.close()
+
+    @contextmanager
+    def _key(self, hive: int, subkey: str, access: int, create: bool = False) -> Iterator[Any]:
+        winreg = self.winreg
+        # Held for the whole operation so a cached handle cannot be evicted
+        # (and closed) by another thread while in use.
+        with self._lock:
+            if self._cache is not None:
+                yield self._cache.get(hive, subkey, access, create)
+                return
+
+            if create:
+                reg_key = winreg.CreateKeyEx(hive, subkey, 0, access)
+            else:
+                reg_key = winreg.OpenKey(hive, subkey, 0, access)
+            try:
+                yield reg_key
+            finally:
+                winreg.CloseKey(reg_key)
+
+    def subkey_exists(self, hive: int, subkey: str) -> bool:
+        try:
+            with self._key(hive, subkey, self.winreg.KEY_READ):
+                return True
+        except (FileNotFoundError, OSError):
+            return False
+
+    def get_value(self, hive: int, subkey: str, key: str) -> Tuple[Optional[RegValue], Optional[int]]:
+        try:
+            with self._key(hive, subkey, self.winreg.KEY_READ) as reg_key:
+                value, reg_type = self.winreg.QueryValueEx(reg_key, key)
+                return value, reg_type
+        except (FileNotFoundError, OSError):
+            return None, None
+
+    def get_values(
+        self, hive: int, subkey: str, keys: List[str]
+    ) -> Tuple[bool, Dict[str, Tuple[Optional[RegValue], Optional[int]]]]:
+        values: Dict[str, Tuple[Optional[RegValue], Optional[int]]] = {}
+        try:
+            with self._key(hive, subkey, self.winreg.KEY_READ) as reg_key:
+                for key in keys:
+                    try:
+                        values[key] = self.winreg.QueryValueEx(reg_key, key)
+                    except (FileNotFoundError, OSError):
+                        values[key] = (None, None)
+        except (FileNotFoundError, OSError):
+            return False, {key: (None, None) for key in keys}
+        return True, values
+
+    def set_value(
+        self, hive: int, subkey: str, key: str, value: RegValue, reg_type: int, create: bool
+    ) -> None:
+        with self._key(hive, subkey, self.winreg.KEY_WRITE, create=create) as reg_key:
+            self.winreg.SetValueEx(reg_key, key, 0, reg_type, value)
+
+    def delete_value(self, hive: int, subkey: str, key: str) -> bool:
+        try:
+            with self._key(hive, subkey, self.winreg.KEY_WRITE) as reg_key:
+                self.winreg.DeleteValue(reg_key, key)
+                return True
+        except (FileNotFoundError, OSError):
+            return False
+
+    def delete_subkey(self, hive: int, subkey: str) -> bool:
+        with self._lock:
+            if self._cache is not None:
+                self._cache.invalidate(hive, subkey)
+            try:
+                self.winreg.DeleteKey(hive, subkey)
+                return True
+            except (FileNotFoundError, OSError):
+                return False
+
+
+class ValueCacheBackend(RegistryBackend):
+    """
+    Write-through value cache layered on another backend for one command.
+
+    Reads are served from what this command already read or wrote; writes
+    and deletes go to the inner backend first and update the cache only on
+    success. Inside `strict()` every read goes to the inner backend (results
+    still refresh the cache), for checks that must observe real state.
+    """
+
+    def __init__(self, inner: RegistryBackend) -> None:
+        self.inner = inner
+        self.stats: Counter = Counter()
+        self._values: Dict[Tuple[int, str, str], Tuple[Optional[RegValue], Optional[int]]] = {}
+        self._subkeys: Dict[Tuple[int, str], bool] = {}
+        self._strict = 0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def strict(self) -> Iterator[None]:
+        with self._lock:
+            self._strict += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._strict -= 1
+
+    def _cached(self, table: Dict, cache_key: Tuple) -> Tuple[bool, Any]:
+        if self._strict:
+            self.stats["bypassed"] += 1
+            return False, None
+        if cache_key in table:
+            self.stats["hits"] += 1
+            return True, table[cache_key]
+        self.stats["misses"] += 1
+        return False, None
+
+    def subkey_exists(self, hive: int, subkey: str) -> bool:
+        cache_key = (hive, subkey.lower())
+        with self._lock:
+            found, exists = self._cached(self._subkeys, cache_key)
+            if found:
+                return exists
+            exists = self.inner.subkey_exists(hive, subkey)
+            self._subkeys[cache_key] = exists
+            return exists
+
+    def get_value(self, hive: int, subkey: str, key: str) -> Tuple[Optional[RegValue], Optional[int]]:
+        cache_key = (hive, subkey.lower(), key.lower())
+        with self._lock:
+            found, entry = self._cached(self._values, cache_key)
+            if found:
+                return entry
+            entry = self.inner.get_value(hive, subkey, key)
+            self._values[cache_key] = entry
+            return entry
+
+    def get_values(
+        self, hive: int, subkey: str, keys: List[str]
+    ) -> Tuple[bool, Dict[str, Tuple[Optional[RegValue], Optional[int]]]]:
+        lowered = subkey.lower()
+        with self._lock:
+            found, exists = self._cached(self._subkeys, (hive, lowered))
+            values: Dict[str, Tuple[Optional[RegValue], Optional[int]]] = {}
+            missing: List[str] = []
+            for key in keys:
+                hit, entry = self._cached(self._values, (hive, lowered, key.lower()))
+                if hit:
+                    values[key] = entry
+                else:
+                    missing.append(key)
+
+            if found and not missing:
+                return exists, values
+
+            exists, fetched = self.inner.get_values(hive, subkey, missing)
+            self._subkeys[(hive, lowered)] = exists
+            for key, entry in fetched.items():
+                self._values[(hive, lowered, key.lower())] = entry
+                values[key] = entry
+            return exists, values
+
+    def set_value(
+        self, hive: int, subkey: str, key: str, value: RegValue, reg_type: int, create: bool
+    ) -> None:
+        with self._lock:
+            self.inner.set_value(hive, subkey, key, value, reg_type, create)
+            self.stats["writes"] += 1
+            self._values[(hive, subkey.lower(), key.lower())] = (value, reg_type)
+            self._subkeys[(hive, subkey.lower())] = True
+
+    def delete_value(self, hive: int, subkey: str, key: str) -> bool:
+        with self._lock:
+            deleted = self.inner.delete_value(hive, subkey, key)
+            self.stats["writes"] += 1
+            if deleted:
+                self._values[(hive, subkey.lower(), key.lower())] = (None, None)
+            else:
+                self._values.pop((hive, subkey.lower(), key.lower()), None)
+            return deleted
+
+    def delete_subkey(self, hive: int, subkey: str) -> bool:
+        prefix = subkey.lower()
+
+        def under(k_hive: int, k_subkey: str) -> bool:
+            return k_hive == hive and (k_subkey == prefix or k_subkey.startswith(prefix + "\\"))
+
+        with self._lock:
+            deleted = self.inner.delete_subkey(hive, subkey)
+            self.stats["writes"] += 1
+            for cache_key in [k for k in self._values if under(k[0], k[1])]:
+                del self._values[cache_key]
+            for cache_key in [k for k in self._subkeys if under(*k)]:
+                del self._subkeys[cache_key]
+            return deleted
+
+    @contextmanager
+    def scope(self) -> Iterator[None]:
+        with self.inner.scope():
+            yield
+
+
+class _Node:
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        # lower-cased name -> child / (original name, value, type)
+        self.children: Dict[str, "_Node"] = {}
+        self.values: Dict[str, Tuple[str, RegValue, int]] = {}
+
+
+class MemoryRegistryBackend(RegistryBackend):
+    """
+    In-process registry tree for tests, benchmarks and non-Windows hosts.
+
+    Mirrors the winreg semantics the engine relies on: key and value names
+    are case-insensitive, `create` makes intermediate keys, and a key with
+    subkeys cannot be deleted. `latency` (seconds) is slept on every call to
+    model real syscall cost; `stats` counts calls per operation.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.stats: Counter = Counter()
+        self._roots: Dict[int, _Node] = {}
+        self._lock = threading.RLock()
+
+    def _tick(self, op: str) -> None:
+        self.stats[op] += 1
+        if self.latency:
+            TIME.sleep(self.latency)
+
+    @staticmethod
+    def _parts(subkey: str):
+        return [p.lower() for p in subkey.split("\\") if p]
+
+    def _find(self, hive: int, subkey: str) -> Optional[_Node]:
+        node = self._roots.get(hive)
+        if node is None:
+            node = self._roots[hive] = _Node()
+        for part in self._parts(subkey):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def _create(self, hive: int, subkey: str) -> _Node:
+        node = self._roots.setdefault(hive, _Node())
+        for part in self._parts(subkey):
+            node = node.children.setdefault(part, _Node())
+        return node
+
+    def subkey_exists(self, hive: int, subkey: str) -> bool:
+        self._tick("subkey_exists")
+        with self._lock:
+            return self._find(hive, subkey) is not None
+
+    def get_value(self, hive: int, subkey: str, key: str) -> Tuple[Optional[RegValue], Optional[int]]:
+        self._tick("get_value")
+        with self._lock:
+            node = self._find(hive, subkey)
+            entry = node.values.get(key.lower()) if node else None
+            if entry is None:
+                return None, None
+            return entry[1], entry[2]
+
+    def get_values(
+        self, hive: int, subkey: str, keys: List[str]
+    ) -> Tuple[bool, Dict[str, Tuple[Optional[RegValue], Optional[int]]]]:
+        self._tick("get_values")
+        with self._lock:
+            node = self._find(hive, subkey)
+            values: Dict[str, Tuple[Optional[RegValue], Optional[int]]] = {}
+            for key in keys:
+                entry = node.values.get(key.lower()) if node else None
+                values[key] = (entry[1], entry[2]) if entry else (None, None)
+            return node is not None, values
+
+    def set_value(
+        self, hive: int, subkey: str, key: str, value: RegValue, reg_type: int, create: bool
+    ) -> None:
+        self._tick("set_value")
+        with self._lock:
+            node = self._create(hive, subkey) if create else self._find(hive, subkey)
+            if node is None:
+                raise FileNotFoundError(f"Registry key not found: {subkey}")
+            node.values[key.lower()] = (key, value, reg_type)
+
+    def delete_value(self, hive: int, subkey: str, key: str) -> bool:
+        self._tick("delete_value")
+        with self._lock:
+            node = self._find(hive, subkey)
+            if node is None or key.lower() not in node.values:
+                return False
+            del node.values[key.lower()]
+            return True
+
+    def delete_subkey(self, hive: int, subkey: str) -> bool:
+        self._tick("delete_subkey")
+        parts = self._parts(subkey)
+        if not parts:
+            return False
+        with self._lock:
+            parent = self._find(hive, "\\".join(parts[:-1]))
+            node = parent.children.get(parts[-1]) if parent else None
+            if node is None or node.children:
+                return False
+            del parent.children[parts[-1]]
+            return True
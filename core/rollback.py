@@ -1,105 +1,87 @@
-import sqlite3
 import json
 from pathlib import Path
-from datetime import datetime
 
 from .time import DEFAULT_TIME_PROVIDER as TIME
+from .history_store import HistoryStore, get_store, close_store
 
 DB_PATH = Path(__file__).parent.parent / "enhancer.db"
 
 
-def init_db():
-    sqlite3.register_adapter(datetime, lambda dt: dt.isoformat())
-    sqlite3.register_converter(
-        "TIMESTAMP", lambda s: datetime.fromisoformat(s.decode())
-    )
+def _store() -> HistoryStore:
+    return get_store(DB_PATH)
 
-    conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
-    conn.execute("PRAGMA journal_mode=WAL")
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tweak_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tweak_id TEXT NOT NULL,
-            applied_at TIMESTAMP NOT NULL,
-            reverted_at TIMESTAMP,
-            verified_at TIMESTAMP,
-            status TEXT NOT NULL,
-            error_message TEXT,
-            schema_version INTEGER NOT NULL DEFAULT 1
-        )
-    """)
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS snapshots (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            history_id INTEGER NOT NULL,
-            registry_path TEXT NOT NULL,
-            key_name TEXT NOT NULL,
-            old_value TEXT,
-            old_type INTEGER,
-            value_existed BOOLEAN NOT NULL,
-            subkey_existed BOOLEAN NOT NULL,
-            FOREIGN KEY (history_id) REFERENCES tweak_history(id)
-        )
-    """)
+def history_store() -> HistoryStore:
+    return _store()
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS snapshots_v2 (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            history_id INTEGER NOT NULL,
-            action_type TEXT NOT NULL,
-            metadata_json TEXT NOT NULL,
-            FOREIGN KEY (history_id) REFERENCES tweak_history(id)
-        )
-    """)
 
-    conn.commit()
-    conn.close()
+def data_dir() -> Path:
+    """Directory holding the history database and its side files (backups)."""
+    return Path(DB_PATH).parent
 
 
-def create_history_entry(tweak_id: str) -> int:
-    conn = sqlite3.connect(DB_PATH, timeout=10.0, detect_types=sqlite3.PARSE_DECLTYPES)
-    cursor = conn.cursor()
+def unit_of_work():
+    """
+    Open a single write transaction on the history database.
+
+    Every helper in this module (and any TweakStateMachine bound to the same
+    store) called inside the block joins it, so the whole group becomes one
+    durable commit - or nothing at all if the block raises.
+
+        with rollback.unit_of_work():
+            history_id = rollback.create_history_entry(tweak_id)
+            ...
+    """
+    return _store().transaction(immediate=True)
+
 
-    cursor.execute("""
+def init_db():
+    # Not needed before normal use (the store migrates on first connection).
+    # Reopens the shared store so a replaced database file is picked up.
+    close_store(DB_PATH)
+    _store().connection()
+
+
+def create_history_entry(tweak_id: str) -> int:
+    cursor = _store().execute("""
         INSERT INTO tweak_history (tweak_id, applied_at, status)
         VALUES (?, ?, ?)
-    """, (tweak_id, TIME.now(), "defined")) 
+    """, (tweak_id, TIME.now(), "defined"))
 
-    history_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    return cursor.lastrowid
 
-    return history_id
+def set_schema_version(history_id: int, version: int):
+    _store().execute(
+        "UPDATE tweak_history SET schema_version = ? WHERE id = ?",
+        (version, history_id),
+    )
 
 def save_snapshot_v2(history_id: int, snapshot):
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    cursor = conn.cursor()
-
-    cursor.execute("""
+    _store().execute("""
         INSERT INTO snapshots_v2 (history_id, action_type, metadata_json)
         VALUES (?, ?, ?)
     """, (history_id, snapshot.action_type, json.dumps(snapshot.metadata)))
 
-    conn.commit()
-    conn.close()
+def save_snapshots_v2(history_id: int, snapshots: list):
+    if not snapshots:
+        return
+
+    _store().executemany("""
+        INSERT INTO snapshots_v2 (history_id, action_type, metadata_json)
+        VALUES (?, ?, ?)
+    """, [
+        (history_id, snap.action_type, json.dumps(snap.metadata))
+        for snap in snapshots
+    ])
     
 def get_snapshots_v2(history_id: int) -> list:
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    cursor = conn.cursor()
-
-    cursor.execute("""
+    rows = _store().query_all("""
         SELECT action_type, metadata_json
         FROM snapshots_v2
         WHERE history_id = ?
         ORDER BY id ASC
     """, (history_id,))
 
-    rows = cursor.fetchall()
-    conn.close()
-
     return [
         {
             "action_type": action_type,
@@ -109,19 +91,13 @@ def get_snapshots_v2(history_id: int) -> list:
     ]
 
 def get_active_tweaks() -> list:
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    cursor = conn.cursor()
-
-    cursor.execute("""
+    rows = _store().query_all("""
         SELECT id, tweak_id, applied_at, status
         FROM tweak_history
         WHERE status = 'applied'
         ORDER BY applied_at DESC
     """)
 
-    rows = cursor.fetchall()
-    conn.close()
-
     return [
         {
             "id": r[0],
@@ -132,81 +108,81 @@ def get_active_tweaks() -> list:
         for r in rows
     ]
     
-def clear_snapshots(history_id: int):
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    cursor = conn.cursor()
+def get_active_histories() -> list:
+    """
+    Every applied history with its snapshots, oldest first, in one query.
+    Snapshots keep their save order.
+    """
+    # Ties on applied_at and snapshot order are resolved here: sorting on
+    # h.id / s.id in SQL would add a temporary B-tree.
+    rows = _store().query_all("""
+        SELECT h.id, h.tweak_id, h.applied_at, s.id, s.action_type, s.metadata_json
+        FROM tweak_history h
+        LEFT JOIN snapshots_v2 s ON s.history_id = h.id
+        WHERE h.status = 'applied'
+        ORDER BY h.applied_at ASC
+    """)
+    rows = sorted(rows, key=lambda r: (r[2], r[0], r[3] or 0))
+
+    histories = []
+    for history_id, tweak_id, applied_at, _, action_type, metadata_json in rows:
+        if not histories or histories[-1]["id"] != history_id:
+            histories.append({
+                "id": history_id,
+                "tweak_id": tweak_id,
+                "applied_at": applied_at,
+                "snapshots": [],
+            })
+        if action_type is not None:
+            histories[-1]["snapshots"].append({
+                "action_type": action_type,
+                "metadata": json.loads(metadata_json)
+            })
+    return histories
 
-    cursor.execute("""
+def clear_snapshots(history_id: int):
+    _store().execute("""
         DELETE FROM snapshots_v2
         WHERE history_id = ?
     """, (history_id,))
-
-    conn.commit()
-    conn.close()
     
 def is_reverted(history_id: int) -> bool:
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    cursor = conn.cursor()
-
-    cursor.execute(
+    row = _store().query_one(
         "SELECT status FROM tweak_history WHERE id = ?",
         (history_id,)
     )
-    row = cursor.fetchone()
-    conn.close()
 
     return row is not None and row[0] == "reverted"
 
 def get_latest_history_by_tweak_id(tweak_id: str):
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    cursor = conn.cursor()
-
-    cursor.execute(
+    return _store().query_one(
         """
         SELECT id, status
         FROM tweak_history
-        WHERE tweak_id = ?
-        ORDER BY applied_at DESC
-        LIMIT 1
+        WHERE id = (SELECT MAX(id) FROM tweak_history WHERE tweak_id = ?)
         """,
         (tweak_id,)
     )
 
-    row = cursor.fetchone()
-    conn.close()
-    return row
-
 def mark_applied(history_id: int):
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    cursor = conn.cursor()
-
-    cursor.execute("""
+    _store().execute("""
         UPDATE tweak_history
         SET status = 'applied'
         WHERE id = ?
     """, (history_id,))
 
-    conn.commit()
-    conn.close()
-
 def get_history_by_tweak_id(tweak_id: str):
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    cursor = conn.cursor()
-
-    cursor.execute(
+    # The newest history: a re-applied tweak gets a fresh row after its
+    # reverted one. Ids, unlike applied_at (whole seconds), never tie.
+    row = _store().query_one(
         """
         SELECT id, tweak_id, status, applied_at, reverted_at, verified_at
         FROM tweak_history
-        WHERE tweak_id = ?
-        ORDER BY applied_at ASC
-        LIMIT 1
+        WHERE id = (SELECT MAX(id) FROM tweak_history WHERE tweak_id = ?)
         """,
         (tweak_id,)
     )
 
-    row = cursor.fetchone()
-    conn.close()
-
     if not row:
         return None
 
@@ -218,6 +194,3 @@ def get_history_by_tweak_id(tweak_id: str):
         "reverted_at": row[4],
         "verified_at": row[5],
     }
-
-
-init_db()
\ No newline at end of file
@@ -1,23 +1,28 @@
-import sqlite3
 from pathlib import Path
 from typing import Optional, Dict, Any
 
 from .tweak_state import TweakState, TRANSITIONS
 from .time import DEFAULT_TIME_PROVIDER as TIME
+from .history_store import HistoryStore, get_store
 
 DB_PATH = Path(__file__).parent.parent / "enhancer.db"
 
 class TweakStateMachine:
 
-    def __init__(self, history_id: int):
+    def __init__(self, history_id: int, store: Optional[HistoryStore] = None):
         self.history_id = history_id
+        self._store = store
+
+    def _get_store(self) -> HistoryStore:
+        # Bound store (unit of work) wins; otherwise resolve lazily so a
+        # patched DB_PATH is honoured.
+        return self._store if self._store is not None else get_store(DB_PATH)
 
     def transition(self, action: str, context: Optional[Dict[str, Any]] = None) -> TweakState:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        store = self._get_store()
 
-        try:
-            conn.execute("BEGIN IMMEDIATE")
+        with store.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
 
             cursor.execute("SELECT status FROM tweak_history WHERE id = ?", (self.history_id,))
             row = cursor.fetchone()
@@ -65,23 +70,12 @@ class TweakStateMachine:
                 """, (self.history_id,))
                 print(f"  [CLEANUP] Snapshots consumed for history_id {self.history_id}.")
 
-            conn.commit()
-            return next_state
-
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+        return next_state
 
     def get_current_state(self) -> TweakState:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT status FROM tweak_history WHERE id = ?", (self.history_id,))
-            row = cursor.fetchone()
-            if not row:
-                return TweakState.ORPHANED
-            return TweakState(row[0])
-        finally:
-            conn.close()
\ No newline at end of file
+        row = self._get_store().query_one(
+            "SELECT status FROM tweak_history WHERE id = ?", (self.history_id,)
+        )
+        if not row:
+            return TweakState.ORPHANED
+        return TweakState(row[0])
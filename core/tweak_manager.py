@@ -1,40 +1,169 @@
-import json
+import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import List, Tuple, Optional, Any, Dict
+from typing import Iterable, List, Tuple, Optional, Any, Dict, Union
 
-from .executor import Executor
+from .executor import Executor, build_dependencies
+from . import deadlines
 from . import rollback
+from . import registry
+from . import powercfg
+from . import bcdedit
+from . import profile as profiles
 from .actions.factory import create_action, create_action_from_snapshot
 from .actions.verify_action import create_verify_action
 from .actions.base import ActionSnapshot
 from .tweak_id import TweakID
 from .tweak_state import TweakState
 from .state_machine import TweakStateMachine
-from .validation import TweakValidator
+from .validation import TweakValidator, snapshot_resources
+from .catalog_cache import CatalogCache
+from .catalog import TweakCatalog
+from .tweak_pack import PackMember, open_source
 from .constants import SCHEMA_VERSION
-from .migrations import migrate_to_v2
+from .migrations import migrate
 
 def _hook(event: str, ctx: dict) -> None:
     pass
 
+
+# A completed apply ends at APPLIED (`rollback.mark_applied`); applying
+# such a tweak again is a no-op.
+_APPLIED_STATES = {TweakState.APPLIED, TweakState.VERIFIED}
+
+
+def _discard_backups(snapshots: Iterable[ActionSnapshot]) -> None:
+    """Delete the backup files of snapshots that were never persisted."""
+    for path in {s.metadata["backup_file"] for s in snapshots if s is not None and s.metadata.get("backup_file")}:
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+@contextmanager
+def _timed(ctx: Dict[str, Any], phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        ctx.setdefault("timings_ms", {})[phase] = round((time.perf_counter() - start) * 1000, 3)
+
 class TweakManager:
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        step_timeout: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
         self.validator = TweakValidator()
+        # Parsed + validated definitions, persisted under the data directory.
+        self.tweak_cache = CatalogCache()
+        # None: ENHANCER_EXECUTOR_WORKERS, else sequential.
+        self.max_workers = max_workers
+        # Seconds per step / per apply; None leaves only the subprocess caps.
+        self.step_timeout = step_timeout
+        self.timeout = timeout
+        self._token: Optional[deadlines.CancelToken] = None
         self._rollback_execution = self._execute_rollback_steps
+        self._migrated = False
+
+    def _ensure_db(self) -> None:
+        # Deferred to the first command that needs history, so `plan`
+        # never creates or opens the database.
+        if self._migrated:
+            return
+        self._migrated = True
         try:
-            migrate_to_v2()
+            migrate(rollback.history_store())
         except Exception as e:
             print(f"[WARN] Database migration issue: {e}")
 
-    def load_tweak(self, tweak_path: Path) -> dict:
-        with open(tweak_path, "r", encoding="utf-8") as f:
-            tweak_def = json.load(f)
-        self.validator.validate_definition(tweak_def)
-        return tweak_def
+    def load_tweak(self, tweak_path: Union[Path, PackMember]) -> dict:
+        # Pack members are hash-checked by the pack; unchanged files come
+        # back validated from the catalog cache.
+        if isinstance(tweak_path, PackMember):
+            return tweak_path.load(self.validator.validate_definition)
+        return self.tweak_cache.load(tweak_path, self.validator.validate_definition)
+
+    def catalog(self, tweak_dir: Optional[Path] = None) -> TweakCatalog:
+        """Indexed view of `tweak_dir` (default: the shipped pack, else tweaks/), loaded through the catalog cache."""
+        return TweakCatalog(tweak_dir, cache=self.tweak_cache, validator=self.validator).scan()
 
     def apply(self, tweak_path: Path) -> bool:
+        self._ensure_db()
+        # The value cache lets post-apply verification read back what the
+        # apply phase just wrote without another registry round trip.
+        token = self._token = deadlines.CancelToken()
+        try:
+            with registry.scope(), registry.value_cache(), powercfg.scope(), \
+                    bcdedit.scope(), deadlines.scope(self.timeout, token):
+                return self._apply(tweak_path)
+        finally:
+            self._token = None
+
+    def plan(self, tweak_path: Path) -> List[Dict[str, Any]]:
+        """
+        Changes `apply` would make, in apply order, without writing to the
+        system or the history database.
+
+        Each change is {"type", "description", "current"}, where "current"
+        holds the values the snapshot read. Actions already in their target
+        state are left out.
+        """
+        ctx: Dict[str, Any] = {"command": "plan", "tweak_path": str(tweak_path)}
+        started = time.perf_counter()
+        try:
+            tweak = self.load_tweak(tweak_path)
+            ctx["tweak_id"] = str(TweakID.parse(tweak["id"]))
+            actions = [create_action(a) for a in tweak["actions"].get("apply", [])]
+
+            with registry.scope(), powercfg.scope(), bcdedit.scope():
+                snapshots = self._run_snapshot_phase(actions, preview=True)
+            pending = set(map(id, self._diff_phase(actions, snapshots)))
+
+            changes = [
+                {
+                    "type": action.action_type,
+                    "description": action.get_description(),
+                    "current": {
+                        k[len("old_"):]: v for k, v in snap.metadata.items() if k.startswith("old_")
+                    },
+                }
+                for action, snap in zip(actions, snapshots)
+                if id(action) in pending
+            ]
+            ctx["changes"] = len(changes)
+            ctx["writes_avoided"] = len(actions) - len(changes)
+            ctx["result"] = "success"
+            return changes
+
+        except Exception as e:
+            ctx["result"] = "failure"
+            ctx["error"] = e
+            raise
+
+        finally:
+            # No tweak_cache.flush(): planning leaves every file as it was,
+            # the catalog cache included.
+            ctx.setdefault("timings_ms", {})["total"] = round((time.perf_counter() - started) * 1000, 3)
+            _hook("plan", dict(ctx))
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """
+        Cancel the running apply from another thread. No further step starts;
+        the apply fails through the normal rollback path.
+        """
+        token = self._token
+        if token is not None:
+            token.cancel(reason)
+
+    def _apply(self, tweak_path: Path) -> bool:
         sm: Optional[TweakStateMachine] = None
+        # Snapshots taken but not yet saved by commit 1.
+        unsaved: List[ActionSnapshot] = []
+        started = time.perf_counter()
 
         ctx: Dict[str, Any] = {
             "command": "apply",
@@ -50,81 +179,392 @@ class TweakManager:
 
             if existing:
                 history_id = existing["id"]
-                sm = TweakStateMachine(history_id)
+                sm = self._state_machine(history_id)
                 state = sm.get_current_state()
 
                 ctx["history_id"] = history_id
 
-                if state == TweakState.VERIFIED:
+                if state in _APPLIED_STATES:
                     ctx["result"] = "noop"
                     return True
 
-                if state == TweakState.REVERTED:
-                    pass
-                else:
+                if state != TweakState.REVERTED:
                     raise RuntimeError(f"Cannot apply tweak in state {state}")
+                # REVERTED is terminal: a re-apply gets a new history entry.
+                sm = None
 
-            else:
+            # Same implicit-conflict check as `apply_batch`: a scheme-mode
+            # rollback must not clobber an active tweak's settings.
+            self.validator.validate_resources([tweak], snapshot_resources(rollback.get_active_histories()))
+
+            actions = [create_action(a) for a in tweak["actions"].get("apply", [])]
+            with _timed(ctx, "snapshot"):
+                snapshots = self._run_snapshot_phase(actions)
+            unsaved = snapshots
+
+            pending = self._diff_phase(actions, snapshots)
+            ctx["writes_avoided"] = len(actions) - len(pending)
+
+            # Commit 1: intent + snapshots are durable before the system is touched.
+            with _timed(ctx, "commit_intent"), rollback.unit_of_work():
                 history_id = rollback.create_history_entry(str(tweak_id))
                 self._persist_schema_version(history_id, SCHEMA_VERSION)
-                sm = TweakStateMachine(history_id)
+                sm = self._state_machine(history_id)
+                ctx["history_id"] = history_id
                 sm.transition("validate")
+                sm.transition("apply")
+                rollback.save_snapshots_v2(history_id, snapshots)
+            unsaved = []
 
-            sm.transition("apply")
-
-            snapshots = self._run_apply_phase(tweak["actions"].get("apply", []))
-            for snap in snapshots:
-                rollback.save_snapshot_v2(history_id, snap)
+            with _timed(ctx, "apply"):
+                self._run_apply_phase(pending)
 
             verify_list = tweak["actions"].get("verify", [])
             if verify_list:
-                ok, _ = self._run_verify_phase(verify_list, is_precheck=False)
+                with _timed(ctx, "verify"):
+                    ok, _ = self._run_verify_phase(
+                        verify_list,
+                        is_precheck=False,
+                        strict=tweak.get("verify_semantics") == "persisted",
+                    )
                 if not ok:
                     raise RuntimeError("Post-apply verification failed")
 
-            sm.transition("success")
-            sm.transition("verify")
+            # A cancelled or overdue apply is rolled back, not committed.
+            deadlines.check()
 
-            rollback.mark_applied(history_id)
+            # Commit 2: outcome.
+            with _timed(ctx, "commit_outcome"), rollback.unit_of_work():
+                sm.transition("success")
+                sm.transition("verify")
+                rollback.mark_applied(history_id)
 
+            if ctx["writes_avoided"]:
+                print(f"[INFO] {ctx['writes_avoided']} action(s) already in target state, not written.")
             print(f"\n[SUCCESS] Tweak '{tweak['name']}' applied and verified.")
 
             ctx["result"] = "success"
             return True
 
-        except Exception as e:
+        except (Exception, KeyboardInterrupt) as e:
+            # Deadline, cancellation and Ctrl+C take the same path as any
+            # other failure; rollback itself runs without the command's
+            # deadline or token.
+            _discard_backups(unsaved)
             if sm:
                 try:
-                    sm.transition("fail", {"error_message": str(e)})
-                    self._rollback_execution(sm.history_id)
+                    with deadlines.detached(), _timed(ctx, "rollback"):
+                        sm.transition("fail", {"error_message": str(e) or type(e).__name__})
+                        self._rollback_execution(sm.history_id)
                 except Exception:
                     pass
 
             ctx["result"] = "failure"
             ctx["error"] = e
+            if isinstance(e, (KeyboardInterrupt, deadlines.Cancelled)):
+                ctx["cancelled"] = True
+            if isinstance(e, KeyboardInterrupt):
+                raise
             return False
 
         finally:
+            self.tweak_cache.flush()
+            ctx.setdefault("timings_ms", {})["total"] = round((time.perf_counter() - started) * 1000, 3)
             _hook("apply", dict(ctx))
 
-    def _run_apply_phase(self, apply_actions_list: list) -> List[ActionSnapshot]:
+    def apply_batch(self, tweak_paths: List[Path]) -> bool:
+        """
+        Apply several tweaks as one unit: the batch is checked with
+        `validate_composition` against the active tweaks, snapshotted in one
+        batched pass, persisted in one commit before and one after, and
+        rolled back as a whole if any action or verification fails.
+        """
+        self._ensure_db()
+        token = self._token = deadlines.CancelToken()
+        try:
+            with registry.scope(), registry.value_cache(), powercfg.scope(), \
+                    bcdedit.scope(), deadlines.scope(self.timeout, token):
+                return self._apply_batch(tweak_paths)
+        finally:
+            self._token = None
+
+    def _apply_batch(self, tweak_paths: List[Path]) -> bool:
+        machines: List[TweakStateMachine] = []
+        unsaved: List[ActionSnapshot] = []
+        started = time.perf_counter()
+
+        ctx: Dict[str, Any] = {
+            "command": "apply_batch",
+            "tweak_paths": [str(p) for p in tweak_paths],
+        }
+
+        try:
+            tweaks = [self.load_tweak(p) for p in tweak_paths]
+            # Active histories carry their snapshots, so implicit conflicts
+            # (same value written) are found without extra queries.
+            histories = rollback.get_active_histories()
+            active = [h["tweak_id"] for h in histories]
+            self.validator.validate_composition(tweaks, active)
+            self.validator.validate_resources(tweaks, snapshot_resources(histories))
+
+            # Already applied tweaks are no-ops, as with `apply`.
+            pending = []
+            for tweak in tweaks:
+                tweak_id = str(TweakID.parse(tweak["id"]))
+                existing = rollback.get_history_by_tweak_id(tweak_id)
+                if existing:
+                    state = self._state_machine(existing["id"]).get_current_state()
+                    if state in _APPLIED_STATES:
+                        continue
+                    # REVERTED is terminal: a re-apply gets a new history entry.
+                    if state != TweakState.REVERTED:
+                        raise RuntimeError(f"Cannot apply tweak {tweak_id} in state {state}")
+                actions = [create_action(a) for a in tweak["actions"].get("apply", [])]
+                pending.append((tweak, tweak_id, actions))
+
+            ctx["tweak_ids"] = [tweak_id for _, tweak_id, _ in pending]
+            if not pending:
+                ctx["result"] = "noop"
+                return True
+
+            # One snapshot pass over the whole batch shares prefetches
+            # (same key, same scheme, same boot entry) across tweaks.
+            actions = [a for _, _, tweak_actions in pending for a in tweak_actions]
+            with _timed(ctx, "snapshot"):
+                snapshots = self._run_snapshot_phase(actions)
+            unsaved = snapshots
+            to_apply = self._diff_phase(actions, snapshots)
+            ctx["writes_avoided"] = len(actions) - len(to_apply)
+
+            # Commit 1: every tweak's intent + snapshots, together.
+            with _timed(ctx, "commit_intent"), rollback.unit_of_work():
+                offset = 0
+                for tweak, tweak_id, tweak_actions in pending:
+                    history_id = rollback.create_history_entry(tweak_id)
+                    self._persist_schema_version(history_id, SCHEMA_VERSION)
+                    sm = self._state_machine(history_id)
+                    sm.transition("validate")
+                    sm.transition("apply")
+                    rollback.save_snapshots_v2(
+                        sm.history_id, snapshots[offset:offset + len(tweak_actions)]
+                    )
+                    offset += len(tweak_actions)
+                    machines.append(sm)
+            unsaved = []
+
+            with _timed(ctx, "apply"):
+                self._run_apply_phase(to_apply)
+
+            with _timed(ctx, "verify"):
+                for tweak, tweak_id, _ in pending:
+                    verify_list = tweak["actions"].get("verify", [])
+                    if not verify_list:
+                        continue
+                    ok, _ = self._run_verify_phase(
+                        verify_list,
+                        is_precheck=False,
+                        strict=tweak.get("verify_semantics") == "persisted",
+                    )
+                    if not ok:
+                        raise RuntimeError(f"Post-apply verification failed for {tweak_id}")
+
+            deadlines.check()
+
+            # Commit 2: every outcome, together.
+            with _timed(ctx, "commit_outcome"), rollback.unit_of_work():
+                for sm in machines:
+                    sm.transition("success")
+                    sm.transition("verify")
+                    rollback.mark_applied(sm.history_id)
+
+            print(f"\n[SUCCESS] Batch of {len(pending)} tweak(s) applied and verified.")
+
+            ctx["result"] = "success"
+            return True
+
+        except (Exception, KeyboardInterrupt) as e:
+            # The whole batch goes back, last tweak first. One tweak whose
+            # rollback fails must not keep the others from being restored.
+            _discard_backups(unsaved)
+            if machines:
+                with deadlines.detached(), _timed(ctx, "rollback"):
+                    for sm in reversed(machines):
+                        try:
+                            sm.transition("fail", {"error_message": str(e) or type(e).__name__})
+                        except Exception as fail_error:
+                            print(f"[ERROR] Could not mark history {sm.history_id} failed: {fail_error}")
+                        try:
+                            self._rollback_execution(sm.history_id)
+                        except Exception as rollback_error:
+                            print(f"[ERROR] Rollback of history {sm.history_id} failed: {rollback_error}")
+
+            ctx["result"] = "failure"
+            ctx["error"] = e
+            print(f"\n[ERROR] Batch failed and was rolled back: {str(e) or type(e).__name__}")
+            if isinstance(e, (KeyboardInterrupt, deadlines.Cancelled)):
+                ctx["cancelled"] = True
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            return False
+
+        finally:
+            self.tweak_cache.flush()
+            ctx.setdefault("timings_ms", {})["total"] = round((time.perf_counter() - started) * 1000, 3)
+            _hook("apply_batch", dict(ctx))
+
+    def converge(
+        self,
+        profile: Union[Path, Iterable[str]],
+        tweak_dir: Optional[Path] = None,
+    ) -> bool:
+        """
+        Make the active tweak set equal `profile` (IDs, or a profile file).
+
+        One query yields the active set and its snapshots; only the
+        difference is touched: extra tweaks are reverted together,
+        dependents first, as `revert_all` does, and missing ones applied in
+        dependency-ordered batches. Tweak files are looked up in `tweak_dir`
+        only when something needs applying or reverting.
+        """
+        ctx: Dict[str, Any] = {"command": "converge"}
+        started = time.perf_counter()
+
+        try:
+            desired = profiles.load_profile(profile)
+            histories = rollback.get_active_histories()
+            active = [h["tweak_id"] for h in histories]
+
+            desired_set, active_set = set(desired), set(active)
+            to_apply = [t for t in desired if t not in active_set]
+            to_revert = [t for t in active if t not in desired_set]
+            ctx["to_apply"], ctx["to_revert"] = to_apply, to_revert
+
+            if not to_apply and not to_revert:
+                ctx["result"] = "noop"
+                return True
+
+            # A pack stays open until the batches have read their members.
+            with open_source(tweak_dir or profiles.default_tweak_source()) as source:
+                index = profiles.index_tweak_dir(source, self.load_tweak)
+                definitions = {tweak_id: d for tweak_id, (_, d) in index.items()}
+
+                missing = [t for t in to_apply if t not in index]
+                if missing:
+                    raise ValueError(f"No tweak file for: {', '.join(missing)}")
+                for tweak_id in desired:
+                    needed = set(definitions.get(tweak_id, {}).get("dependencies", [])) & set(to_revert)
+                    if needed:
+                        raise ValueError(
+                            f"'{tweak_id}' depends on {', '.join(sorted(needed))}, "
+                            "which the profile would revert."
+                        )
+
+                if to_revert:
+                    by_id = {h["tweak_id"]: h for h in histories}
+                    order = profiles.revert_order(to_revert, definitions)
+                    with registry.scope(), powercfg.scope(), bcdedit.scope():
+                        self._revert_histories([by_id[t] for t in order], ctx)
+
+                for batch in profiles.apply_batches(to_apply, definitions):
+                    if not self.apply_batch([index[t][0] for t in batch]):
+                        raise RuntimeError(f"Batch {', '.join(batch)} failed")
+
+            print(f"\n[SUCCESS] Converged: {len(to_apply)} applied, {len(to_revert)} reverted.")
+            ctx["result"] = "success"
+            return True
+
+        except Exception as e:
+            ctx["result"] = "failure"
+            ctx["error"] = e
+            print(f"\n[ERROR] Converge failed: {e}")
+            return False
+
+        finally:
+            self.tweak_cache.flush()
+            ctx.setdefault("timings_ms", {})["total"] = round((time.perf_counter() - started) * 1000, 3)
+            _hook("converge", dict(ctx))
+
+    def _executor(self) -> Executor:
+        return Executor(self.max_workers, self.step_timeout)
+
+    def _state_machine(self, history_id: int) -> TweakStateMachine:
+        return TweakStateMachine(history_id, rollback.history_store())
+
+    def _run_snapshot_phase(self, actions: list, preview: bool = False) -> List[ActionSnapshot]:
+        class SnapshotBatchStep:
+            # Read-only: batches of different types never conflict.
+            resources = frozenset()
+
+            def __init__(self, action_cls, batch):
+                self.snapshot_batch = action_cls.preview_batch if preview else action_cls.snapshot_batch
+                self.batch = batch
+
+            def execute(self):
+                snapshots = self.snapshot_batch(self.batch)
+                taken.extend(snapshots)
+                return snapshots
+
+        # Group by action class so each type can prefetch its reads
+        # (e.g. registry values grouped per key); order is restored below.
+        groups: Dict[type, List[int]] = {}
+        for i, action in enumerate(actions):
+            groups.setdefault(type(action), []).append(i)
+
+        steps = [
+            SnapshotBatchStep(action_cls, [actions[i] for i in indices])
+            for action_cls, indices in groups.items()
+        ]
+        taken: List[ActionSnapshot] = []
+        try:
+            results = self._executor().run_steps(steps)
+        except BaseException:
+            # Backups exported by the batches that did finish are never saved.
+            _discard_backups(taken)
+            raise
+
+        snapshots: List[ActionSnapshot] = [None] * len(actions)
+        for indices, batch_snapshots in zip(groups.values(), results):
+            for i, snap in zip(indices, batch_snapshots):
+                snapshots[i] = snap
+        return snapshots
+
+    def _diff_phase(self, actions: list, snapshots: List[ActionSnapshot]) -> list:
+        """
+        Actions that still need writing. Those already in their target state
+        are dropped and their snapshots marked "unchanged", so rollback
+        leaves them alone too.
+
+        Every snapshot is taken before the first write, so only the first
+        action on a target can be judged from its snapshot.
+        """
+        pending = []
+        seen = set()
+        for action, snap in zip(actions, snapshots):
+            target = action.target()
+            if target is not None and target not in seen and action.is_noop(snap):
+                snap.metadata["unchanged"] = True
+            else:
+                pending.append(action)
+            seen.add(target)
+        return pending
+
+    def _run_apply_phase(self, actions: list) -> None:
         class ApplyStep:
             def __init__(self, action):
                 self.action = action
+                self.resources = action.resources()
 
             def execute(self):
-                snap = self.action.snapshot()
                 self.action.apply()
-                return snap
 
-        actions = [create_action(a) for a in apply_actions_list]
-        steps = [ApplyStep(a) for a in actions]
-        return Executor().run_steps(steps)
+        self._executor().run_steps([ApplyStep(a) for a in actions])
 
     def _run_verify_phase(
-        self, verify_actions_list: list, is_precheck: bool
+        self, verify_actions_list: list, is_precheck: bool, strict: bool = False
     ) -> Tuple[bool, str]:
         class VerifyStep:
+            resources = frozenset()
+
             def __init__(self, action):
                 self.action = action
 
@@ -132,45 +572,213 @@ class TweakManager:
                 return self.action.verify()
 
         steps = [VerifyStep(create_verify_action(v)) for v in verify_actions_list]
-        results = Executor().run_steps(steps)
+        # `persisted` semantics require observing the stored value, not our
+        # own record of the write.
+        with registry.strict_reads() if strict else nullcontext():
+            results = self._executor().run_steps(steps)
         return all(results), "ok"
 
     def _persist_schema_version(self, history_id: int, version: int):
-        import sqlite3
+        rollback.set_schema_version(history_id, version)
 
-        conn = sqlite3.connect(rollback.DB_PATH)
-        try:
-            conn.execute(
-                "UPDATE tweak_history SET schema_version = ? WHERE id = ?",
-                (version, history_id),
-            )
-            conn.commit()
-        finally:
-            conn.close()
-
-    def _execute_rollback_steps(self, history_id: int):
+    def _execute_rollback_steps(self, history_id: int) -> int:
+        """Roll back `history_id`; returns the number of writes avoided."""
         raw_snapshots = rollback.get_snapshots_v2(history_id)
+        return self._rollback_snapshots(list(reversed(raw_snapshots)))
+
+    def _rollback_snapshots(self, raw_snapshots: List[Dict[str, Any]]) -> int:
+        """
+        Restore snapshot dicts given in rollback order (newest first);
+        returns the number of writes avoided.
+        """
         if not raw_snapshots:
-            return
+            return 0
+
+        class DiffStep:
+            resources = frozenset()
+
+            def __init__(self, step):
+                self.step = step
+
+            def execute(self):
+                return self.step.action.rollback_is_noop(self.step.snapshot)
 
         class RollbackStep:
             def __init__(self, action, snapshot):
                 self.action = action
                 self.snapshot = snapshot
+                self.resources = action.resources()
 
             def execute(self):
                 self.action.rollback(self.snapshot)
 
         steps = []
-        for snap_dict in reversed(raw_snapshots):
+        unchanged = 0
+        for snap_dict in raw_snapshots:
             snap = ActionSnapshot.from_dict(snap_dict)
+            if snap.metadata.get("unchanged"):
+                # Apply never wrote it; there is nothing to restore.
+                unchanged += 1
+                continue
             action = create_action_from_snapshot(snap)
             steps.append(RollbackStep(action, snap))
 
-        Executor().run_steps(steps)
+        # Joins the command's powercfg scope (or opens one for recovery) so a
+        # scheme backup shared by several snapshots is imported once.
+        with powercfg.scope():
+            # Read pass before any write. Only steps that no earlier rollback
+            # step touches (no dependency) see the state they restore over.
+            candidates = [
+                step for step, deps in zip(steps, build_dependencies(steps))
+                if not deps and step.resources is not None
+            ]
+            matches = self._executor().run_steps([DiffStep(step) for step in candidates])
+            skip = {id(step) for step, match in zip(candidates, matches) if match}
+
+            self._executor().run_steps([step for step in steps if id(step) not in skip])
+
+        return unchanged + len(skip)
 
     def revert(self, tweak_id_str: str) -> bool:
+        self._ensure_db()
+        with registry.scope(), powercfg.scope(), bcdedit.scope():
+            return self._revert(tweak_id_str)
+
+    def revert_all(self, tweak_dir: Optional[Path] = None) -> bool:
+        """
+        Revert every active tweak as one operation.
+
+        Histories and snapshots are read in one query. Tweaks are reverted
+        newest first and dependents before their dependencies (as declared
+        in `tweak_dir`); several snapshots of one value collapse into a
+        single restore of the original from before the earliest-applied
+        tweak. Rollback steps on independent
+        resources run concurrently when the executor has workers.
+        """
+        self._ensure_db()
+        with registry.scope(), powercfg.scope(), bcdedit.scope():
+            return self._revert_all(tweak_dir)
+
+    def _revert_all(self, tweak_dir: Optional[Path]) -> bool:
+        ctx: Dict[str, Any] = {"command": "revert_all"}
+        started = time.perf_counter()
+
+        try:
+            histories = rollback.get_active_histories()
+            if not histories:
+                ctx["result"] = "noop"
+                return True
+
+            by_id = {h["tweak_id"]: h for h in histories}
+            index = profiles.index_tweak_dir(tweak_dir or profiles.default_tweak_source())
+            order = profiles.revert_order(
+                list(by_id), {tweak_id: d for tweak_id, (_, d) in index.items()}
+            )
+            ctx["tweak_ids"] = order
+
+            self._revert_histories([by_id[t] for t in order], ctx)
+
+            print(f"\n[SUCCESS] Reverted {len(order)} tweak(s).")
+            ctx["result"] = "success"
+            return True
+
+        except Exception as e:
+            print(f"\n[ERROR] Revert of all tweaks failed: {e}")
+            ctx["result"] = "failure"
+            ctx["error"] = e
+            return False
+
+        finally:
+            ctx.setdefault("timings_ms", {})["total"] = round((time.perf_counter() - started) * 1000, 3)
+            _hook("revert_all", dict(ctx))
+
+    def _revert_histories(self, histories: List[Dict[str, Any]], ctx: Dict[str, Any]) -> None:
+        """
+        Revert active histories (from `get_active_histories`), given in
+        revert order, as one operation: one commit marks them all
+        reverting, their snapshots are coalesced and restored together, and
+        one commit marks them reverted. On failure those still reverting
+        are marked failed and the error is re-raised.
+        """
+        machines = [self._state_machine(h["id"]) for h in histories]
+        try:
+            with rollback.unit_of_work():
+                for sm in machines:
+                    sm.transition("revert")
+
+            ordered, ranks = [], []
+            for history in histories:
+                for position in reversed(range(len(history["snapshots"]))):
+                    ordered.append(history["snapshots"][position])
+                    ranks.append((history["id"], position))
+            restores, coalesced = self._coalesce_snapshots(ordered, ranks)
+            with _timed(ctx, "rollback"):
+                avoided = self._rollback_snapshots(restores)
+            ctx["writes_avoided"] = avoided + coalesced
+
+            with rollback.unit_of_work():
+                for sm in machines:
+                    sm.transition("success")
+
+        except Exception as e:
+            # Histories left in "reverting" would block any later revert.
+            for sm in machines:
+                try:
+                    if sm.get_current_state() == TweakState.REVERTING:
+                        sm.transition("fail", {"error_message": str(e) or type(e).__name__})
+                except Exception as fail_error:
+                    print(f"[ERROR] Could not mark history {sm.history_id} failed: {fail_error}")
+            raise
+
+    @staticmethod
+    def _coalesce_snapshots(
+        ordered: List[Dict[str, Any]], ranks: List[Tuple[int, int]]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Keep one restore per target: the snapshot with the lowest rank
+        (history id, position in its history), i.e. the one taken before the
+        earliest-applied tweak touched it. Revert order follows dependencies
+        and need not match apply order, so position alone cannot tell. The
+        restore runs where the target's last snapshot sat in rollback order.
+        Returns the remaining snapshots and the number dropped.
+
+        The kept snapshot is restored unless every tweak left the target
+        unchanged; a later tweak may have changed what the first did not.
+        """
+        targets = [
+            create_action_from_snapshot(ActionSnapshot.from_dict(s)).target() for s in ordered
+        ]
+        first: Dict[Tuple[str, ...], int] = {}
+        last: Dict[Tuple[str, ...], int] = {}
+        changed: Dict[Tuple[str, ...], bool] = {}
+        for i, (snap, target) in enumerate(zip(ordered, targets)):
+            if target is not None:
+                if target not in first or ranks[i] < ranks[first[target]]:
+                    first[target] = i
+                last[target] = i
+                changed[target] = changed.get(target, False) or not snap["metadata"].get("unchanged")
+
+        kept: List[Dict[str, Any]] = []
+        dropped = 0
+        for i, (snap, target) in enumerate(zip(ordered, targets)):
+            if target is None:
+                kept.append(snap)
+                continue
+            if first[target] != i:
+                dropped += not snap["metadata"].get("unchanged")
+            if last[target] != i:
+                continue
+            snap = ordered[first[target]]
+            if changed[target] and snap["metadata"].get("unchanged"):
+                metadata = dict(snap["metadata"])
+                del metadata["unchanged"]
+                snap = {"action_type": snap["action_type"], "metadata": metadata}
+            kept.append(snap)
+        return kept, dropped
+
+    def _revert(self, tweak_id_str: str) -> bool:
         ctx = {"command": "revert", "tweak_id": tweak_id_str}
+        started = time.perf_counter()
 
         try:
             row = rollback.get_history_by_tweak_id(tweak_id_str)
@@ -179,7 +787,7 @@ class TweakManager:
                 return True
 
             history_id = row["id"]
-            sm = TweakStateMachine(history_id)
+            sm = self._state_machine(history_id)
             state = sm.get_current_state()
 
             if state == TweakState.REVERTED:
@@ -187,7 +795,10 @@ class TweakManager:
                 return True
 
             sm.transition("revert")
-            self._rollback_execution(history_id)
+            # Bounded by step and subprocess timeouts only: a revert cut short
+            # by a command deadline would leave the system half-restored.
+            with _timed(ctx, "rollback"):
+                ctx["writes_avoided"] = self._rollback_execution(history_id) or 0
             sm.transition("success")
 
             ctx["result"] = "success"
@@ -196,12 +807,15 @@ class TweakManager:
         except Exception as e:
             ctx["result"] = "failure"
             ctx["error"] = e
+            print(f"\n[ERROR] Revert of '{tweak_id_str}' failed: {e}")
             return False
 
         finally:
+            ctx.setdefault("timings_ms", {})["total"] = round((time.perf_counter() - started) * 1000, 3)
             _hook("revert", dict(ctx))
     
     def list_active(self) -> None:
+        self._ensure_db()
 
         tweaks = rollback.get_active_tweaks()
         if not tweaks:
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import mmap
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from .constants import SCHEMA_VERSION
+
+Definition = Dict[str, Any]
+
+PACK_SUFFIX = ".etpk"
+MAGIC = b"ETPK"
+FORMAT_VERSION = 1
+
+# magic, format version, header length
+_PREAMBLE = struct.Struct("<4sHI")
+
+
+class PackError(ValueError):
+    """A tweak pack is malformed, or an entry does not match its hash."""
+
+
+def is_pack(path: Union[str, Path]) -> bool:
+    return Path(path).suffix == PACK_SUFFIX and Path(path).is_file()
+
+
+def build_pack(tweak_dir: Path, out_path: Path) -> int:
+    """
+    Write every `*.json` tweak in `tweak_dir` into one pack at `out_path`.
+
+    Layout: preamble, JSON header, then the definitions back to back as
+    compact JSON. The header maps each tweak ID to [offset, length, sha256,
+    source file name] (offsets relative to the data section) and holds the
+    SHA-256 of the whole data section. Returns the number of tweaks packed.
+    """
+    blobs: List[bytes] = []
+    entries: Dict[str, List[Any]] = {}
+    offset = 0
+    for path in sorted(Path(tweak_dir).glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            definition = json.load(f)
+        tweak_id = definition["id"]
+        if tweak_id in entries:
+            raise PackError(f"Duplicate tweak ID {tweak_id} in {path} and {entries[tweak_id][3]}")
+        blob = json.dumps(definition, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        entries[tweak_id] = [offset, len(blob), hashlib.sha256(blob).hexdigest(), path.name]
+        blobs.append(blob)
+        offset += len(blob)
+
+    data = b"".join(blobs)
+    header = json.dumps({
+        "schema_version": SCHEMA_VERSION,
+        "content_sha256": hashlib.sha256(data).hexdigest(),
+        "entries": entries,
+    }, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(data)
+    tmp.replace(out_path)
+    return len(entries)
+
+
+class TweakPack:
+    """
+    Read-only, memory-mapped tweak pack.
+
+    Opening reads only the header; `read`/`load` slice one definition out
+    of the mapping and check its hash, so a run touches just the tweaks it
+    needs. `verify()` checks the whole data section against the header.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._read_header()
+        except Exception:
+            self._map.close()
+            raise
+
+    def _read_header(self) -> None:
+        if len(self._map) < _PREAMBLE.size:
+            raise PackError(f"{self.path}: truncated pack")
+        magic, version, header_len = _PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise PackError(f"{self.path}: not a tweak pack")
+        if version != FORMAT_VERSION:
+            raise PackError(f"{self.path}: unsupported pack format v{version}")
+
+        self._data_start = _PREAMBLE.size + header_len
+        try:
+            header = json.loads(self._map[_PREAMBLE.size:self._data_start].decode("utf-8"))
+            self.entries: Dict[str, List[Any]] = header["entries"]
+            self.content_sha256: str = header["content_sha256"]
+            self.schema_version: int = header["schema_version"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise PackError(f"{self.path}: corrupt header: {e}")
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "TweakPack":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, tweak_id: str) -> bool:
+        return tweak_id in self.entries
+
+    def ids(self) -> List[str]:
+        return sorted(self.entries)
+
+    def read(self, tweak_id: str) -> bytes:
+        """Raw definition bytes of `tweak_id`, checked against the header hash."""
+        try:
+            offset, length, digest = self.entries[tweak_id][:3]
+        except KeyError:
+            raise KeyError(f"{tweak_id} is not in {self.path}")
+        start = self._data_start + offset
+        blob = self._map[start:start + length]
+        if len(blob) != length or hashlib.sha256(blob).hexdigest() != digest:
+            raise PackError(f"{self.path}: entry {tweak_id} is corrupt")
+        return blob
+
+    def load(self, tweak_id: str) -> Definition:
+        return json.loads(self.read(tweak_id).decode("utf-8"))
+
+    def verify(self) -> bool:
+        """True if the data section matches the header's content hash."""
+        return hashlib.sha256(self._map[self._data_start:]).hexdigest() == self.content_sha256
+
+    def member(self, tweak_id: str) -> "PackMember":
+        if tweak_id not in self.entries:
+            raise KeyError(f"{tweak_id} is not in {self.path}")
+        return PackMember(self, tweak_id)
+
+    def members(self) -> Iterator["PackMember"]:
+        for tweak_id in self.ids():
+            yield PackMember(self, tweak_id)
+
+
+class PackMember:
+    """
+    One tweak inside a pack. `TweakManager` accepts it wherever it takes a
+    tweak file path; `str()` gives "<pack>#<tweak_id>".
+    """
+
+    __slots__ = ("pack", "tweak_id")
+
+    def __init__(self, pack: TweakPack, tweak_id: str) -> None:
+        self.pack = pack
+        self.tweak_id = tweak_id
+
+    @property
+    def name(self) -> str:
+        return f"{self.pack.path.name}#{self.tweak_id}"
+
+    def read(self) -> Definition:
+        return self.pack.load(self.tweak_id)
+
+    def load(self, validate: Callable[[Definition], None]) -> Definition:
+        definition = self.read()
+        validate(definition)
+        return definition
+
+    def __str__(self) -> str:
+        return f"{self.pack.path}#{self.tweak_id}"
+
+    def __repr__(self) -> str:
+        return f"PackMember('{self}')"
+
+
+def open_member(ref: str) -> Optional[PackMember]:
+    """
+    The member for "<pack>.etpk#<tweak_id>", or None if `ref` is not such a
+    reference. The pack stays open; close it with `member.pack.close()`.
+    """
+    pack_path, sep, tweak_id = str(ref).partition("#")
+    if not sep or not is_pack(pack_path):
+        return None
+    pack = TweakPack(pack_path)
+    try:
+        return pack.member(tweak_id)
+    except KeyError:
+        pack.close()
+        raise
+
+
+@contextmanager
+def open_source(path: Union[str, Path]) -> Iterator[Union[Path, TweakPack]]:
+    """The pack at `path`, open for the block, or `path` itself if it is not a pack."""
+    if is_pack(path):
+        with TweakPack(path) as pack:
+            yield pack
+    else:
+        yield Path(path)
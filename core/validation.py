@@ -1,11 +1,31 @@
+import json
+import os
 import re
-from typing import Any, Dict, List, Set, Tuple
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 from .tweak_id import TweakID
 from .constants import SCHEMA_VERSION
+from .tweak_pack import PackMember
+
+# What an action writes: its `target()`, or its single resource when it has
+# no narrower target (services, powercfg scheme mode).
+Resource = Tuple[str, ...]
+
+# Below this many files `validate_many` stays in process (pool start-up
+# costs more than it saves).
+PARALLEL_THRESHOLD = 64
+
+# Largest batch `validate_composition` accepts per tier, and its action cap.
+BATCH_LIMITS = {0: 20, 1: 10, 2: 3, 3: 1}
+MAX_BATCH_ACTIONS = 50
 
 class ValidationError(Exception):
     """Raised when a tweak violates schema or composition rules."""
-    pass
+
+    def __init__(self, message: str, code: str = "invalid") -> None:
+        super().__init__(message)
+        # Machine-readable rule name, e.g. "invalid_tier" (see docs/TWEAK_SCHEMA.md).
+        self.code = code
 
 
 class TweakValidator:
@@ -28,31 +48,124 @@ class TweakValidator:
 
     def _validate_definition_internal(self, definition: Dict[str, Any], partial: bool = False) -> None:
         self._validate_mandatory_fields(definition)
-        self._validate_id_format(definition["id"])
+        for check in self._definition_checks(partial):
+            check(definition)
+
+    def _definition_checks(self, partial: bool) -> List[Callable[[Dict[str, Any]], None]]:
+        # Run after _validate_mandatory_fields, in this order.
+        checks = [
+            lambda d: self._validate_id_format(d["id"]),
+            self._validate_schema_version,
+            self._validate_tier_risk_consistency,
+            self._validate_scope_boot_consistency,
+            self._validate_rollback_logic,
+        ]
+        if not partial:
+            checks.append(self._validate_verify_semantics)
+        checks.append(self._validate_action_integrity)
+        return checks
+
+    def collect_errors(self, definition: Dict[str, Any]) -> List[ValidationError]:
+        """
+        Every rule `validate_definition` would enforce, without stopping at
+        the first failure. Missing mandatory fields are reported alone, as
+        the other rules read them.
+        """
+        try:
+            self._validate_mandatory_fields(definition)
+        except ValidationError as e:
+            return [e]
+
+        errors = []
+        for check in self._definition_checks(partial=False):
+            try:
+                check(definition)
+            except ValidationError as e:
+                errors.append(e)
+            except (KeyError, TypeError, AttributeError) as e:
+                errors.append(ValidationError(f"Malformed definition: {e!r}", code="malformed"))
+        return errors
+
+    def validate_many(
+        self,
+        sources: Iterable[Union[str, Path, PackMember]],
+        max_workers: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Validate many tweak files (or pack members) and return every error.
+
+        Files are parsed and checked on a process pool once there are at
+        least `PARALLEL_THRESHOLD` of them (`max_workers=1` keeps it in
+        process). The parent then checks invariants across files: duplicate
+        IDs and `dependencies`/`conflicts_with` targets no file defines.
+
+        Each error is {"file", "tweak_id", "code", "message"}, ordered by
+        file; an empty list means everything is valid.
+        """
+        jobs = []
+        for source in sources:
+            if isinstance(source, PackMember):
+                # Pack members hold an mmap; ship the definition instead.
+                try:
+                    jobs.append((str(source), source.read()))
+                except (OSError, ValueError) as e:
+                    jobs.append((str(source), e))
+            else:
+                jobs.append((str(source), None))
+
+        workers = max_workers or min(os.cpu_count() or 1, 8)
+        if workers > 1 and len(jobs) >= PARALLEL_THRESHOLD:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_check_source, jobs, chunksize=chunksize))
+        else:
+            results = [_check_source(job) for job in jobs]
+
+        errors: List[Dict[str, Any]] = []
+        owners: Dict[str, str] = {}
+        for file, tweak_id, _, _, file_errors in results:
+            errors.extend(file_errors)
+            if tweak_id is None:
+                continue
+            if tweak_id in owners:
+                errors.append(_error(file, tweak_id, ValidationError(
+                    f"Duplicate tweak ID '{tweak_id}' (also in {owners[tweak_id]})", code="duplicate_id"
+                )))
+            else:
+                owners[tweak_id] = file
+
+        for file, tweak_id, dependencies, conflicts, _ in results:
+            for field, targets, code in (
+                ("dependencies", dependencies, "dangling_dependency"),
+                ("conflicts_with", conflicts, "dangling_conflict"),
+            ):
+                for target in targets:
+                    if target not in owners:
+                        errors.append(_error(file, tweak_id, ValidationError(
+                            f"{field} names '{target}', which no tweak defines", code=code
+                        )))
+
+        errors.sort(key=lambda e: e["file"])
+        return errors
         
+    def _validate_schema_version(self, definition: Dict[str, Any]) -> None:
         declared_version = definition.get("schema_version", 1)
         if declared_version != SCHEMA_VERSION:
             raise ValidationError(
                 f"Schema version mismatch. Tweak declares v{declared_version}, "
-                f"Engine requires v{SCHEMA_VERSION}."
+                f"Engine requires v{SCHEMA_VERSION}.",
+                code="schema_version",
             )
-        
-        self._validate_tier_risk_consistency(definition)
-        self._validate_scope_boot_consistency(definition)
-        self._validate_rollback_logic(definition)
-        
-        if not partial:
-            self._validate_verify_semantics(definition)
-            
-        self._validate_action_integrity(definition)
-        
+
     def validate_composition(
         self, 
         batch: List[Dict[str, Any]], 
         active_tweak_ids: List[str]
     ) -> None:
         if not batch:
-            raise ValidationError("Batch cannot be empty.")
+            raise ValidationError("Batch cannot be empty.", code="empty_batch")
         
         parsed_tweaks = []
         for t_def in batch:
@@ -60,7 +173,7 @@ class TweakValidator:
                 self._validate_definition_internal(t_def, partial=True) 
                 parsed_tweaks.append(t_def)
             except ValidationError as e:
-                raise ValidationError(f"Invalid tweak in batch: {e}")
+                raise ValidationError(f"Invalid tweak in batch: {e}", code=e.code)
 
         self._check_tier_homogeneity(parsed_tweaks)
         self._check_tier3_isolation(parsed_tweaks) 
@@ -73,6 +186,19 @@ class TweakValidator:
         self._check_dependencies(parsed_tweaks, active_tweak_ids)
         self._check_batch_size_limits(parsed_tweaks)
 
+    def validate_resources(
+        self,
+        batch: List[Dict[str, Any]],
+        active_resources: Dict[Resource, str],
+    ) -> None:
+        """
+        Implicit conflicts against the active set: a batch tweak writing a
+        value an active tweak wrote. `active_resources` maps resources to
+        active tweak IDs (see `snapshot_resources`). Conflicts inside the
+        batch are already part of `validate_composition`.
+        """
+        self._check_implicit_conflicts(batch, active_resources)
+
     def _validate_mandatory_fields(self, definition: Dict[str, Any]) -> None:
         # Core mandatory fields (description is now optional for testing flexibility)
         mandatory = {
@@ -86,7 +212,9 @@ class TweakValidator:
         }
         missing = mandatory - set(definition.keys())
         if missing:
-            raise ValidationError(f"Missing mandatory fields: {', '.join(missing)}")
+            raise ValidationError(
+                f"Missing mandatory fields: {', '.join(sorted(missing))}", code="missing_fields"
+            )
         
         # Provide default for optional description
         if "description" not in definition:
@@ -97,7 +225,8 @@ class TweakValidator:
             return  # legacy
         if not self.ID_PATTERN.match(tweak_id):
             raise ValidationError(
-                f"Invalid ID format: '{tweak_id}'. Expected 'category.name@version'."
+                f"Invalid ID format: '{tweak_id}'. Expected 'category.name@version'.",
+                code="invalid_id",
             )
 
 
@@ -106,20 +235,22 @@ class TweakValidator:
         risk = definition["risk_level"]
         
         if tier not in self.VALID_TIERS:
-            raise ValidationError(f"Invalid tier: {tier}")
+            raise ValidationError(f"Invalid tier: {tier}", code="invalid_tier")
         if risk not in self.VALID_RISK_LEVELS:
-            raise ValidationError(f"Invalid risk_level: {risk}")
+            raise ValidationError(f"Invalid risk_level: {risk}", code="invalid_risk_level")
             
         # Rule: tier >= 2 MUST have risk >= medium
         if tier >= 2 and risk == "low":
             raise ValidationError(
-                f"Tier {tier} tweaks cannot have 'low' risk_level."
+                f"Tier {tier} tweaks cannot have 'low' risk_level.",
+                code="tier_risk_mismatch",
             )
             
         # Rule: tier 3 SHOULD be high risk (enforced strict for Harden phase)
         if tier == 3 and risk != "high":
             raise ValidationError(
-                "Tier 3 (Experimental) tweaks require 'high' risk_level."
+                "Tier 3 (Experimental) tweaks require 'high' risk_level.",
+                code="tier_risk_mismatch",
             )
 
     def _validate_scope_boot_consistency(self, definition: Dict[str, Any]) -> None:
@@ -127,29 +258,31 @@ class TweakValidator:
         reboot = definition["requires_reboot"]
         
         if not isinstance(scope, list) or not scope:
-            raise ValidationError("Scope must be a non-empty list.")
+            raise ValidationError("Scope must be a non-empty list.", code="invalid_scope")
             
         for s in scope:
             if s not in self.VALID_SCOPES:
-                raise ValidationError(f"Invalid scope value: {s}")
+                raise ValidationError(f"Invalid scope value: {s}", code="invalid_scope")
                 
         # Rule: scope contains 'boot' -> requires_reboot=true
         if "boot" in scope and not reboot:
             raise ValidationError(
-                "Tweaks modifying boot configuration MUST require reboot."
+                "Tweaks modifying boot configuration MUST require reboot.",
+                code="boot_without_reboot",
             )
 
     def _validate_rollback_logic(self, definition: Dict[str, Any]) -> None:
         guaranteed = definition["rollback_guaranteed"]
         
         if not isinstance(guaranteed, bool):
-            raise ValidationError("rollback_guaranteed must be boolean.")
+            raise ValidationError("rollback_guaranteed must be boolean.", code="invalid_rollback_guaranteed")
             
         # Rule: Tier 3 implies rollback not guaranteed
         if definition["tier"] == 3 and guaranteed:
             raise ValidationError(
                 "Tier 3 tweaks cannot guarantee rollback. "
-                "Set rollback_guaranteed=false."
+                "Set rollback_guaranteed=false.",
+                code="tier3_rollback_guaranteed",
             )
             
         # Rule: If not guaranteed, limitations must be declared (relaxed for testing)
@@ -162,68 +295,76 @@ class TweakValidator:
 
         if semantics == "deferred" and "verify_notes" not in definition:
             raise ValidationError(
-                "Deferred verification requires verify_notes."
+                "Deferred verification requires verify_notes.",
+                code="missing_verify_notes",
             )
 
         if semantics == "runtime" and definition["requires_reboot"]:
             raise ValidationError(
-                "Cannot runtime-verify reboot-required tweak."
+                "Cannot runtime-verify reboot-required tweak.",
+                code="runtime_verify_reboot",
             )
 
 
     def _validate_action_integrity(self, definition: Dict[str, Any]) -> None:
         if "actions" not in definition:
-            raise ValidationError("Missing 'actions' object in definition.")
+            raise ValidationError("Missing 'actions' object in definition.", code="invalid_actions")
             
         actions = definition["actions"]
         if not isinstance(actions, dict):
-            raise ValidationError("'actions' must be a dictionary (apply/verify).")
+            raise ValidationError("'actions' must be a dictionary (apply/verify).", code="invalid_actions")
             
         if "apply" not in actions or not isinstance(actions["apply"], list):
-            raise ValidationError("'actions.apply' must be a list.")
+            raise ValidationError("'actions.apply' must be a list.", code="invalid_actions")
             
         if "verify" in actions and not isinstance(actions["verify"], list):
-            raise ValidationError("'actions.verify' must be a list.")
+            raise ValidationError("'actions.verify' must be a list.", code="invalid_actions")
 
 
     def _check_tier_homogeneity(self, batch: List[Dict[str, Any]]) -> None:
         tiers = {t["tier"] for t in batch}
         if len(tiers) > 1:
             raise ValidationError(
-                f"Cannot mix tweaks of different Tiers in batch: {tiers}"
+                f"Cannot mix tweaks of different Tiers in batch: {tiers}",
+                code="mixed_tiers",
             )
 
     def _check_tier3_isolation(self, batch: List[Dict[str, Any]]) -> None:
         if batch[0]["tier"] == 3 and len(batch) > 1:
             raise ValidationError(
-                "Tier 3 tweaks cannot be batched."
+                "Tier 3 tweaks cannot be batched.",
+                code="tier3_batched",
             )
 
     def _check_reboot_homogeneity(self, batch: List[Dict[str, Any]]) -> None:
         reboots = {t["requires_reboot"] for t in batch}
         if len(reboots) > 1:
             raise ValidationError(
-                "Cannot mix tweaks requiring reboot with those that don't."
+                "Cannot mix tweaks requiring reboot with those that don't.",
+                code="mixed_reboot",
             )
 
     def _check_rollback_guarantee_homogeneity(self, batch: List[Dict[str, Any]]) -> None:
         guarantees = {t["rollback_guaranteed"] for t in batch}
         if len(guarantees) > 1:
             raise ValidationError(
-                "Cannot mix guaranteed and non-guaranteed rollback tweaks."
+                "Cannot mix guaranteed and non-guaranteed rollback tweaks.",
+                code="mixed_rollback_guarantee",
             )
 
     def _check_non_guaranteed_isolation(self, batch: List[Dict[str, Any]]) -> None:
         if not batch[0]["rollback_guaranteed"] and len(batch) > 1:
             raise ValidationError(
-                "Tweaks without guaranteed rollback must execute individually."
+                "Tweaks without guaranteed rollback must execute individually.",
+                code="non_guaranteed_batched",
             )
 
     def _check_verify_semantics_homogeneity(self, batch: List[Dict[str, Any]]) -> None:
         semantics = {t.get("verify_semantics", "runtime") for t in batch}
         if len(semantics) > 1:
             raise ValidationError(
-                "Cannot mix different verify_semantics in same batch."
+                "Cannot mix different verify_semantics in same batch.",
+                code="mixed_verify_semantics",
             )
 
     def _check_boot_isolation(self, batch: List[Dict[str, Any]]) -> None:
@@ -232,64 +373,213 @@ class TweakValidator:
         
         if has_boot and has_non_boot:
             raise ValidationError(
-                "Tweaks with 'boot' scope cannot batch with non-boot tweaks."
+                "Tweaks with 'boot' scope cannot batch with non-boot tweaks.",
+                code="mixed_boot_scope",
             )
 
     def _check_conflicts(self, batch: List[Dict[str, Any]], active_ids: List[str]) -> None:
+        # Declared conflicts, then values written by more than one tweak;
+        # set/dict lookups keep both linear in the batch size.
         active_set = set(active_ids)
-        
+        batch_ids = {t["id"] for t in batch}
+
         for t in batch:
             conflicts = t.get("conflicts_with", [])
             t_id = t["id"]
-            
+
             for conflict_id in conflicts:
                 if conflict_id in active_set:
                     raise ValidationError(
                         f"Conflict detected: Tweak '{t_id}' conflicts with active tweak '{conflict_id}'. "
-                        f"Revert '{conflict_id}' first."
+                        f"Revert '{conflict_id}' first.",
+                        code="conflict",
                     )
-            
-            for other_t in batch:
-                other_id = other_t["id"]
-                if t_id != other_id and other_id in conflicts:
+            for conflict_id in conflicts:
+                if conflict_id != t_id and conflict_id in batch_ids:
+                    raise ValidationError(
+                        f"Conflict detected within batch: '{t_id}' vs '{conflict_id}'.",
+                        code="conflict",
+                    )
+
+        self._check_implicit_conflicts(batch, {})
+
+    def _check_implicit_conflicts(
+        self,
+        batch: List[Dict[str, Any]],
+        active_resources: Dict[Resource, str],
+    ) -> None:
+        owners: Dict[Resource, str] = {}
+        covered: Dict[Resource, Set[str]] = {}
+        active_covered = _covered_by(active_resources)
+        for t in batch:
+            t_id = t["id"]
+            for resource in action_resources(t["actions"]["apply"]):
+                owner = _overlapping_owner(resource, t_id, owners, covered)
+                if owner is not None:
+                    raise ValidationError(
+                        f"Implicit conflict within batch: '{owner}' and '{t_id}' both write "
+                        f"{describe_resource(resource)}.",
+                        code="implicit_conflict",
+                    )
+                active_owner = _overlapping_owner(resource, t_id, active_resources, active_covered)
+                if active_owner is not None:
                     raise ValidationError(
-                        f"Conflict detected within batch: '{t_id}' vs '{other_id}'."
+                        f"Implicit conflict: Tweak '{t_id}' writes {describe_resource(resource)}, "
+                        f"already set by active tweak '{active_owner}'. Revert '{active_owner}' first.",
+                        code="implicit_conflict",
                     )
+                owners.setdefault(resource, t_id)
+                for n in range(2, len(resource)):
+                    covered.setdefault(resource[:n], set()).add(t_id)
 
     def _check_dependencies(self, batch: List[Dict[str, Any]], active_ids: List[str]) -> None:
         active_set = set(active_ids)
-        
+        deps_of = {t["id"]: set(t.get("dependencies", [])) for t in batch}
+
         for t in batch:
             deps = t.get("dependencies", [])
             for dep_id in deps:
                 if dep_id not in active_set:
                     raise ValidationError(
                         f"Dependency unsatisfied: Tweak '{t['id']}' requires '{dep_id}'. "
-                        f"Apply dependency first."
+                        f"Apply dependency first.",
+                        code="unsatisfied_dependency",
                     )
-            
-            for other_t in batch:
-                if t["id"] in other_t.get("dependencies", []) and other_t["id"] in deps:
-                     raise ValidationError(
-                        f"Circular dependency detected: '{t['id']}' <-> '{other_t['id']}'."
+
+            for dep_id in deps:
+                if t["id"] in deps_of.get(dep_id, ()):
+                    raise ValidationError(
+                        f"Circular dependency detected: '{t['id']}' <-> '{dep_id}'.",
+                        code="circular_dependency",
                     )
 
     def _check_batch_size_limits(self, batch: List[Dict[str, Any]]) -> None:
         tier = batch[0]["tier"]
-        
-        max_tweaks = 0
-        if tier == 0: max_tweaks = 20
-        elif tier == 1: max_tweaks = 10
-        elif tier == 2: max_tweaks = 3
-        elif tier == 3: max_tweaks = 1
-        
+        max_tweaks = BATCH_LIMITS.get(tier, 0)
+
         if len(batch) > max_tweaks:
             raise ValidationError(
-                f"Batch size {len(batch)} exceeds limit of {max_tweaks} for Tier {tier}."
+                f"Batch size {len(batch)} exceeds limit of {max_tweaks} for Tier {tier}.",
+                code="batch_too_large",
             )
             
         total_actions = sum(len(t["actions"]["apply"]) for t in batch)
-        if total_actions > 50:
+        if total_actions > MAX_BATCH_ACTIONS:
             raise ValidationError(
-                f"Total actions ({total_actions}) exceeds batch limit of 50."
-            )
\ No newline at end of file
+                f"Total actions ({total_actions}) exceeds batch limit of {MAX_BATCH_ACTIONS}.",
+                code="batch_too_large",
+            )
+
+
+def _resource_of(action: Any) -> Optional[Resource]:
+    resource = action.target()
+    if resource is None:
+        resources = action.resources()
+        if resources is not None and len(resources) == 1:
+            resource = next(iter(resources))
+    return resource
+
+
+def _covered_by(owners: Dict[Resource, str]) -> Dict[Resource, Set[str]]:
+    """{prefix: tweak IDs} for every proper prefix of the owned resources."""
+    covered: Dict[Resource, Set[str]] = {}
+    for resource, owner in owners.items():
+        for n in range(2, len(resource)):
+            covered.setdefault(resource[:n], set()).add(owner)
+    return covered
+
+
+def _overlapping_owner(
+    resource: Resource,
+    tweak_id: str,
+    owners: Dict[Resource, str],
+    covered: Dict[Resource, Set[str]],
+) -> Optional[str]:
+    """
+    Another tweak writing `resource`, a resource containing it, or one
+    inside it. Resources nest only for powercfg: a scheme-mode action owns
+    ("powercfg", scheme), since its rollback re-imports the whole scheme
+    and would undo every other tweak's settings in it.
+    """
+    for n in range(2, len(resource) + 1):
+        owner = owners.get(resource[:n])
+        if owner is not None and owner != tweak_id:
+            return owner
+    return next((t for t in sorted(covered.get(resource, ())) if t != tweak_id), None)
+
+
+def action_resources(action_defs: Iterable[Dict[str, Any]]) -> Set[Resource]:
+    """Resources written by these action definitions (unparseable ones are skipped)."""
+    from .actions.factory import create_action
+
+    resources = set()
+    for definition in action_defs:
+        try:
+            resource = _resource_of(create_action(definition))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if resource is not None:
+            resources.add(resource)
+    return resources
+
+
+def snapshot_resources(histories: Iterable[Dict[str, Any]]) -> Dict[Resource, str]:
+    """
+    {resource: tweak_id} for active histories as returned by
+    `rollback.get_active_histories`, from their persisted snapshots.
+    """
+    from .actions.base import ActionSnapshot
+    from .actions.factory import create_action_from_snapshot
+
+    owners: Dict[Resource, str] = {}
+    for history in histories:
+        for snap in history["snapshots"]:
+            try:
+                action = create_action_from_snapshot(ActionSnapshot.from_dict(snap))
+                resource = _resource_of(action)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if resource is not None:
+                owners.setdefault(resource, history["tweak_id"])
+    return owners
+
+
+def describe_resource(resource: Resource) -> str:
+    kind, *parts = resource
+    if kind == "registry" and len(parts) == 3:
+        from .registry import HIVES
+
+        hive = next((name for name, h in HIVES.items() if str(h) == parts[0]), parts[0])
+        return f"registry value {hive}\\{parts[1]}\\{parts[2]}"
+    return f"{kind} {' '.join(parts)}"
+
+
+def _error(file: str, tweak_id: Optional[str], error: ValidationError) -> Dict[str, Any]:
+    return {"file": file, "tweak_id": tweak_id, "code": error.code, "message": str(error)}
+
+
+def _refs(definition: Dict[str, Any], field: str) -> List[str]:
+    value = definition.get(field, [])
+    return [v for v in value if isinstance(v, str)] if isinstance(value, list) else []
+
+
+def _check_source(job: Tuple[str, Any]) -> Tuple[str, Optional[str], List[str], List[str], List[Dict[str, Any]]]:
+    """
+    Pool worker for `validate_many`: (file, tweak_id, dependencies,
+    conflicts_with, errors) for one file, or for a definition already read.
+    """
+    file, definition = job
+    try:
+        if isinstance(definition, Exception):
+            raise definition
+        if definition is None:
+            with open(file, "r", encoding="utf-8") as f:
+                definition = json.load(f)
+        if not isinstance(definition, dict):
+            raise ValueError("top level is not an object")
+    except (OSError, ValueError) as e:
+        return file, None, [], [], [_error(file, None, ValidationError(f"Unreadable: {e}", code="unreadable"))]
+
+    tweak_id = definition.get("id") if isinstance(definition.get("id"), str) else None
+    errors = [_error(file, tweak_id, e) for e in TweakValidator().collect_errors(definition)]
+    return file, tweak_id, _refs(definition, "dependencies"), _refs(definition, "conflicts_with"), errors
@@ -9,18 +9,23 @@ from pathlib import Path
 from utils.admin import require_admin
 from core.tweak_manager import TweakManager
 from core.recovery import RecoveryManager
+from core.profile import TWEAK_PACK
+from core.tweak_pack import PackMember, TweakPack, is_pack, open_member
 
 
 def print_usage():
     print("""
 USAGE:
     python main.py apply <tweak.json>     - Apply a tweak
+    python main.py apply <tweak_id>       - Apply a tweak from the shipped tweaks.etpk
+    python main.py apply <pack.etpk#id>   - Apply one tweak from a tweak pack
     python main.py revert <tweak_id>      - Revert a previously applied tweak
     python main.py list                   - List active tweaks
     python main.py recover                - Scan and recover interrupted operations
 
 EXAMPLES:
     python main.py apply tweaks/gaming.disable_game_dvr@1.0.json
+    python main.py apply gaming.disable_game_dvr@1.0
     python main.py revert gaming.disable_game_dvr
     python main.py list
     python main.py recover
@@ -31,6 +36,24 @@ TWEAK ID FORMATS:
     """)
 
 
+def _tweak_source(ref: str):
+    """
+    A tweak file, a "<pack>.etpk#<tweak_id>" member, or a bare tweak ID
+    looked up in the shipped pack. None if nothing matches.
+    """
+    member = open_member(ref)
+    if member is not None:
+        return member
+    if Path(ref).exists():
+        return Path(ref)
+    if is_pack(TWEAK_PACK):
+        pack = TweakPack(TWEAK_PACK)
+        if ref in pack:
+            return pack.member(ref)
+        pack.close()
+    return None
+
+
 def run_recovery_check(manager: TweakManager):
     """Run recovery scan on startup."""
     recovery = RecoveryManager(auto_recover=True)
@@ -74,12 +97,16 @@ def main():
             print_usage()
             sys.exit(1)
         
-        tweak_path = Path(sys.argv[2])
-        if not tweak_path.exists():
-            print(f"ERROR: File not found: {tweak_path}")
+        tweak_path = _tweak_source(sys.argv[2])
+        if tweak_path is None:
+            print(f"ERROR: File not found: {sys.argv[2]}")
             sys.exit(1)
         
-        success = manager.apply(tweak_path)
+        try:
+            success = manager.apply(tweak_path)
+        finally:
+            if isinstance(tweak_path, PackMember):
+                tweak_path.pack.close()
         sys.exit(0 if success else 1)
     
     elif command == "revert":
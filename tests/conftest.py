@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+import core.rollback as roll_mod
+import core.tweak_manager as tm_mod
+from core import registry
+from core.history_store import close_store
+from core.registry_backends import MemoryRegistryBackend
+from core.tweak_manager import TweakManager
+
+
+@pytest.fixture(autouse=True)
+def memory_registry():
+    """Every test runs against a fresh in-memory registry, never the host's."""
+    with registry.use_backend(MemoryRegistryBackend()) as backend:
+        yield backend
+
+
+@pytest.fixture(autouse=True)
+def catalog_cache_path(tmp_path, monkeypatch):
+    """Keep the persistent tweak catalog cache out of the source tree."""
+    path = tmp_path / "tweak_catalog.json"
+    monkeypatch.setenv("ENHANCER_CATALOG_CACHE", str(path))
+    return path
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """
+    A TweakManager on a fresh history database (`manager.db`). Hook
+    contexts are collected in `manager.events`, newest last.
+    """
+    db = tmp_path / "enhancer.db"
+    monkeypatch.setattr(roll_mod, "DB_PATH", db)
+    events = []
+    monkeypatch.setattr(tm_mod, "_hook", lambda event, ctx: events.append(ctx))
+    m = TweakManager()
+    m.db = db
+    m.events = events
+    yield m
+    close_store(db)
+
+
+def _tweak_definition(name, writes, verify=(), **extra):
+    definition = {
+        "id": f"test.{name}@1.0",
+        "name": name,
+        "tier": 0,
+        "risk_level": "low",
+        "requires_reboot": False,
+        "rollback_guaranteed": True,
+        "scope": ["registry"],
+        "schema_version": 1,
+        "actions": {
+            "apply": [
+                {"type": "registry", "path": path, "key": key, "value": value, "force_create": True}
+                for path, key, value in writes
+            ],
+        },
+    }
+    if verify:
+        definition["actions"]["verify"] = [
+            {"type": "registry", "path": path, "key": key, "expected": expected, "expected_type": "DWORD"}
+            for path, key, expected in verify
+        ]
+    definition.update(extra)
+    return definition
+
+
+@pytest.fixture
+def tweak_definition():
+    """
+    Builds a valid registry tweak `test.<name>@1.0`: `writes` are
+    (path, key, value) DWORD writes, `verify` (path, key, expected) checks;
+    `extra` overrides or adds top-level fields.
+    """
+    return _tweak_definition
+
+
+@pytest.fixture
+def make_tweak(tmp_path):
+    """Like `tweak_definition`, but writes `<tmp_path>/tweaks/<name>.json` and returns its path."""
+    def make(name, writes, verify=(), **extra):
+        path = tmp_path / "tweaks" / f"{name}.json"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps(_tweak_definition(name, writes, verify, **extra)))
+        return path
+    return make
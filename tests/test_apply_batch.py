@@ -0,0 +1,138 @@
+import core.rollback as roll_mod
+from core import registry
+from core.history_store import get_store
+
+PATH = "HKCU\\Software\\EnhancerBatch"
+
+
+def _tweak(make_tweak, name, keys, verify_value=1, **extra):
+    """Writes 1 to each of `keys` under PATH and verifies `verify_value`."""
+    return make_tweak(
+        name,
+        [(PATH, k, 1) for k in keys],
+        verify=[(PATH, k, verify_value) for k in keys],
+        **extra,
+    )
+
+
+def _statuses(db):
+    return dict(get_store(db).query_all("SELECT tweak_id, status FROM tweak_history"))
+
+
+def test_batch_applies_every_tweak_in_two_commits(manager, make_tweak, memory_registry):
+    paths = [_tweak(make_tweak, "one", ["A", "B"]), _tweak(make_tweak, "two", ["C"])]
+    store = get_store(roll_mod.DB_PATH)
+    store.connection()
+    commits = store.stats["commits"]
+
+    assert manager.apply_batch(paths)
+
+    assert store.stats["commits"] - commits == 2
+    assert memory_registry.stats["get_values"] == 1
+    assert _statuses(roll_mod.DB_PATH) == {"test.one@1.0": "applied", "test.two@1.0": "applied"}
+    assert manager.events[-1]["tweak_ids"] == ["test.one@1.0", "test.two@1.0"]
+
+
+def test_failed_verification_rolls_back_the_whole_batch(manager, make_tweak):
+    paths = [_tweak(make_tweak, "one", ["A"]), _tweak(make_tweak, "two", ["B"], verify_value=2)]
+
+    assert not manager.apply_batch(paths)
+
+    assert registry.get_value(PATH, "A") == (None, None)
+    assert not registry.subkey_exists(PATH)
+    assert set(_statuses(roll_mod.DB_PATH).values()) == {"failed"}
+
+
+def test_composition_is_validated_against_active_tweaks(manager, make_tweak):
+    assert manager.apply(_tweak(make_tweak, "base", ["A"]))
+    conflicting = _tweak(make_tweak, "other", ["B"], conflicts_with=["test.base@1.0"])
+
+    assert not manager.apply_batch([conflicting])
+
+    assert "conflict" in str(manager.events[-1]["error"]).lower()
+    assert registry.get_value(PATH, "B") == (None, None)
+
+
+def test_batch_rejects_value_already_written_by_an_active_tweak(manager, make_tweak, memory_registry):
+    assert manager.apply(_tweak(make_tweak, "owner", ["A"]))
+    memory_registry.stats.clear()
+
+    assert not manager.apply_batch([_tweak(make_tweak, "other", ["B"]), _tweak(make_tweak, "rival", ["a"])])
+
+    error = manager.events[-1]["error"]
+    assert error.code == "implicit_conflict"
+    assert "test.owner@1.0" in str(error)
+    assert sum(memory_registry.stats.values()) == 0
+    assert _statuses(roll_mod.DB_PATH) == {"test.owner@1.0": "applied"}
+
+
+def test_single_apply_rejects_value_already_written_by_an_active_tweak(manager, make_tweak, memory_registry):
+    assert manager.apply(_tweak(make_tweak, "owner", ["A"]))
+    memory_registry.stats.clear()
+
+    assert not manager.apply(_tweak(make_tweak, "rival", ["a"]))
+
+    error = manager.events[-1]["error"]
+    assert error.code == "implicit_conflict"
+    assert "test.owner@1.0" in str(error)
+    assert sum(memory_registry.stats.values()) == 0
+    assert _statuses(roll_mod.DB_PATH) == {"test.owner@1.0": "applied"}
+
+
+def test_one_failing_rollback_does_not_stop_the_others(manager, make_tweak, capsys):
+    paths = [
+        _tweak(make_tweak, "one", ["A"]),
+        _tweak(make_tweak, "two", ["B"]),
+        _tweak(make_tweak, "three", ["C"], verify_value=2),
+    ]
+    rollback_steps = manager._rollback_execution
+    broken = []
+
+    def rollback_execution(history_id):
+        if not broken:
+            broken.append(history_id)
+            raise RuntimeError("rollback exploded")
+        return rollback_steps(history_id)
+
+    manager._rollback_execution = rollback_execution
+
+    assert not manager.apply_batch(paths)
+
+    # "three" is rolled back first and fails; "two" and "one" are still restored
+    assert registry.get_value(PATH, "A") == (None, None)
+    assert registry.get_value(PATH, "B") == (None, None)
+    assert set(_statuses(roll_mod.DB_PATH).values()) == {"failed"}
+    assert "rollback exploded" in capsys.readouterr().out
+
+
+def test_reverted_tweaks_are_reapplied_with_new_histories(manager, make_tweak):
+    one, two = _tweak(make_tweak, "one", ["A"]), _tweak(make_tweak, "two", ["B"])
+    assert manager.apply(one)
+    assert manager.revert("test.one@1.0")
+
+    assert manager.apply(one)
+    assert registry.get_value(PATH, "A")[0] == 1
+
+    assert manager.revert("test.one@1.0")
+    assert manager.apply_batch([one, two])
+    assert registry.get_value(PATH, "A")[0] == 1
+
+    rows = get_store(roll_mod.DB_PATH).query_all(
+        "SELECT status FROM tweak_history WHERE tweak_id = 'test.one@1.0' ORDER BY id"
+    )
+    assert [r[0] for r in rows] == ["reverted", "reverted", "applied"]
+
+
+def test_applied_members_are_skipped_on_rerun(manager, make_tweak, memory_registry):
+    one, two = _tweak(make_tweak, "one", ["A"]), _tweak(make_tweak, "two", ["B"])
+    assert manager.apply(one)
+    assert _statuses(roll_mod.DB_PATH) == {"test.one@1.0": "applied"}
+
+    assert manager.apply(one)
+    assert manager.events[-1]["result"] == "noop"
+
+    assert manager.apply_batch([one, two])
+    assert manager.events[-1]["tweak_ids"] == ["test.two@1.0"]
+    assert manager.apply_batch([one, two])
+    assert manager.events[-1]["result"] == "noop"
+    assert _statuses(roll_mod.DB_PATH) == {"test.one@1.0": "applied", "test.two@1.0": "applied"}
@@ -0,0 +1,127 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from core import bcdedit, commands
+from core.actions.bcdedit_action import BcdEditAction
+
+FIXTURES = Path(__file__).parent / "fixtures" / "bcdedit"
+CORPUS = sorted(FIXTURES.glob("*.txt"))
+
+
+def legacy_find(output, datatype):
+    # The per-call lookup BcdEditAction used before the structured parser.
+    match = re.compile(rf"^{re.escape(datatype)}\s+(.*)$", re.MULTILINE).search(output)
+    if match:
+        val = match.group(1).strip()
+        return val if val else None
+    return None
+
+
+def test_parse_enum_splits_entries_and_skips_headings():
+    entries = bcdedit.parse_enum((FIXTURES / "enum_all.txt").read_text())
+
+    identifiers = [e["identifier"] for e in entries]
+    assert identifiers[:4] == [
+        "{fwbootmgr}", "{bootmgr}", "{4f0e9a55-7d2b-11ee-9c5e-b8a4c1c6d1a2}", "{current}",
+    ]
+    assert len(entries) == 14
+    assert all("windows" not in e and "firmware" not in e for e in entries)
+
+    bootmgr = entries[1]
+    assert bootmgr["displayorder"] == "{current}"
+    assert bootmgr["timeout"] == "30"
+    assert entries[3]["hypervisorlaunchtype"] == "Auto"
+
+
+@pytest.mark.parametrize("fixture", CORPUS, ids=lambda p: p.name)
+def test_find_value_matches_legacy_lookup_on_corpus(fixture):
+    output = fixture.read_text()
+    entries = bcdedit.parse_enum(output)
+    datatypes = {key for entry in entries for key in entry}
+
+    for datatype in datatypes | {"missing", "testsigning"}:
+        assert bcdedit.find_value(entries, datatype) == legacy_find(output, datatype), datatype
+
+
+class FakeBcdedit(commands.CommandRunner):
+    def __init__(self):
+        self.values = dict(bcdedit.parse_enum((FIXTURES / "enum_current.txt").read_text())[0])
+        self.calls = []
+
+    def run(self, argv, timeout):
+        args = argv[1:]
+        self.calls.append(args)
+        if args[0] == "/enum":
+            body = "\n".join(f"{k:<24}{v}" for k, v in self.values.items())
+            return commands.CommandResult(argv, 0, f"\nWindows Boot Loader\n---\n{body}\n")
+        if args[0] == "/set":
+            self.values[args[2]] = args[3]
+        elif args[0] == "/deletevalue":
+            self.values.pop(args[2], None)
+        return commands.CommandResult(argv, 0, "")
+
+
+@pytest.fixture
+def fake():
+    fake = FakeBcdedit()
+    with commands.use_runner(fake):
+        yield fake
+
+
+def test_actions_share_one_enumeration_per_identifier(fake):
+    actions = [
+        BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "nx", "value": "AlwaysOn"}),
+        BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "hypervisorlaunchtype", "value": "Off"}),
+        BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "useplatformclock", "value": "Yes"}),
+    ]
+
+    with bcdedit.scope() as cache:
+        snapshots = [a.snapshot() for a in actions]
+        for a in actions:
+            a.apply()
+        assert all(a.verify() for a in actions)
+
+    assert [s.metadata["old_value"] for s in snapshots] == ["OptIn", "Auto", None]
+    assert sum(1 for c in fake.calls if c[0] == "/enum") == 2
+    assert cache.stats["enumerations"] == 2
+
+
+def test_values_cached_while_a_write_runs_are_dropped(fake, monkeypatch):
+    action = BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "nx", "value": "AlwaysOn"})
+    fake_run = fake.run
+
+    def run(argv, timeout):
+        if argv[1] == "/set":
+            # another thread enumerates before the write lands
+            bcdedit.query_value("{current}", "nx")
+        return fake_run(argv, timeout)
+
+    monkeypatch.setattr(fake, "run", run)
+    with bcdedit.scope():
+        bcdedit.query_value("{current}", "nx")
+        action.apply()
+        assert bcdedit.query_value("{current}", "nx") == "AlwaysOn"
+
+
+def test_without_scope_every_lookup_enumerates(fake):
+    action = BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "nx", "value": "OptIn"})
+    assert action.verify()
+    assert action.verify()
+    assert fake.calls == [["/enum", "{current}"]] * 2
+
+
+def test_noop_diff_compares_against_the_snapshot(fake):
+    keep = BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "nx", "value": "OptIn"})
+    drop = BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "useplatformclock", "delete": True})
+    change = BcdEditAction({"type": "bcdedit", "id_type": "{current}", "datatype": "nx", "value": "AlwaysOn"})
+
+    with bcdedit.scope():
+        assert keep.is_noop(keep.snapshot())
+        assert drop.is_noop(drop.snapshot())
+        snap = change.snapshot()
+        assert not change.is_noop(snap)
+        assert keep.rollback_is_noop(snap)
+        change.apply()
+        assert not keep.rollback_is_noop(snap)
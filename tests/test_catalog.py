@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from core import catalog_cache
+from core.catalog import TweakCatalog, version_key
+from core.tweak_manager import TweakManager
+
+
+def _definition(tweak_id, tier=0, scope=("registry",), risk="low", **extra):
+    definition = {
+        "id": tweak_id,
+        "name": tweak_id,
+        "tier": tier,
+        "risk_level": risk,
+        "requires_reboot": "boot" in scope,
+        "rollback_guaranteed": tier < 3,
+        "scope": list(scope),
+        "schema_version": 1,
+        "actions": {
+            "apply": [{"type": "registry", "path": "HKCU\\Software\\EnhancerCatalog",
+                       "key": "A", "value": 1, "force_create": True}],
+        },
+    }
+    if "boot" in scope:
+        definition.update(verify_semantics="deferred", verify_notes="Checked after reboot")
+    definition.update(extra)
+    return definition
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    d = tmp_path / "tweaks"
+    d.mkdir()
+    definitions = [
+        _definition("gaming.disable_dvr@1.0"),
+        _definition("gaming.disable_dvr@1.10", legacy_id="011"),
+        _definition("gaming.disable_dvr@1.2"),
+        _definition("power.ultimate_plan@2.0", tier=2, scope=("power",), risk="medium"),
+        _definition("boot.no_dynamic_tick@1.0", tier=3, scope=("boot", "registry"), risk="high"),
+        {"id": "011", "name": "Disable Game DVR", "category": "gaming", "actions": {"apply": []}},
+    ]
+    for i, definition in enumerate(definitions):
+        (d / f"{i}.json").write_text(json.dumps(definition))
+    (d / "broken.json").write_text("{")
+    return TweakCatalog(d).scan()
+
+
+def test_scan_indexes_valid_and_legacy_files(catalog):
+    assert len(catalog) == 6
+    assert catalog.get("011").is_legacy and not catalog.get("011").valid
+    assert catalog.get("gaming.disable_dvr@1.2").valid
+    assert "broken" not in {e.path.stem for e in catalog}
+
+
+def test_versions_order_numerically_and_latest_is_highest(catalog):
+    assert [e.id for e in catalog.versions("gaming.disable_dvr")] == [
+        "gaming.disable_dvr@1.0", "gaming.disable_dvr@1.2", "gaming.disable_dvr@1.10",
+    ]
+    assert catalog.latest("gaming.disable_dvr").id == "gaming.disable_dvr@1.10"
+    assert catalog.latest("gaming.disable_dvr@1.0").id == "gaming.disable_dvr@1.10"
+    assert catalog.latest("gaming.unknown") is None
+    assert version_key("1.10") > version_key("1.2")
+
+
+def test_find_intersects_filters(catalog):
+    ids = lambda entries: [e.id for e in entries]
+
+    assert ids(catalog.find(tier=0, scope="registry")) == [
+        "gaming.disable_dvr@1.0", "gaming.disable_dvr@1.10", "gaming.disable_dvr@1.2",
+    ]
+    assert ids(catalog.find(tier=0, scope="registry", latest_only=True)) == ["gaming.disable_dvr@1.10"]
+    assert ids(catalog.find(scope="registry", risk_level="high")) == ["boot.no_dynamic_tick@1.0"]
+    assert ids(catalog.find(tier=2, scope="registry")) == []
+    assert "011" in ids(catalog.find(category="gaming"))
+
+
+def test_resolve_maps_legacy_ids_to_their_successor(catalog):
+    assert catalog.resolve("011").id == "gaming.disable_dvr@1.10"
+    assert catalog.resolve("gaming.disable_dvr@1.0").id == "gaming.disable_dvr@1.0"
+    assert catalog.resolve("gaming.disable_dvr").id == "gaming.disable_dvr@1.10"
+    assert catalog.resolve("nothing") is None
+
+
+def test_rescan_reuses_cached_definitions(catalog, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "RACY_WINDOW", -1.0)
+    manager = TweakManager()
+    first = manager.catalog(catalog.tweak_dir)
+    misses = manager.tweak_cache.stats["misses"]
+    second = manager.catalog(catalog.tweak_dir)
+
+    assert [e.id for e in first] == [e.id for e in second]
+    # valid files come from the cache; the legacy and broken files are re-read
+    assert manager.tweak_cache.stats["misses"] - misses == 2
+    assert manager.tweak_cache.stats["hits"] == 10
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from core import catalog_cache
+from core.catalog_cache import CatalogCache
+from core.validation import TweakValidator, ValidationError
+
+VALIDATE = TweakValidator().validate_definition
+
+
+def _definition(**overrides):
+    definition = {
+        "id": "test.cache@1.0",
+        "name": "Cache",
+        "tier": 1,
+        "risk_level": "low",
+        "requires_reboot": False,
+        "rollback_guaranteed": True,
+        "scope": ["registry"],
+        "schema_version": 1,
+        "actions": {
+            "apply": [{"type": "registry", "path": "HKCU\\Software\\EnhancerCache",
+                       "key": "A", "value": 1, "force_create": True}],
+        },
+    }
+    definition.update(overrides)
+    return definition
+
+
+@pytest.fixture
+def tweak(tmp_path, monkeypatch):
+    # Files written by the test are "old" unless a test says otherwise.
+    monkeypatch.setattr(catalog_cache, "RACY_WINDOW", -1.0)
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps(_definition()))
+    return path
+
+
+def _counting(calls):
+    def validate(definition):
+        calls.append(definition["id"])
+        VALIDATE(definition)
+    return validate
+
+
+def test_hit_across_instances_skips_parse_and_validation(tweak, catalog_cache_path):
+    calls = []
+    first = CatalogCache()
+    loaded = first.load(tweak, _counting(calls))
+    first.flush()
+
+    second = CatalogCache()
+    assert second.load(tweak, _counting(calls)) == loaded
+    assert calls == ["test.cache@1.0"]
+    assert first.stats["misses"] == 1 and second.stats["hits"] == 1
+    assert catalog_cache_path.exists()
+
+
+def test_stored_definition_is_normalised_and_copied(tweak):
+    cache = CatalogCache()
+    loaded = cache.load(tweak, VALIDATE)
+    loaded["name"] = "mutated"
+
+    again = cache.load(tweak, VALIDATE)
+    assert again["name"] == "Cache"
+    assert again == dict(loaded, name="Cache")
+
+
+def test_changed_content_is_a_miss(tweak):
+    cache = CatalogCache()
+    cache.load(tweak, VALIDATE)
+    tweak.write_text(json.dumps(_definition(name="Changed name")))
+
+    assert cache.load(tweak, VALIDATE)["name"] == "Changed name"
+    assert cache.stats["misses"] == 2
+
+
+def test_touched_file_is_rehashed_not_revalidated(tweak):
+    calls = []
+    cache = CatalogCache()
+    cache.load(tweak, _counting(calls))
+    st = tweak.stat()
+    os.utime(tweak, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    cache.load(tweak, _counting(calls))
+    cache.load(tweak, _counting(calls))
+    assert calls == ["test.cache@1.0"]
+    assert cache.stats["rehashes"] == 1 and cache.stats["hits"] == 1
+
+
+def test_recently_modified_file_is_always_hashed(tweak, monkeypatch):
+    monkeypatch.setattr(catalog_cache, "RACY_WINDOW", 3600.0)
+    cache = CatalogCache()
+    cache.load(tweak, VALIDATE)
+    cache.load(tweak, VALIDATE)
+    assert cache.stats["hits"] == 0 and cache.stats["rehashes"] == 1
+
+
+def test_invalid_file_is_not_stored(tweak):
+    tweak.write_text(json.dumps(_definition(tier=9)))
+    cache = CatalogCache()
+    for _ in range(2):
+        with pytest.raises(ValidationError):
+            cache.load(tweak, VALIDATE)
+    assert cache.stats["misses"] == 2
+
+
+def test_stale_cache_version_is_discarded(tweak, catalog_cache_path):
+    cache = CatalogCache()
+    cache.load(tweak, VALIDATE)
+    cache.flush()
+    data = json.loads(catalog_cache_path.read_text())
+    catalog_cache_path.write_text(json.dumps(dict(data, version=0)))
+
+    fresh = CatalogCache()
+    fresh.load(tweak, VALIDATE)
+    assert fresh.stats["misses"] == 1
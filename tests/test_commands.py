@@ -0,0 +1,129 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from core import commands, deadlines, powercfg
+from core.actions.powercfg_action import PowerCfgAction
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SCHEME = "381b4222-f694-41f0-9685-ff5bb260df2e"
+
+
+@pytest.fixture(autouse=True)
+def fresh_service(monkeypatch):
+    monkeypatch.setattr(commands, "_slots", None)
+    monkeypatch.setattr(commands, "metrics", commands.CommandMetrics())
+    monkeypatch.setattr(commands, "RETRY_BACKOFF", 0.0)
+
+
+def test_replay_serves_recordings_per_argv_in_order():
+    runner = commands.ReplayRunner([
+        {"argv": ["bcdedit", "/enum", "{current}"], "stdout": "first"},
+        {"argv": ["bcdedit", "/enum", "{current}"], "stdout": "second"},
+        {"argv": ["bcdedit", "/set", "*"], "stdout": "ok"},
+    ])
+
+    with commands.use_runner(runner):
+        outputs = [commands.run(["bcdedit.exe", "/enum", "{current}"]).stdout for _ in range(3)]
+        assert commands.run(["C:\\Windows\\System32\\bcdedit.exe", "/set", "{current}", "nx", "OptIn"]).stdout == "ok"
+        with pytest.raises(KeyError, match="No recording"):
+            commands.run(["bcdedit.exe", "/deletevalue", "{current}", "nx"])
+
+    assert outputs == ["first", "second", "second"]
+    assert len(runner.calls) == 5
+
+
+def test_transient_failures_are_retried_and_counted():
+    runner = commands.ReplayRunner([
+        {"argv": ["powercfg", "/import", "*"], "returncode": 1,
+         "stderr": "The process cannot access the file because it is being used by another process."},
+        {"argv": ["powercfg", "/import", "b.pow"], "returncode": 0},
+    ])
+
+    with commands.use_runner(runner):
+        with pytest.raises(commands.CommandError, match="powercfg failed with code 1"):
+            commands.run(["powercfg.exe", "/import", "a.pow"])
+        commands.run(["powercfg.exe", "/import", "b.pow"])
+
+    stats = commands.metrics.snapshot()["powercfg"]
+    assert len(runner.calls) == 1 + commands.RETRIES + 1
+    assert stats["calls"] == 4
+    assert stats["failures"] == 3
+    assert stats["retries"] == 2
+
+
+def test_permanent_failures_are_not_retried():
+    runner = commands.ReplayRunner([
+        {"argv": ["bcdedit", "*"], "returncode": 1, "stderr": "The parameter is incorrect."},
+    ])
+    with commands.use_runner(runner):
+        result = commands.run(["bcdedit.exe", "/set", "x"], check=False)
+    assert result.returncode == 1
+    assert len(runner.calls) == 1
+
+
+
+def test_command_timeouts_are_not_retried():
+    class SlowRunner(commands.CommandRunner):
+        calls = 0
+
+        def run(self, argv, timeout):
+            SlowRunner.calls += 1
+            raise deadlines.DeadlineExceeded("powercfg /list timed out after 30.0s")
+
+    with commands.use_runner(SlowRunner()):
+        with pytest.raises(deadlines.DeadlineExceeded):
+            commands.run(["powercfg.exe", "/list"])
+
+    assert SlowRunner.calls == 1
+    assert commands.metrics.snapshot()["powercfg"]["failures"] == 1
+
+
+def test_process_concurrency_is_bounded():
+    class CountingRunner(commands.CommandRunner):
+        def __init__(self):
+            self.active = self.peak = 0
+            self.lock = threading.Lock()
+
+        def run(self, argv, timeout):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            threading.Event().wait(0.02)
+            with self.lock:
+                self.active -= 1
+            return commands.CommandResult(argv, 0, "")
+
+    commands.set_max_processes(2)
+    runner = CountingRunner()
+    with commands.use_runner(runner):
+        threads = [threading.Thread(target=commands.run, args=(["powercfg.exe", "/list"],)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert runner.peak == 2
+    assert commands.metrics.snapshot()["powercfg"]["calls"] == 8
+
+
+def test_powercfg_action_runs_from_recording_file(tmp_path):
+    recording = tmp_path / "replay.json"
+    recording.write_text(json.dumps({"recordings": [
+        {"argv": ["powercfg.exe", "/query", SCHEME],
+         "stdout": (FIXTURES / "powercfg" / "query_scheme_balanced.txt").read_text()},
+        {"argv": ["powercfg.exe", "/setacvalueindex", "*"], "stdout": ""},
+    ]}))
+    runner = commands.ReplayRunner.from_file(recording)
+    action = PowerCfgAction({"type": "powercfg", "scheme_guid": SCHEME, "subgroup_guid": "SUB_PROCESSOR",
+                             "setting_guid": "PROCTHROTTLEMIN", "value_ac": 5})
+
+    with commands.use_runner(runner), powercfg.scope():
+        snapshot = action.snapshot()
+        action.apply()
+        assert action.verify()
+
+    assert snapshot.metadata["old_value_ac"] == 5
+    assert [c[1] for c in runner.calls] == ["/query", "/setacvalueindex", "/query"]
@@ -0,0 +1,95 @@
+import pytest
+
+import core.rollback as roll_mod
+from core import profile, registry
+from core.history_store import get_store
+
+PATH = "HKCU\\Software\\EnhancerConverge"
+
+
+@pytest.fixture
+def tweak_dir(tmp_path, make_tweak):
+    make_tweak("base", [(PATH, "base", 1)])
+    make_tweak("extra", [(PATH, "extra", 1)], dependencies=["test.base@1.0"])
+    make_tweak("other", [(PATH, "other", 1)])
+    return tmp_path / "tweaks"
+
+
+def _active():
+    return sorted(t["tweak_id"] for t in roll_mod.get_active_tweaks())
+
+
+def test_converge_applies_and_reverts_only_the_delta(manager, tweak_dir):
+    assert manager.converge(["test.extra@1.0", "test.base@1.0"], tweak_dir)
+    assert _active() == ["test.base@1.0", "test.extra@1.0"]
+
+    assert manager.converge(["test.base@1.0", "test.other@1.0"], tweak_dir)
+    assert _active() == ["test.base@1.0", "test.other@1.0"]
+    assert registry.get_value(PATH, "extra") == (None, None)
+    assert registry.get_value(PATH, "other") == (1, 4)
+
+
+def test_converged_machine_costs_one_query(manager, tweak_dir, tmp_path):
+    wanted = ["test.base@1.0", "test.other@1.0"]
+    assert manager.converge(wanted, tweak_dir)
+    store = get_store(roll_mod.DB_PATH)
+    statements = store.stats["statements"]
+
+    # an unreadable tweak dir proves the files are not even listed
+    assert manager.converge(wanted, tmp_path / "missing")
+    assert store.stats["statements"] - statements == 1
+
+
+def test_extra_tweaks_are_reverted_in_one_batch(manager, tweak_dir):
+    assert manager.converge(["test.extra@1.0", "test.base@1.0", "test.other@1.0"], tweak_dir)
+    store = get_store(roll_mod.DB_PATH)
+    commits = store.stats["commits"]
+
+    assert manager.converge([], tweak_dir)
+
+    assert _active() == []
+    assert not registry.subkey_exists(PATH)
+    # one commit marks every history reverting, one marks them reverted
+    assert store.stats["commits"] - commits == 2
+    assert [e["command"] for e in manager.events].count("revert") == 0
+    assert sorted(manager.events[-1]["to_revert"]) == ["test.base@1.0", "test.extra@1.0", "test.other@1.0"]
+
+
+def test_reverting_a_dependency_of_a_kept_tweak_is_refused(manager, tweak_dir):
+    assert manager.converge(["test.base@1.0", "test.extra@1.0"], tweak_dir)
+    assert not manager.converge(["test.extra@1.0"], tweak_dir)
+    assert _active() == ["test.base@1.0", "test.extra@1.0"]
+
+
+def test_batches_follow_dependencies_tiers_and_size_limits(tweak_definition):
+    def definition(name, **extra):
+        return tweak_definition(name, [(PATH, name, 1)], **extra)
+
+    defs = {d["id"]: d for d in [
+        definition("base"), definition("extra", dependencies=["test.base@1.0"]),
+        definition("other"), definition("tiered", tier=1),
+    ]}
+    ids = ["test.extra@1.0", "test.base@1.0", "test.other@1.0", "test.tiered@1.0"]
+
+    assert profile.apply_batches(ids, defs) == [
+        ["test.base@1.0", "test.other@1.0"], ["test.tiered@1.0"], ["test.extra@1.0"],
+    ]
+    assert profile.revert_order(ids, defs)[0] == "test.extra@1.0"
+
+    many = {f"t{i}": dict(definition("x"), id=f"t{i}") for i in range(25)}
+    assert [len(b) for b in profile.apply_batches(list(many), many)] == [20, 5]
+
+
+def test_removed_tweak_can_be_added_back(manager, tweak_dir):
+    assert manager.converge(["test.base@1.0", "test.other@1.0"], tweak_dir)
+    assert manager.converge(["test.base@1.0"], tweak_dir)
+    assert registry.get_value(PATH, "other") == (None, None)
+
+    assert manager.converge(["test.base@1.0", "test.other@1.0"], tweak_dir)
+    assert _active() == ["test.base@1.0", "test.other@1.0"]
+    assert registry.get_value(PATH, "other") == (1, 4)
+
+
+def test_failure_prints_the_underlying_error(manager, tweak_dir, capsys):
+    assert not manager.converge(["test.extra@1.0"], tweak_dir / "missing")
+    assert "[ERROR] Converge failed: No tweak file for: test.extra@1.0" in capsys.readouterr().out
@@ -0,0 +1,120 @@
+import subprocess
+import time
+
+import pytest
+
+from core import deadlines, registry
+from core.actions.powercfg_action import PowerCfgAction
+from core.actions.registry_action import RegistryAction
+from core.executor import Executor
+
+PATH = "HKCU\\Software\\EnhancerDeadline"
+
+
+def test_nested_scopes_only_tighten():
+    assert deadlines.remaining() is None
+    with deadlines.scope(0.5):
+        with deadlines.scope(60):
+            assert deadlines.remaining(30) <= 0.5
+        with deadlines.detached():
+            assert deadlines.remaining(30) == 30
+
+
+def test_expired_deadline_raises_before_blocking():
+    with deadlines.scope(0):
+        with pytest.raises(deadlines.DeadlineExceeded):
+            deadlines.remaining(30)
+
+
+def test_cancelled_token_stops_next_step():
+    token = deadlines.CancelToken()
+    ran = []
+
+    def first():
+        ran.append(1)
+        token.cancel("stop")
+
+    with deadlines.scope(token=token), pytest.raises(deadlines.Cancelled, match="stop"):
+        Executor(max_workers=1).run_steps([first, lambda: ran.append(2)])
+    assert ran == [1]
+
+
+def test_step_timeout_bounds_blocking_calls_and_timings_are_recorded():
+    executor = Executor(max_workers=1, step_timeout=0.25)
+    budgets = executor.run_steps([lambda: deadlines.remaining(30)])
+    assert budgets[0] <= 0.25
+    assert executor.timings[0] is not None
+
+
+def test_powercfg_subprocess_gets_timeout(monkeypatch):
+    seen = {}
+
+    def fake_run(argv, **kwargs):
+        seen["timeout"] = kwargs["timeout"]
+        raise subprocess.TimeoutExpired(argv, kwargs["timeout"])
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    action = PowerCfgAction({"type": "powercfg", "scheme_guid": "s", "subgroup_guid": "g",
+                             "setting_guid": "x", "value_ac": 1})
+
+    with deadlines.scope(2.0), pytest.raises(deadlines.DeadlineExceeded, match="timed out"):
+        action.apply()
+    assert 0 < seen["timeout"] <= 2.0
+
+
+def _tweak(make_tweak):
+    return make_tweak("deadline", [(PATH, k, 1) for k in ("A", "B")], tier=1)
+
+
+def _patch_apply(monkeypatch, on_second):
+    original = RegistryAction.apply
+    calls = []
+
+    def apply(self):
+        calls.append(self.key)
+        if len(calls) == 2:
+            on_second()
+        original(self)
+
+    monkeypatch.setattr(RegistryAction, "apply", apply)
+
+
+def test_cancel_rolls_back_and_reports_timings(manager, make_tweak, monkeypatch):
+    registry.set_value(PATH, "A", 0, "DWORD", force=True)
+    registry.set_value(PATH, "B", 0, "DWORD", force=True)
+    _patch_apply(monkeypatch, lambda: manager.cancel("user abort"))
+
+    assert manager.apply(_tweak(make_tweak)) is False
+
+    assert registry.get_value(PATH, "A")[0] == 0
+    ctx = manager.events[-1]
+    assert ctx["result"] == "failure" and ctx["cancelled"] is True
+    assert {"snapshot", "commit_intent", "rollback", "total"} <= set(ctx["timings_ms"])
+
+
+def test_command_deadline_fails_apply_through_rollback(manager, make_tweak, monkeypatch):
+    registry.set_value(PATH, "A", 0, "DWORD", force=True)
+    registry.set_value(PATH, "B", 0, "DWORD", force=True)
+    manager.timeout = 0.05
+    _patch_apply(monkeypatch, lambda: time.sleep(0.1))
+
+    assert manager.apply(_tweak(make_tweak)) is False
+    assert isinstance(manager.events[-1]["error"], deadlines.DeadlineExceeded)
+    assert registry.get_value(PATH, "A")[0] == 0
+    assert registry.get_value(PATH, "B")[0] == 0
+
+
+def test_ctrl_c_rolls_back_then_propagates(manager, make_tweak, monkeypatch):
+    registry.set_value(PATH, "A", 0, "DWORD", force=True)
+    registry.set_value(PATH, "B", 0, "DWORD", force=True)
+
+    def interrupt():
+        raise KeyboardInterrupt
+
+    _patch_apply(monkeypatch, interrupt)
+
+    with pytest.raises(KeyboardInterrupt):
+        manager.apply(_tweak(make_tweak))
+
+    assert registry.get_value(PATH, "A")[0] == 0
+    assert manager.events[-1]["cancelled"] is True
@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from core import registry
+from core.executor import Executor, build_dependencies
+
+
+class Step:
+    def __init__(self, name, resources, log, delay=0.0, fail=False):
+        self.name = name
+        self.resources = resources
+        self.log = log
+        self.delay = delay
+        self.fail = fail
+
+    def execute(self):
+        time.sleep(self.delay)
+        self.log.append(self.name)
+        if self.fail:
+            raise RuntimeError(self.name)
+        return self.name
+
+
+def R(*parts):
+    return frozenset({parts})
+
+
+def test_dependencies_follow_resource_prefixes():
+    steps = [
+        Step("a", R("registry", "hklm", "x"), []),
+        Step("b", R("registry", "hklm", "y"), []),
+        Step("c", R("registry", "hklm", "x", "child"), []),
+        Step("d", R("registry", "hklm"), []),
+        Step("e", R("powercfg", "s", "g", "1"), []),
+    ]
+    assert build_dependencies(steps) == [set(), set(), {0}, {0, 1, 2}, set()]
+
+
+def test_unknown_resources_are_barriers():
+    steps = [
+        Step("a", R("x"), []),
+        Step("b", R("y"), []),
+        Step("barrier", None, []),
+        Step("c", R("x"), []),
+        Step("d", R("z"), []),
+    ]
+    assert build_dependencies(steps) == [set(), set(), {0, 1}, {2}, {2}]
+
+
+def test_independent_steps_run_concurrently():
+    gate = threading.Barrier(3, timeout=5)
+
+    class Gated:
+        def __init__(self, n):
+            self.resources = R("service", str(n))
+            self.n = n
+
+        def execute(self):
+            gate.wait()  # deadlocks (times out) unless all three run at once
+            return self.n
+
+    assert Executor(max_workers=3).run_steps([Gated(i) for i in range(3)]) == [0, 1, 2]
+
+
+def test_same_resource_keeps_step_order():
+    log = []
+    steps = [
+        Step("slow-first", R("bcdedit", "{current}", "nx"), log, delay=0.05),
+        Step("other", R("bcdedit", "{current}", "hypervisorlaunchtype"), log),
+        Step("second", R("bcdedit", "{current}", "nx"), log),
+    ]
+    assert Executor(max_workers=4).run_steps(steps) == ["slow-first", "other", "second"]
+    assert log.index("slow-first") < log.index("second")
+    assert log[0] == "other"
+
+
+def test_failure_stops_dependents_and_raises_first_error():
+    log = []
+    steps = [
+        Step("a", R("x"), log, fail=True),
+        Step("after-a", R("x"), log),
+        Step("b", R("y"), log, delay=0.02, fail=True),
+    ]
+    with pytest.raises(RuntimeError, match="^a$"):
+        Executor(max_workers=4).run_steps(steps)
+    assert "after-a" not in log
+
+
+def test_single_worker_is_sequential():
+    log = []
+    steps = [Step(n, R(n), log) for n in "abc"]
+    assert Executor(max_workers=1).run_steps(steps) == ["a", "b", "c"]
+
+
+@pytest.fixture
+def manager(manager):
+    manager.max_workers = 8
+    return manager
+
+
+def test_parallel_apply_and_revert_roundtrip(manager, make_tweak):
+    base = "HKCU\\Software\\EnhancerParallel"
+    for i in range(4):
+        registry.set_value(f"{base}\\K{i}", "V", 100 + i, "DWORD", force=True)
+
+    writes = [(f"{base}\\K{i}", "V", i) for i in range(4)] + [
+        # Same key twice: the later write must win, and revert must restore the original.
+        (f"{base}\\K0", "V", 42),
+        (f"{base}\\New\\Deep", "V", 1),
+    ]
+    path = make_tweak("parallel", writes, tier=1)
+
+    assert manager.apply(path)
+    assert registry.get_value(f"{base}\\K0", "V")[0] == 42
+    assert registry.get_value(f"{base}\\K3", "V")[0] == 3
+
+    assert manager.revert("test.parallel@1.0")
+    assert [registry.get_value(f"{base}\\K{i}", "V")[0] for i in range(4)] == [100, 101, 102, 103]
+    assert not registry.subkey_exists(f"{base}\\New\\Deep")
@@ -0,0 +1,76 @@
+import sqlite3
+import threading
+import pytest
+
+from core.history_store import HistoryStore, get_store, close_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = HistoryStore(tmp_path / "store.db")
+    s.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    yield s
+    s.close()
+
+
+def test_connection_is_reused_across_statements(store):
+    for i in range(10):
+        store.execute("INSERT INTO t (v) VALUES (?)", (str(i),))
+        store.query_all("SELECT * FROM t")
+
+    assert store.stats["connections_opened"] == 1
+
+
+def test_autocommit_write_is_visible_to_other_connections(store):
+    store.execute("INSERT INTO t (v) VALUES ('x')")
+
+    conn = sqlite3.connect(store.db_path)
+    count = conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    conn.close()
+
+    assert count == 1
+
+
+def test_transaction_rolls_back_on_error(store):
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.execute("INSERT INTO t (v) VALUES ('a')")
+            raise RuntimeError("boom")
+
+    assert store.query_one("SELECT COUNT(*) FROM t")[0] == 0
+    assert not store.in_transaction()
+
+
+def test_nested_failure_only_undoes_inner_block(store):
+    with store.transaction():
+        store.execute("INSERT INTO t (v) VALUES ('outer')")
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.execute("INSERT INTO t (v) VALUES ('inner')")
+                raise RuntimeError("boom")
+
+    rows = store.query_all("SELECT v FROM t")
+    assert rows == [("outer",)]
+    assert store.stats["commits"] == 1
+
+
+def test_one_connection_per_thread(store):
+    def worker():
+        store.query_all("SELECT * FROM t")
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # main thread (fixture) + one per worker
+    assert store.stats["connections_opened"] == 4
+
+
+def test_get_store_is_shared_per_path(tmp_path):
+    path = tmp_path / "shared.db"
+    try:
+        assert get_store(path) is get_store(path)
+    finally:
+        close_store(path)
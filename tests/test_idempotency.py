@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from core.tweak_manager import TweakManager
 from core.rollback import init_db, DB_PATH as RDB_PATH
+from core.history_store import close_store
 
 TEST_DB = Path(__file__).parent / "test_idempotency.db"
 
@@ -22,6 +23,7 @@ def isolated_db():
     
     yield
     
+    close_store(TEST_DB)
     if TEST_DB.exists():
         TEST_DB.unlink()
     
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Self time (µs) of project modules pulled in by `import core.tweak_manager`.
+# Roughly 3x the measured cost on a dev box; stdlib modules are not counted.
+CORE_SELF_BUDGET_US = int(os.environ.get("ENHANCER_IMPORT_BUDGET_US", 75_000))
+
+FORBIDDEN_AT_IMPORT = {
+    "winreg",
+    "win32service",
+    "win32serviceutil",
+    "subprocess",
+    "core.actions.service_action",
+    "core.actions.powercfg_action",
+    "core.actions.bcdedit_action",
+}
+
+
+def _import_profile(module: str, extra: str = ""):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}{extra}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, _cumulative, name = (p.strip() for p in line.replace("import time:", "|").split("|"))
+        if self_us.isdigit():
+            timings[name] = int(self_us)
+    return timings, result.stdout
+
+
+def test_tweak_manager_import_stays_within_budget():
+    timings, _ = _import_profile("core.tweak_manager")
+
+    core_self = sum(us for name, us in timings.items() if name == "core" or name.startswith("core."))
+    assert core_self <= CORE_SELF_BUDGET_US, (
+        f"core.* import self time {core_self}µs exceeds budget {CORE_SELF_BUDGET_US}µs"
+    )
+
+
+def test_tweak_manager_import_skips_platform_and_unused_modules():
+    timings, _ = _import_profile("core.tweak_manager")
+
+    loaded = FORBIDDEN_AT_IMPORT & set(timings)
+    assert not loaded, f"imported eagerly: {sorted(loaded)}"
+
+
+def test_import_does_not_touch_database():
+    _, out = _import_profile(
+        "core.tweak_manager",
+        "; import core.history_store as hs; print(len(hs._STORES))",
+    )
+    assert out.strip() == "0"
@@ -158,3 +158,34 @@ def test_INV_7_3_rollback_errors_propagate():
 
     with pytest.raises(Exception):
         action.rollback(snapshot)
+
+
+def test_unit_of_work_is_all_or_nothing():
+    with pytest.raises(AssertionError):
+        with rollback.unit_of_work():
+            history_id = rollback.create_history_entry("test.uow.atomic@1.0")
+            sm = TweakStateMachine(history_id, rollback.history_store())
+            sm.transition("validate")
+            sm.transition("success")  # invalid from VALIDATED
+
+    assert rollback.get_history_by_tweak_id("test.uow.atomic@1.0") is None
+
+
+def test_unit_of_work_batches_snapshots_in_one_commit():
+    from core.actions.base import ActionSnapshot
+
+    store = rollback.history_store()
+    history_id = rollback.create_history_entry("test.uow.batch@1.0")
+    snaps = [ActionSnapshot("registry", {"key": f"K{i}"}) for i in range(5)]
+
+    commits_before = store.stats["commits"]
+    with rollback.unit_of_work():
+        sm = TweakStateMachine(history_id, store)
+        sm.transition("validate")
+        sm.transition("apply")
+        rollback.save_snapshots_v2(history_id, snaps)
+
+    assert store.stats["commits"] - commits_before == 1
+    assert [s["metadata"]["key"] for s in rollback.get_snapshots_v2(history_id)] == [
+        f"K{i}" for i in range(5)
+    ]
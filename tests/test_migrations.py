@@ -0,0 +1,74 @@
+import sqlite3
+import pytest
+
+from core import migrations
+from core.history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = HistoryStore(tmp_path / "migrate.db")
+    yield s
+    s.close()
+
+
+def test_fresh_database_reaches_latest_version(store):
+    applied = migrations.migrate(store)
+
+    assert [m.version for m in applied] == list(range(1, migrations.latest_version() + 1))
+    assert migrations.current_version(store) == migrations.latest_version()
+
+
+def test_steady_state_is_a_single_read(store):
+    migrations.migrate(store)
+    statements = store.stats["statements"]
+    commits = store.stats["commits"]
+
+    assert migrations.migrate(store) == []
+    assert store.stats["statements"] - statements == 1
+    assert store.stats["commits"] == commits
+
+
+def test_dry_run_does_not_write(store):
+    pending = migrations.migrate(store, dry_run=True)
+
+    assert [m.version for m in pending] == list(range(1, migrations.latest_version() + 1))
+    assert migrations.current_version(store) == 0
+    assert store.query_all("SELECT name FROM sqlite_master WHERE type = 'table'") == []
+
+
+def test_legacy_database_gains_v2_columns(store):
+    conn = sqlite3.connect(store.db_path)
+    conn.execute("""
+        CREATE TABLE tweak_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tweak_id TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL,
+            reverted_at TIMESTAMP,
+            status TEXT NOT NULL,
+            error_message TEXT
+        )
+    """)
+    conn.execute(
+        "INSERT INTO tweak_history (tweak_id, applied_at, status) VALUES ('old', '2024-01-01', 'applied')"
+    )
+    conn.commit()
+    conn.close()
+
+    migrations.migrate(store)
+
+    row = store.query_one("SELECT schema_version, verified_at FROM tweak_history")
+    assert row == ("1", None)
+
+
+def test_failed_step_leaves_version_untouched(store, monkeypatch):
+    def boom(_store):
+        raise RuntimeError("broken migration")
+
+    broken = migrations.Migration(migrations.latest_version() + 1, "broken", boom)
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [broken])
+
+    with pytest.raises(RuntimeError):
+        migrations.migrate(store)
+
+    assert migrations.current_version(store) == 0
@@ -0,0 +1,50 @@
+import core.rollback as roll_mod
+from core import registry
+
+PATH = "HKCU\\Software\\EnhancerDiff"
+
+
+def _tweak(make_tweak, writes):
+    return make_tweak("diff", writes, tier=1)
+
+
+def test_matching_values_are_not_written_and_marked_unchanged(manager, make_tweak, memory_registry):
+    registry.set_value(PATH, "A", 1, "DWORD", force=True)
+    memory_registry.stats.clear()
+
+    assert manager.apply(_tweak(make_tweak, [(PATH, "A", 1), (PATH, "B", 1)]))
+
+    assert memory_registry.stats["set_value"] == 1
+    assert manager.events[-1]["writes_avoided"] == 1
+    snaps = roll_mod.get_snapshots_v2(roll_mod.get_history_by_tweak_id("test.diff@1.0")["id"])
+    assert [s["metadata"].get("unchanged", False) for s in snaps] == [True, False]
+
+    assert manager.revert("test.diff@1.0")
+    assert registry.get_value(PATH, "A") == (1, 4)
+    assert registry.get_value(PATH, "B") == (None, None)
+
+
+def test_revert_skips_values_already_restored(manager, make_tweak, memory_registry):
+    writes = [(PATH + "\\One", "A", 1), (PATH + "\\Two", "A", 1)]
+    assert manager.apply(_tweak(make_tweak, writes))
+    registry.delete_value(PATH + "\\One", "A")
+    registry.delete_subkey(PATH + "\\One")
+    memory_registry.stats.clear()
+
+    assert manager.revert("test.diff@1.0")
+
+    assert manager.events[-1]["writes_avoided"] == 1
+    assert memory_registry.stats["delete_value"] == 1
+    assert not registry.subkey_exists(PATH + "\\Two")
+
+
+def test_repeated_writes_to_one_value_still_revert_exactly(manager, make_tweak):
+    registry.set_value(PATH, "A", 1, "DWORD", force=True)
+
+    assert manager.apply(_tweak(make_tweak, [(PATH, "A", 2), (PATH, "A", 1)]))
+    # the second write is not a no-op: A held 2 when it was snapshotted
+    assert manager.events[-1]["writes_avoided"] == 0
+
+    registry.set_value(PATH, "A", 2, "DWORD", force=True)
+    assert manager.revert("test.diff@1.0")
+    assert registry.get_value(PATH, "A") == (1, 4)
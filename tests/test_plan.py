@@ -0,0 +1,28 @@
+from core import registry
+
+PATH = "HKCU\\Software\\EnhancerPlan"
+
+
+def _tweak(make_tweak):
+    return make_tweak("plan", [(PATH, k, 1) for k in ("A", "B")], tier=1)
+
+
+def test_plan_lists_pending_changes_without_writing(manager, make_tweak, memory_registry, catalog_cache_path):
+    registry.set_value(PATH, "A", 1, "DWORD", force=True)
+    memory_registry.stats.clear()
+
+    changes = manager.plan(_tweak(make_tweak))
+
+    assert [c["description"] for c in changes] == [f"Registry {PATH}\\B -> 1 (DWORD)"]
+    assert changes[0]["current"] == {"value": None, "type": None}
+    assert set(memory_registry.stats) == {"get_values"}
+    assert not manager.db.exists()
+    assert not catalog_cache_path.exists()
+
+
+def test_plan_matches_what_apply_then_does(manager, make_tweak, memory_registry):
+    tweak = _tweak(make_tweak)
+    assert len(manager.plan(tweak)) == 2
+
+    assert manager.apply(tweak)
+    assert manager.plan(tweak) == []
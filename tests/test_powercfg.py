@@ -0,0 +1,321 @@
+import re
+from pathlib import Path
+
+import pytest
+
+import core.rollback as roll_mod
+from core import commands, powercfg
+from core.actions.base import ActionSnapshot
+from core.actions.factory import create_action_from_snapshot
+from core.actions.powercfg_action import PowerCfgAction
+
+FIXTURES = Path(__file__).parent / "fixtures" / "powercfg"
+SCHEME = "381b4222-f694-41f0-9685-ff5bb260df2e"
+OTHER_SCHEME = "8c5e7fda-e8bf-4a96-9a85-a6e23a8c635c"
+SUB_DISK = "0012ee47-9041-4b5d-9b77-535fba8b1442"
+DISKIDLE = "6738e2c4-e8a5-4a42-b16a-e040e769756e"
+parse_scheme = powercfg.parse_scheme
+
+
+class FakePowercfg(commands.CommandRunner):
+    """
+    Serves the fixture scheme and applies /set*valueindex to its text. Like
+    powercfg, refuses to import onto an existing GUID or delete the active
+    scheme.
+    """
+
+    def __init__(self):
+        self.text = (FIXTURES / "query_scheme_balanced.txt").read_text()
+        self.calls = []
+        self.schemes = {SCHEME, OTHER_SCHEME}
+        self.active = SCHEME
+
+    @property
+    def settings(self):
+        return parse_scheme(self.text)
+
+    def run(self, argv, timeout):
+        args = argv[1:]
+        self.calls.append(args)
+        if args[0] == "/query" and len(args) == 2:
+            return commands.CommandResult(argv, 0, self.text)
+        if args[0] == "/query":
+            ac, dc = self.settings[(args[2].lower(), args[3].lower())]
+            return commands.CommandResult(argv, 0, (
+                f"    Current AC Power Setting Index: 0x{ac:08x}\n"
+                f"    Current DC Power Setting Index: 0x{dc:08x}\n"
+            ))
+        if args[0] == "/export":
+            Path(args[1]).write_text(self.text)
+            return commands.CommandResult(argv, 0, "")
+        if args[0] == "/getactivescheme":
+            return commands.CommandResult(argv, 0, f"Power Scheme GUID: {self.active}  (Balanced)\n")
+        if args[0] == "/list":
+            return commands.CommandResult(argv, 0, "".join(
+                f"Power Scheme GUID: {g}  (Scheme){' *' if g == self.active else ''}\n" for g in sorted(self.schemes)
+            ))
+        if args[0] == "/setactive":
+            if args[1] not in self.schemes:
+                return commands.CommandResult(argv, 1, "", "Invalid Parameters")
+            self.active = args[1]
+            return commands.CommandResult(argv, 0, "")
+        if args[0] == "/delete":
+            if args[1] not in self.schemes or args[1] == self.active:
+                return commands.CommandResult(argv, 1, "", "Unable to perform operation.")
+            self.schemes.remove(args[1])
+            return commands.CommandResult(argv, 0, "")
+        if args[0] == "/import":
+            if args[2] in self.schemes:
+                return commands.CommandResult(argv, 1, "", "Unable to perform operation.")
+            self.schemes.add(args[2])
+            self.text = Path(args[1]).read_text()
+            return commands.CommandResult(argv, 0, "")
+        label = "AC" if args[0] == "/setacvalueindex" else "DC"
+        self.text = re.sub(
+            rf"(GUID Alias: {args[3]}\n(?:.*\n)*?\s*Current {label} Power Setting Index: )0x[0-9a-f]+",
+            lambda m: m.group(1) + f"0x{int(args[4]):08x}",
+            self.text,
+            count=1,
+        )
+        return commands.CommandResult(argv, 0, "")
+
+    def spawned(self, verb):
+        return sum(1 for c in self.calls if c[0] == verb)
+
+
+@pytest.fixture
+def fake():
+    fake = FakePowercfg()
+    with commands.use_runner(fake):
+        yield fake
+
+
+def test_parse_scheme_indexes_guids_and_aliases():
+    settings = powercfg.parse_scheme((FIXTURES / "query_scheme_balanced.txt").read_text())
+
+    assert settings[(SUB_DISK, DISKIDLE)] == (0x4b0, 0x258)
+    assert settings[("sub_disk", "diskidle")] == (0x4b0, 0x258)
+    assert settings[("sub_processor", "procthrottlemin")] == (5, 5)
+    assert settings[("sub_none", "consolelock")] == (1, 1)
+    assert settings[("sub_sleep", "hybridsleep")] == (0, 0)
+
+
+def test_parse_index_accepts_both_label_styles():
+    assert powercfg.parse_index("Current AC Power Setting Index: 0x0a\nCurrent DC Power Setting Index: 0x05") == (10, 5)
+    assert powercfg.parse_index("AC Setting Index: 0x0a\nDC Setting Index: 0x05") == (10, 5)
+    assert powercfg.parse_index("") == (None, None)
+
+
+def _action(setting, ac):
+    return PowerCfgAction({"type": "powercfg", "scheme_guid": SCHEME, "subgroup_guid": "SUB_PROCESSOR",
+                           "setting_guid": setting, "value_ac": ac})
+
+
+def test_one_scheme_query_serves_every_snapshot_and_verify(fake):
+    actions = [_action("PROCTHROTTLEMAX", 90), _action("PROCTHROTTLEMIN", 10)]
+
+    with powercfg.scope() as cache:
+        snapshots = [a.snapshot() for a in actions]
+        for a in actions:
+            a.apply()
+        assert all(a.verify() for a in actions)
+
+    assert [s.metadata["old_value_ac"] for s in snapshots] == [100, 5]
+    # one query before the writes, one after them; none per setting
+    assert fake.spawned("/query") == 2
+    assert cache.stats["scheme_queries"] == 2
+    assert cache.stats["invalidations"] == 1
+
+
+
+def test_values_cached_while_a_write_runs_are_dropped(fake, monkeypatch):
+    action = _action("PROCTHROTTLEMIN", 10)
+    fake_run = fake.run
+
+    def run(argv, timeout):
+        if argv[1] == "/setacvalueindex":
+            # another thread queries the scheme before the write lands
+            powercfg.query_setting(SCHEME, "SUB_PROCESSOR", "PROCTHROTTLEMIN")
+        return fake_run(argv, timeout)
+
+    monkeypatch.setattr(fake, "run", run)
+    with powercfg.scope():
+        powercfg.query_setting(SCHEME, "SUB_PROCESSOR", "PROCTHROTTLEMIN")
+        action.apply()
+        assert powercfg.query_setting(SCHEME, "SUB_PROCESSOR", "PROCTHROTTLEMIN") == (10, 5)
+
+def test_without_scope_each_read_is_a_single_setting_query(fake):
+    action = _action("PROCTHROTTLEMAX", 90)
+    action.snapshot()
+    action.snapshot()
+    assert fake.calls == [["/query", SCHEME, "SUB_PROCESSOR", "PROCTHROTTLEMAX"]] * 2
+
+
+def test_setting_missing_from_listing_falls_back_to_single_query(fake, monkeypatch):
+    monkeypatch.setattr(powercfg, "parse_scheme", lambda output: {})
+
+    with powercfg.scope():
+        ac, dc = powercfg.query_setting(SCHEME, "SUB_DISK", "DISKIDLE")
+
+    assert (ac, dc) == (0x4b0, 0x258)
+    assert fake.calls == [["/query", SCHEME], ["/query", SCHEME, "SUB_DISK", "DISKIDLE"]]
+
+
+def _scheme_actions():
+    return [
+        PowerCfgAction({"type": "powercfg", "scheme_guid": "SCHEME_BALANCED", "subgroup_guid": sub,
+                        "setting_guid": setting, "value_ac": 1, "value_dc": 1,
+                        "snapshot_mode": "scheme"})
+        for sub, setting in [("SUB_PROCESSOR", "PROCTHROTTLEMAX"), ("SUB_PROCESSOR", "PROCTHROTTLEMIN"),
+                             ("SUB_DISK", "DISKIDLE"), ("SUB_SLEEP", "STANDBYIDLE")]
+    ]
+
+
+def _rollback_all(snapshots):
+    # What TweakManager._execute_rollback_steps does: reverse order, from persisted dicts.
+    with powercfg.scope():
+        for snap in reversed(snapshots):
+            snap = ActionSnapshot.from_dict(snap.to_dict())
+            create_action_from_snapshot(snap).rollback(snap)
+
+
+def test_scheme_mode_exports_once_and_restores_with_one_import(fake, tmp_path, monkeypatch):
+    monkeypatch.setattr(roll_mod, "DB_PATH", tmp_path / "enhancer.db")
+    original = fake.settings
+    actions = _scheme_actions()
+
+    with powercfg.scope():
+        snapshots = PowerCfgAction.snapshot_batch(actions)
+        for a in actions:
+            a.apply()
+    assert fake.settings != original
+
+    backup = Path(snapshots[0].metadata["backup_file"])
+    assert backup.parent == tmp_path / "backups" / "powercfg"
+    assert {s.metadata["backup_file"] for s in snapshots} == {str(backup)}
+    assert snapshots[0].metadata["backup_scheme_guid"] == SCHEME
+    assert fake.spawned("/export") == 1
+
+    fake.calls.clear()
+    _rollback_all(snapshots)
+
+    assert fake.calls == [
+        ["/getactivescheme"], ["/list"], ["/setactive", OTHER_SCHEME],
+        ["/delete", SCHEME], ["/import", str(backup), SCHEME], ["/setactive", SCHEME],
+    ]
+    assert fake.settings == original
+    assert fake.active == SCHEME
+    assert not backup.exists()
+
+
+def test_inactive_scheme_is_restored_without_switching(fake, tmp_path):
+    backup = tmp_path / "backup.pow"
+    backup.write_text(fake.text)
+    fake.active = OTHER_SCHEME
+
+    assert powercfg.restore_scheme(SCHEME, backup)
+
+    assert fake.calls == [["/getactivescheme"], ["/delete", SCHEME], ["/import", str(backup), SCHEME]]
+    assert fake.active == OTHER_SCHEME
+
+
+def test_failed_import_keeps_the_backup(fake, tmp_path, monkeypatch):
+    backup = tmp_path / "backup.pow"
+    backup.write_text(fake.text)
+    fake_run = fake.run
+
+    def run(argv, timeout):
+        if argv[1] == "/import":
+            # the import fails as it would onto a scheme that was never deleted
+            return commands.CommandResult(argv, 1, "", "Unable to perform operation.")
+        return fake_run(argv, timeout)
+
+    monkeypatch.setattr(fake, "run", run)
+    with pytest.raises(commands.CommandError):
+        powercfg.restore_scheme(SCHEME, backup)
+
+    assert backup.exists()
+
+
+def test_scheme_mode_falls_back_to_settings_when_backup_is_gone(fake, tmp_path, monkeypatch):
+    monkeypatch.setattr(roll_mod, "DB_PATH", tmp_path / "enhancer.db")
+    original = fake.settings
+    actions = _scheme_actions()
+
+    with powercfg.scope():
+        snapshots = PowerCfgAction.snapshot_batch(actions)
+        for a in actions:
+            a.apply()
+    Path(snapshots[0].metadata["backup_file"]).unlink()
+
+    _rollback_all(snapshots)
+
+    assert fake.settings == original
+    assert fake.spawned("/import") == 0
+
+
+def test_scheme_mode_resources_cover_the_whole_scheme():
+    action = _scheme_actions()[0]
+    snap = ActionSnapshot("powercfg", {
+        "scheme_guid": SCHEME, "subgroup_guid": "s", "setting_guid": "x",
+        "old_value_ac": 1, "old_value_dc": 1, "backup_scheme_guid": SCHEME, "backup_file": "f.pow",
+    })
+    assert action.resources() == frozenset({("powercfg", "scheme_balanced")})
+    assert create_action_from_snapshot(snap).resources() == frozenset({("powercfg", SCHEME)})
+
+
+def test_noop_diff_uses_snapshot_values_and_skips_scheme_mode(fake):
+    with powercfg.scope():
+        current = _action("PROCTHROTTLEMIN", 5)
+        changed = _action("PROCTHROTTLEMAX", 90)
+        scheme = _scheme_actions()[1]
+        scheme.value_ac = scheme.value_dc = 5
+        snapshots = [a.snapshot() for a in (current, changed)]
+
+        assert current.is_noop(snapshots[0])
+        assert not changed.is_noop(snapshots[1])
+        assert not scheme.is_noop(snapshots[0])
+
+        # rollback side reads the live values through the scheme cache
+        assert create_action_from_snapshot(snapshots[1]).rollback_is_noop(snapshots[1])
+        changed.apply()
+        assert not create_action_from_snapshot(snapshots[1]).rollback_is_noop(snapshots[1])
+
+
+def test_preview_batch_reads_without_exporting(fake):
+    with powercfg.scope():
+        snapshots = PowerCfgAction.preview_batch(_scheme_actions())
+
+    assert fake.spawned("/export") == 0
+    assert all("backup_file" not in s.metadata for s in snapshots)
+    assert snapshots[1].metadata["old_value_ac"] == 5
+
+
+def _scheme_tweak(make_tweak, name, *settings):
+    return make_tweak(name, [], scope=["power"], actions={"apply": [
+        {"type": "powercfg", "scheme_guid": "SCHEME_BALANCED", "subgroup_guid": "SUB_PROCESSOR",
+         "setting_guid": setting, "value_ac": 50, "snapshot_mode": "scheme"}
+        for setting in settings
+    ]})
+
+
+def test_failed_snapshot_phase_deletes_the_exported_backup(fake, manager, make_tweak, tmp_path):
+    # the scheme is exported for the first action, then the second cannot be read
+    assert not manager.apply(_scheme_tweak(make_tweak, "broken", "PROCTHROTTLEMAX", "NOSUCHSETTING"))
+
+    assert fake.spawned("/export") == 1
+    assert list((tmp_path / "backups" / "powercfg").iterdir()) == []
+
+
+def test_apply_aborted_before_commit_deletes_the_exported_backup(fake, manager, make_tweak, tmp_path, monkeypatch):
+    def save_fails(history_id, snapshots):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(roll_mod, "save_snapshots_v2", save_fails)
+    path = _scheme_tweak(make_tweak, "scheme", "PROCTHROTTLEMAX")
+
+    assert not manager.apply(path)
+    assert not manager.apply_batch([path])
+
+    assert fake.spawned("/export") == 2
+    assert list((tmp_path / "backups" / "powercfg").iterdir()) == []
@@ -0,0 +1,91 @@
+import pytest
+
+from core import rollback, state_machine, recovery
+from core.actions.base import ActionSnapshot
+from core.history_store import close_store
+
+
+@pytest.fixture(autouse=True)
+def indexed_db(tmp_path, monkeypatch):
+    db = tmp_path / "plans.db"
+    monkeypatch.setattr(rollback, "DB_PATH", db)
+    monkeypatch.setattr(state_machine, "DB_PATH", db)
+    monkeypatch.setattr(recovery, "DB_PATH", db)
+    rollback.init_db()
+    yield
+    close_store(db)
+
+
+def _captured_sql(fn, *args):
+    conn = rollback.history_store().connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        fn(*args)
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(("SELECT", "DELETE"))]
+
+
+def _plan(sql):
+    rows = rollback.history_store().query_all(f"EXPLAIN QUERY PLAN {sql}")
+    return " | ".join(r[-1] for r in rows)
+
+
+def _assert_indexed(fn, *args):
+    statements = _captured_sql(fn, *args)
+    assert statements, f"{fn.__name__} issued no lookup"
+    for sql in statements:
+        plan = _plan(sql)
+        assert "SCAN" not in plan, f"{fn.__name__}: full scan\n{sql}\n{plan}"
+        assert "TEMP B-TREE" not in plan, f"{fn.__name__}: sort without index\n{sql}\n{plan}"
+
+
+def _seed():
+    hid = rollback.create_history_entry("test.plans@1.0")
+    rollback.save_snapshot_v2(hid, ActionSnapshot("registry", {"key": "K"}))
+    return hid
+
+
+def test_history_by_tweak_id_uses_index():
+    _seed()
+    _assert_indexed(rollback.get_history_by_tweak_id, "test.plans@1.0")
+
+
+def test_latest_history_by_tweak_id_uses_covering_index():
+    _seed()
+    _assert_indexed(rollback.get_latest_history_by_tweak_id, "test.plans@1.0")
+    sql = _captured_sql(rollback.get_latest_history_by_tweak_id, "test.plans@1.0")[0]
+    assert "COVERING INDEX" in _plan(sql)
+
+
+def test_active_tweaks_uses_covering_index():
+    _seed()
+    _assert_indexed(rollback.get_active_tweaks)
+    sql = _captured_sql(rollback.get_active_tweaks)[0]
+    assert "COVERING INDEX" in _plan(sql)
+
+
+def test_snapshot_reads_and_cleanup_use_index():
+    hid = _seed()
+    _assert_indexed(rollback.get_snapshots_v2, hid)
+    _assert_indexed(rollback.clear_snapshots, hid)
+
+
+def test_revert_cleanup_uses_index():
+    hid = _seed()
+    sm = state_machine.TweakStateMachine(hid)
+    sm.transition("apply_success")
+    sm.transition("revert")
+
+    _assert_indexed(sm.transition, "success")
+
+
+def test_recovery_scan_uses_index():
+    _seed()
+    _assert_indexed(recovery.RecoveryManager().scan_for_issues)
+
+
+def test_active_histories_join_uses_indexes():
+    _seed()
+    _assert_indexed(rollback.get_active_histories)
@@ -6,6 +6,7 @@ from datetime import timedelta
 from core.recovery import RecoveryManager
 from core.tweak_manager import TweakManager
 from core.rollback import init_db, create_history_entry
+from core.history_store import close_store
 from core.time import DEFAULT_TIME_PROVIDER as TIME
 
 
@@ -27,6 +28,7 @@ def isolated_db():
 
     yield
 
+    close_store(TEST_DB)
     if TEST_DB.exists():
         TEST_DB.unlink()
 
@@ -0,0 +1,229 @@
+import pytest
+
+from core import registry
+from core.actions.base import ActionSnapshot
+from core.actions.registry_action import RegistryAction
+from core.actions.verify_action import RegistryVerifyAction
+
+PATH = "HKEY_CURRENT_USER\\Software\\Enhancer\\Test"
+
+
+def test_set_get_is_case_insensitive(memory_registry):
+    registry.set_value(PATH, "Value", 5, "DWORD", force=True)
+
+    assert registry.get_value(PATH.upper(), "value") == (5, registry.REG_TYPES["DWORD"])
+    assert registry.subkey_exists("HKCU\\software\\enhancer")
+
+
+def test_set_without_force_requires_existing_key():
+    with pytest.raises(FileNotFoundError) as exc:
+        registry.set_value(PATH, "Value", 1, "DWORD")
+    assert "force_create" in str(exc.value)
+
+
+def test_policy_paths_are_created_implicitly():
+    path = "HKEY_LOCAL_MACHINE\\SOFTWARE\\Policies\\Microsoft\\Windows\\GameDVR"
+    registry.set_value(path, "AllowGameDVR", 0, "DWORD")
+
+    assert registry.get_value(path, "AllowGameDVR")[0] == 0
+
+
+def test_delete_subkey_refuses_keys_with_children():
+    registry.set_value(PATH, "Value", 1, "DWORD", force=True)
+
+    assert registry.delete_subkey("HKEY_CURRENT_USER\\Software\\Enhancer") is False
+    assert registry.delete_value(PATH, "Value") is True
+    assert registry.delete_subkey(PATH) is True
+    assert not registry.subkey_exists(PATH)
+
+
+def test_apply_verify_rollback_roundtrip(memory_registry):
+    registry.set_value(PATH, "Existing", 1, "DWORD", force=True)
+
+    actions = [
+        RegistryAction({"type": "registry", "path": PATH, "key": "Existing", "value": 0}),
+        RegistryAction({"type": "registry", "path": PATH + "\\New", "key": "Fresh",
+                        "value": "on", "value_type": "SZ", "force_create": True}),
+    ]
+    snapshots = [a.snapshot() for a in actions]
+    for a in actions:
+        a.apply()
+
+    assert all(a.verify() for a in actions)
+    assert RegistryVerifyAction({"type": "registry", "path": PATH, "key": "Existing",
+                                 "expected": 0, "expected_type": "DWORD"}).verify()
+
+    for a, snap in reversed(list(zip(actions, snapshots))):
+        a.rollback(ActionSnapshot.from_dict(snap.to_dict()))
+
+    assert registry.get_value(PATH, "Existing")[0] == 1
+    assert not registry.subkey_exists(PATH + "\\New")
+    assert memory_registry.stats["set_value"] == 4
+
+
+def test_snapshot_batch_matches_per_action_snapshots(memory_registry):
+    registry.set_value(PATH, "A", 1, "DWORD", force=True)
+    registry.set_value(PATH, "B", "x", "SZ", force=True)
+
+    actions = [
+        RegistryAction({"type": "registry", "path": PATH, "key": "A", "value": 0}),
+        RegistryAction({"type": "registry", "path": PATH + "\\Missing", "key": "A", "value": 0}),
+        RegistryAction({"type": "registry", "path": PATH.upper(), "key": "B", "value": "y",
+                        "value_type": "SZ"}),
+        RegistryAction({"type": "registry", "path": PATH, "key": "Absent", "value": 0}),
+    ]
+    expected = [a.snapshot().to_dict() for a in actions]
+    memory_registry.stats.clear()
+
+    batched = RegistryAction.snapshot_batch(actions)
+
+    assert [s.to_dict() for s in batched] == expected
+    # one read per distinct key instead of subkey_exists + get_value per action
+    assert memory_registry.stats == {"get_values": 2}
+
+
+def test_snapshot_phase_preserves_action_order(memory_registry, tmp_path, monkeypatch):
+    import core.rollback as roll_mod
+    from core.actions.base import Action
+    from core.tweak_manager import TweakManager
+
+    class Marker(Action):
+        def __init__(self, tag):
+            self.tag = tag
+        def snapshot(self):
+            return ActionSnapshot("marker", {"tag": self.tag})
+        def apply(self): pass
+        def verify(self): return True
+        def rollback(self, snapshot): pass
+        @classmethod
+        def from_snapshot(cls, snapshot): return cls(snapshot.metadata["tag"])
+
+    actions = [
+        Marker("m1"),
+        RegistryAction({"type": "registry", "path": PATH, "key": "A", "value": 0}),
+        Marker("m2"),
+        RegistryAction({"type": "registry", "path": PATH, "key": "B", "value": 0}),
+    ]
+    monkeypatch.setattr(roll_mod, "DB_PATH", tmp_path / "order.db")
+    manager = TweakManager(max_workers=4)
+    snapshots = manager._run_snapshot_phase(actions)
+
+    assert [s.metadata.get("tag") or s.metadata["key"] for s in snapshots] == ["m1", "A", "m2", "B"]
+
+
+def test_get_values_opens_key_once():
+    backend, fake = _winreg_backend()
+    fake.values["A"] = (1, 4)
+
+    with registry.use_backend(backend):
+        existed, values = registry.get_values(PATH, ["A", "B"])
+
+    assert existed is True
+    assert values == {"A": (1, 4), "B": (None, None)}
+    assert fake.opened == fake.closed == 1
+
+
+def test_injected_latency_is_applied(monkeypatch):
+    from core import registry_backends
+
+    slept = []
+    monkeypatch.setattr(registry_backends.TIME, "sleep", slept.append)
+    backend = registry_backends.MemoryRegistryBackend(latency=0.002)
+
+    with registry.use_backend(backend):
+        registry.get_value(PATH, "X")
+
+    assert slept == [0.002]
+
+
+class FakeWinreg:
+    """Just enough of winreg to count handle traffic."""
+
+    KEY_READ = 0x20019
+    KEY_WRITE = 0x20006
+
+    def __init__(self):
+        self.values = {}
+        self.opened = 0
+        self.closed = 0
+
+    def _open(self, hive, subkey, *_):
+        self.opened += 1
+        return object()
+
+    OpenKey = _open
+    CreateKeyEx = _open
+
+    def CloseKey(self, handle):
+        self.closed += 1
+
+    def QueryValueEx(self, handle, key):
+        if key not in self.values:
+            raise FileNotFoundError(key)
+        return self.values[key]
+
+    def SetValueEx(self, handle, key, _reserved, reg_type, value):
+        self.values[key] = (value, reg_type)
+
+    def DeleteKey(self, hive, subkey):
+        pass
+
+
+def _winreg_backend(capacity=64):
+    from core.registry_backends import WinregBackend
+
+    fake = FakeWinreg()
+    backend = WinregBackend(winreg_module=fake)
+    backend.HANDLE_CACHE_SIZE = capacity
+    return backend, fake
+
+
+def test_handles_are_reused_within_scope_and_closed_on_exit():
+    backend, fake = _winreg_backend()
+
+    with registry.use_backend(backend), registry.scope():
+        for key in ("A", "B", "C"):
+            registry.get_value(PATH, key)
+            registry.set_value(PATH, key, 1, "DWORD", force=True)
+        assert fake.opened == 2  # one KEY_READ + one KEY_WRITE handle
+        assert fake.closed == 0
+
+    assert fake.closed == fake.opened
+
+
+def test_no_scope_keeps_open_close_per_call():
+    backend, fake = _winreg_backend()
+
+    with registry.use_backend(backend):
+        registry.get_value(PATH, "A")
+        registry.get_value(PATH, "A")
+
+    assert fake.opened == fake.closed == 2
+
+
+def test_lru_evicts_and_closes_oldest_handle():
+    backend, fake = _winreg_backend(capacity=2)
+
+    with registry.use_backend(backend), registry.scope():
+        for i in range(3):
+            registry.get_value(f"{PATH}\\{i}", "A")
+        assert backend.handle_cache.stats["evictions"] == 1
+        assert fake.closed == 1
+
+        registry.get_value(f"{PATH}\\0", "A")  # evicted -> reopened
+        assert fake.opened == 4
+
+
+def test_delete_subkey_invalidates_key_and_children():
+    backend, fake = _winreg_backend()
+
+    with registry.use_backend(backend), registry.scope():
+        registry.get_value(PATH, "A")
+        registry.get_value(PATH + "\\Child", "A")
+        registry.get_value("HKEY_CURRENT_USER\\Software\\Other", "A")
+
+        registry.delete_subkey(PATH)
+
+        assert backend.handle_cache.stats["invalidations"] == 2
+        registry.get_value(PATH, "A")
+        assert fake.opened == 4
@@ -0,0 +1,100 @@
+import pytest
+
+import core.rollback as roll_mod
+from core import registry
+from core.history_store import get_store
+
+PATH = "HKCU\\Software\\EnhancerRevertAll"
+
+
+@pytest.fixture
+def manager(manager):
+    manager.max_workers = 4
+    return manager
+
+
+@pytest.fixture
+def overlapping(manager, monkeypatch):
+    """
+    Let `apply` write values active tweaks already own, as histories from
+    before the implicit-conflict check may; revert_all must coalesce them.
+    """
+    monkeypatch.setattr(manager.validator, "validate_resources", lambda batch, active: None)
+
+
+def _tweak(make_tweak, name, writes, dependencies=()):
+    """`writes` are (subkey suffix, key, value) under PATH."""
+    return make_tweak(
+        name,
+        [(PATH + sub, key, value) for sub, key, value in writes],
+        dependencies=list(dependencies),
+    )
+
+
+def test_revert_all_restores_the_oldest_original(manager, overlapping, make_tweak, tmp_path, memory_registry):
+    registry.set_value(PATH, "Shared", 0, "DWORD", force=True)
+    assert manager.apply(_tweak(make_tweak, "first", [("", "Shared", 1), ("\\One", "A", 1)]))
+    assert manager.apply(_tweak(make_tweak, "second", [("", "Shared", 2), ("\\Two", "B", 1)],
+                                dependencies=["test.first@1.0"]))
+    memory_registry.stats.clear()
+
+    assert manager.revert_all(tmp_path / "tweaks")
+
+    assert registry.get_value(PATH, "Shared") == (0, 4)
+    assert not registry.subkey_exists(PATH + "\\One")
+    assert not registry.subkey_exists(PATH + "\\Two")
+    # "Shared" is restored once, straight to 0
+    assert memory_registry.stats["set_value"] == 1
+    assert roll_mod.get_active_tweaks() == []
+    event = manager.events[-1]
+    assert event["tweak_ids"] == ["test.second@1.0", "test.first@1.0"]
+    assert event["writes_avoided"] == 1
+
+
+def test_coalescing_restores_a_value_the_first_tweak_left_unchanged(manager, overlapping, make_tweak, tmp_path):
+    registry.set_value(PATH, "Shared", 1, "DWORD", force=True)
+    assert manager.apply(_tweak(make_tweak, "first", [("", "Shared", 1)]))
+    assert manager.apply(_tweak(make_tweak, "second", [("", "Shared", 2)]))
+
+    assert manager.revert_all(tmp_path / "tweaks")
+    assert registry.get_value(PATH, "Shared") == (1, 4)
+
+
+def test_active_histories_and_snapshots_come_from_one_query(manager, make_tweak):
+    assert manager.apply(_tweak(make_tweak, "first", [("", "A", 1), ("", "B", 1)]))
+    assert manager.apply(_tweak(make_tweak, "second", [("", "C", 1)]))
+    store = get_store(roll_mod.DB_PATH)
+    statements = store.stats["statements"]
+
+    histories = roll_mod.get_active_histories()
+
+    assert store.stats["statements"] - statements == 1
+    assert [h["tweak_id"] for h in histories] == ["test.first@1.0", "test.second@1.0"]
+    assert [s["metadata"]["key"] for s in histories[0]["snapshots"]] == ["A", "B"]
+
+
+def test_coalescing_follows_apply_order_not_revert_order(manager, overlapping, make_tweak, tmp_path):
+    registry.set_value(PATH, "Shared", 0, "DWORD", force=True)
+    assert manager.apply(_tweak(make_tweak, "a", [("", "Own", 1)]))
+    assert manager.apply(_tweak(make_tweak, "b", [("", "Shared", 2)], dependencies=["test.a@1.0"]))
+    assert manager.apply(_tweak(make_tweak, "c", [("", "Shared", 3)]))
+
+    assert manager.revert_all(tmp_path / "tweaks")
+    # b is reverted before c, yet b's snapshot holds the original
+    order = manager.events[-1]["tweak_ids"]
+    assert order.index("test.b@1.0") < order.index("test.c@1.0")
+    assert registry.get_value(PATH, "Shared") == (0, 4)
+
+
+def test_failed_revert_all_marks_histories_failed(manager, make_tweak, tmp_path, monkeypatch, capsys):
+    assert manager.apply(_tweak(make_tweak, "first", [("", "A", 1)]))
+
+    def broken(restores):
+        raise OSError("registry unavailable")
+
+    monkeypatch.setattr(manager, "_rollback_snapshots", broken)
+    assert not manager.revert_all(tmp_path / "tweaks")
+
+    statuses = get_store(roll_mod.DB_PATH).query_all("SELECT status, error_message FROM tweak_history")
+    assert statuses == [("failed", "registry unavailable")]
+    assert "[ERROR] Revert of all tweaks failed: registry unavailable" in capsys.readouterr().out
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+import core.rollback as roll_mod
+from core import profile, registry
+from core.catalog import TweakCatalog
+from core.profile import default_tweak_source, index_tweak_dir
+from core.tweak_pack import PackError, PackMember, TweakPack, build_pack, open_member
+
+PATH = "HKCU\\Software\\EnhancerPack"
+
+
+@pytest.fixture
+def definition(tweak_definition):
+    return lambda name: tweak_definition(name, [(PATH, name, 1)])
+
+
+@pytest.fixture
+def pack_path(tmp_path, definition):
+    d = tmp_path / "tweaks"
+    d.mkdir()
+    for name in ("alpha", "beta", "gamma"):
+        (d / f"{name}.json").write_text(json.dumps(definition(name), indent=2))
+    (d / "legacy.json").write_text(json.dumps({"id": "011", "name": "Legacy", "actions": {"apply": []}}))
+    out = tmp_path / "dist" / "tweaks.etpk"
+    assert build_pack(d, out) == 4
+    return out
+
+
+def test_pack_round_trips_definitions(pack_path, definition):
+    with TweakPack(pack_path) as pack:
+        assert pack.ids() == ["011", "test.alpha@1.0", "test.beta@1.0", "test.gamma@1.0"]
+        assert pack.load("test.beta@1.0") == definition("beta")
+        assert pack.verify()
+        with pytest.raises(KeyError):
+            pack.read("test.missing@1.0")
+
+
+def test_corrupt_entry_is_detected_on_read(pack_path):
+    with TweakPack(pack_path) as pack:
+        offset, length = pack.entries["test.beta@1.0"][:2]
+        start = pack._data_start + offset
+
+    raw = bytearray(pack_path.read_bytes())
+    raw[start + length // 2] ^= 0x01
+    pack_path.write_bytes(bytes(raw))
+
+    with TweakPack(pack_path) as pack:
+        assert pack.load("test.alpha@1.0")["name"] == "alpha"
+        with pytest.raises(PackError):
+            pack.read("test.beta@1.0")
+        assert not pack.verify()
+
+
+def test_non_pack_file_is_rejected(tmp_path):
+    bogus = tmp_path / "bogus.etpk"
+    bogus.write_bytes(b"not a pack at all")
+    with pytest.raises(PackError):
+        TweakPack(bogus)
+
+
+def test_pack_is_a_tweak_source_for_index_catalog_and_manager(pack_path, manager):
+
+    index = index_tweak_dir(pack_path, manager.load_tweak)
+    assert sorted(index) == ["test.alpha@1.0", "test.beta@1.0", "test.gamma@1.0"]
+    assert all(isinstance(member, PackMember) for member, _ in index.values())
+
+    catalog = TweakCatalog(pack_path).scan()
+    assert catalog.get("011").is_legacy and catalog.find(tier=0) != []
+
+    member = open_member(f"{pack_path}#test.alpha@1.0")
+    assert manager.apply(member)
+    assert registry.get_value(PATH, "alpha")[0] == 1
+
+    assert manager.converge(["test.alpha@1.0", "test.gamma@1.0"], pack_path)
+    assert sorted(t["tweak_id"] for t in roll_mod.get_active_tweaks()) == ["test.alpha@1.0", "test.gamma@1.0"]
+
+
+def test_open_member_ignores_plain_paths(tmp_path):
+    assert open_member(str(tmp_path / "tweak.json")) is None
+
+
+def test_pack_is_the_default_source_when_shipped(pack_path, monkeypatch):
+    monkeypatch.setattr(profile, "TWEAK_PACK", pack_path)
+    assert default_tweak_source() == pack_path
+    assert TweakCatalog().scan().get("test.alpha@1.0") is not None
+
+    monkeypatch.setattr(profile, "TWEAK_PACK", pack_path.with_name("missing.etpk"))
+    assert default_tweak_source() == profile.TWEAK_DIR
+
+
+def test_indexing_and_scanning_close_the_pack(pack_path):
+    member, _ = index_tweak_dir(pack_path)["test.alpha@1.0"]
+    assert member.pack._map.closed
+
+    entry = TweakCatalog(pack_path).scan().get("test.alpha@1.0")
+    assert entry.path.pack._map.closed
+    assert entry.definition["name"] == "alpha"
@@ -227,4 +227,165 @@ class TestCompositionValidation:
         
         with pytest.raises(ValidationError) as exc:
             v.validate_composition([t], active_ids)
-        assert "dependency" in str(exc.value).lower()
\ No newline at end of file
+        assert "dependency" in str(exc.value).lower()
+
+def _valid(tweak_id, **extra):
+    definition = {
+        "id": tweak_id, "name": tweak_id, "tier": 1, "risk_level": "low",
+        "requires_reboot": False, "rollback_guaranteed": True, "scope": ["registry"],
+        "schema_version": SCHEMA_VERSION, "actions": {"apply": []},
+    }
+    definition.update(extra)
+    return definition
+
+
+class TestBulkValidation:
+
+    def _write(self, directory, definitions):
+        import json
+        paths = []
+        for i, definition in enumerate(definitions):
+            path = directory / f"{i:03}.json"
+            path.write_text(definition if isinstance(definition, str) else json.dumps(definition))
+            paths.append(path)
+        return paths
+
+    def test_collect_errors_reports_every_rule(self):
+        errors = TweakValidator().collect_errors(
+            _valid("bad id", tier=2, scope=["boot"], schema_version=99)
+        )
+        assert [e.code for e in errors] == [
+            "invalid_id", "schema_version", "tier_risk_mismatch",
+            "boot_without_reboot",
+        ]
+
+    def test_error_codes_survive_composition(self):
+        with pytest.raises(ValidationError) as exc:
+            TweakValidator().validate_composition([_valid("a.b@1.0", tier=7)], [])
+        assert exc.value.code == "invalid_tier"
+
+    def test_validate_many_collects_file_and_cross_file_errors(self, tmp_path):
+        paths = self._write(tmp_path, [
+            _valid("test.base@1.0"),
+            _valid("test.base@1.0"),
+            _valid("test.user@1.0", dependencies=["test.base@1.0", "test.gone@1.0"],
+                   conflicts_with=["test.ghost@1.0"]),
+            _valid("test.bad@1.0", tier=9, risk_level="none"),
+            "{not json",
+        ])
+
+        errors = TweakValidator().validate_many(paths, max_workers=1)
+        found = sorted((e["file"].rsplit("/", 1)[-1], e["code"]) for e in errors)
+
+        assert found == [
+            ("001.json", "duplicate_id"),
+            ("002.json", "dangling_conflict"),
+            ("002.json", "dangling_dependency"),
+            ("003.json", "invalid_tier"),
+            ("004.json", "unreadable"),
+        ]
+        assert all(set(e) == {"file", "tweak_id", "code", "message"} for e in errors)
+
+    def test_process_pool_matches_in_process_result(self, tmp_path, monkeypatch):
+        import core.validation as validation
+
+        definitions = [_valid(f"test.t_{chr(97 + i % 26)}{chr(97 + i // 26)}@1.0") for i in range(40)]
+        definitions[7]["tier"] = 5
+        definitions[30]["dependencies"] = ["test.missing@1.0"]
+        paths = self._write(tmp_path, definitions)
+
+        monkeypatch.setattr(validation, "PARALLEL_THRESHOLD", 1)
+        pooled = TweakValidator().validate_many(paths, max_workers=2)
+        serial = TweakValidator().validate_many(paths, max_workers=1)
+
+        assert pooled == serial
+        assert [e["code"] for e in pooled] == ["invalid_tier", "dangling_dependency"]
+
+
+class TestResourceConflicts:
+
+    def _tweak(self, tweak_id, *actions):
+        return _valid(tweak_id, tier=0, actions={"apply": list(actions)})
+
+    def _reg(self, path, key):
+        return {"type": "registry", "path": path, "key": key, "value": 1}
+
+    def test_same_value_in_batch_is_an_implicit_conflict(self):
+        a = self._tweak("test.a@1.0", self._reg("HKEY_CURRENT_USER\\Software\\X", "Value"))
+        b = self._tweak("test.b@1.0", self._reg("HKCU\\software\\x", "value"))
+
+        with pytest.raises(ValidationError) as exc:
+            TweakValidator().validate_composition([a, b], [])
+        assert exc.value.code == "implicit_conflict"
+        assert "HKEY_CURRENT_USER\\software\\x\\value" in str(exc.value)
+
+    def test_other_resource_kinds_are_indexed(self):
+        actions = [
+            {"type": "powercfg", "scheme_guid": "SCHEME_CURRENT", "subgroup_guid": "SUB_PROCESSOR",
+             "setting_guid": "PROCTHROTTLEMIN", "value_ac": 100},
+            {"type": "bcdedit", "id_type": "{current}", "datatype": "disabledynamictick", "value": "yes"},
+            {"type": "service", "service_name": "WSearch"},
+        ]
+        v = TweakValidator()
+        for action in actions:
+            with pytest.raises(ValidationError) as exc:
+                v.validate_composition([self._tweak("test.a@1.0", action), self._tweak("test.b@1.0", action)], [])
+            assert exc.value.code == "implicit_conflict"
+
+    def test_active_set_conflicts_come_from_snapshots(self):
+        from core.validation import snapshot_resources
+
+        histories = [{"tweak_id": "test.owner@1.0", "snapshots": [{
+            "action_type": "registry",
+            "metadata": {"path": "HKCU\\Software\\X", "key": "Value", "value_existed": False,
+                         "subkey_existed": True, "old_value": None, "old_type": None},
+        }]}]
+        v = TweakValidator()
+        active = snapshot_resources(histories)
+
+        v.validate_resources([self._tweak("test.owner@1.0", self._reg("HKCU\\Software\\X", "Value"))], active)
+        v.validate_resources([self._tweak("test.b@1.0", self._reg("HKCU\\Software\\X", "Other"))], active)
+        with pytest.raises(ValidationError) as exc:
+            v.validate_resources([self._tweak("test.b@1.0", self._reg("HKCU\\Software\\X", "Value"))], active)
+        assert exc.value.code == "implicit_conflict"
+
+    def test_scheme_mode_powercfg_conflicts_with_any_setting_in_the_scheme(self):
+        from core.validation import snapshot_resources
+
+        def powercfg(setting, **extra):
+            return {"type": "powercfg", "scheme_guid": "SCHEME_BALANCED", "subgroup_guid": "SUB_PROCESSOR",
+                    "setting_guid": setting, "value_ac": 100, **extra}
+
+        scheme = self._tweak("test.scheme@1.0", powercfg("PROCTHROTTLEMAX", snapshot_mode="scheme"))
+        setting = self._tweak("test.setting@1.0", powercfg("PROCTHROTTLEMIN"))
+        v = TweakValidator()
+
+        with pytest.raises(ValidationError) as exc:
+            v.validate_composition([setting, scheme], [])
+        assert exc.value.code == "implicit_conflict"
+
+        histories = [{"tweak_id": "test.setting@1.0", "snapshots": [{
+            "action_type": "powercfg",
+            "metadata": {"scheme_guid": "SCHEME_BALANCED", "subgroup_guid": "SUB_PROCESSOR",
+                         "setting_guid": "PROCTHROTTLEMIN", "old_value_ac": 5, "old_value_dc": 5},
+        }]}]
+        with pytest.raises(ValidationError) as exc:
+            v.validate_resources([scheme], snapshot_resources(histories))
+        assert "test.setting@1.0" in str(exc.value)
+        # a scheme-mode tweak may still combine both modes itself
+        v.validate_composition([self._tweak("test.both@1.0", *scheme["actions"]["apply"],
+                                            *setting["actions"]["apply"])], [])
+
+    def test_conflict_checks_scale_linearly(self):
+        import time
+
+        v = TweakValidator()
+        batch = [
+            _valid(f"test.t{i}@1.0", tier=0, conflicts_with=[f"test.absent{i}@1.0"],
+                   actions={"apply": [self._reg("HKCU\\Software\\Scale", f"K{i}")]})
+            for i in range(5000)
+        ]
+        start = time.perf_counter()
+        v._check_conflicts(batch, [f"test.active{i}@1.0" for i in range(5000)])
+        v._check_dependencies(batch, [])
+        assert time.perf_counter() - start < 2.0
@@ -0,0 +1,67 @@
+from core import registry
+
+PATH = "HKCU\\Software\\EnhancerCache"
+
+
+def test_reads_after_write_are_served_from_cache(memory_registry):
+    with registry.value_cache() as cache:
+        registry.set_value(PATH, "A", 1, "DWORD", force=True)
+        assert registry.get_value(PATH, "a") == (1, 4)
+        assert registry.subkey_exists(PATH)
+
+    assert memory_registry.stats == {"set_value": 1}
+    assert cache.stats["hits"] == 2
+
+
+def test_strict_reads_bypass_cache(memory_registry):
+    with registry.value_cache() as cache:
+        registry.set_value(PATH, "A", 1, "DWORD", force=True)
+        with registry.strict_reads():
+            assert registry.get_value(PATH, "A") == (1, 4)
+        assert registry.get_value(PATH, "A") == (1, 4)
+
+    assert memory_registry.stats["get_value"] == 1
+    assert cache.stats["bypassed"] == 1
+
+
+def test_deletes_invalidate_cached_entries(memory_registry):
+    with registry.value_cache():
+        registry.set_value(PATH + "\\Sub", "A", 1, "DWORD", force=True)
+        registry.get_values(PATH + "\\Sub", ["A"])
+        assert registry.delete_value(PATH + "\\Sub", "A")
+        assert registry.get_value(PATH + "\\Sub", "A") == (None, None)
+
+        assert registry.delete_subkey(PATH + "\\Sub")
+        assert not registry.subkey_exists(PATH + "\\Sub")
+
+    # the post-delete existence check had to go to the backend
+    assert memory_registry.stats["subkey_exists"] == 1
+
+
+def test_cache_is_dropped_when_block_exits(memory_registry):
+    with registry.value_cache():
+        registry.set_value(PATH, "A", 1, "DWORD", force=True)
+
+    assert registry.get_backend() is memory_registry
+
+
+def _tweak(make_tweak, semantics):
+    keys = ["A", "B", "C"]
+    return make_tweak(
+        "cache",
+        [(PATH, k, 1) for k in keys],
+        verify=[(PATH, k, 1) for k in keys],
+        tier=1,
+        verify_semantics=semantics,
+    )
+
+
+def test_runtime_verify_reads_nothing_back(manager, make_tweak, memory_registry):
+    assert manager.apply(_tweak(make_tweak, "runtime"))
+    assert memory_registry.stats["get_value"] == 0
+    assert memory_registry.stats["set_value"] == 3
+
+
+def test_persisted_verify_reads_every_value(manager, make_tweak, memory_registry):
+    assert manager.apply(_tweak(make_tweak, "persisted"))
+    assert memory_registry.stats["get_value"] == 3
@@ -6,8 +6,18 @@ from pathlib import Path
 CORE_FILES = [
     "core/__init__.py",
     "core/registry.py",
+    "core/registry_backends.py",
+    "core/deadlines.py",
+    "core/commands.py",
+    "core/powercfg.py",
+    "core/bcdedit.py",
     "core/rollback.py",
+    "core/history_store.py",
     "core/tweak_manager.py",
+    "core/profile.py",
+    "core/catalog_cache.py",
+    "core/catalog.py",
+    "core/tweak_pack.py",
     
     "core/recovery.py",
     "core/tweak_id.py",